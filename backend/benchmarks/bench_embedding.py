@@ -0,0 +1,79 @@
+"""
+CLIP 임베딩 추출 지연 시간 벤치마크
+- full: 바이트 → 디코딩 → 전처리 → forward (extract_embeddings 전체)
+- decode: 크기 인지형 디코딩만
+- preprocess: 디코딩된 이미지 → 텐서
+- forward: 전처리된 텐서 → 임베딩 (전처리 제외)
+- 입력 해상도 × 배치 크기 조합 (CLIP_BACKEND 환경 변수로 백엔드 선택)
+
+사용법:
+    python benchmarks/bench_embedding.py --resolutions 512 2048 4000 --batches 1 8
+"""
+
+import argparse
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import torch
+from PIL import Image
+
+from common import compare_results, save_results, time_it
+
+from services.clip_service import clip_service
+from services.image_ingest import decode_image
+
+
+def synthetic_jpeg(width: int, height: int, seed: int = 0) -> bytes:
+    """
+    사진과 비슷한 압축률의 합성 JPEG (노이즈 + 그라데이션)
+    """
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    noise = rng.normal(0, 25, size=(height, width, 3))
+    pixels = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def run(resolutions, batches, repeat: int) -> dict:
+    clip_service.load()
+    clip_service.warm_up()
+
+    results = {}
+    for res in resolutions:
+        data = synthetic_jpeg(res, res * 3 // 4)
+        image = decode_image(data, target_size=clip_service.IMAGE_SIZE)
+
+        cases = {
+            f"decode/{res}px": lambda: decode_image(data, target_size=clip_service.IMAGE_SIZE),
+            f"preprocess/{res}px": lambda: clip_service._preprocess(image),
+        }
+        for b in batches:
+            tensor = torch.stack([clip_service._preprocess(image)] * b)
+            cases[f"full/{res}px/B={b}"] = lambda b=b: clip_service.extract_embeddings([data] * b)
+            cases[f"forward/{res}px/B={b}"] = lambda tensor=tensor: clip_service._engine.encode(tensor)
+
+        for name, fn in cases.items():
+            results[name] = time_it(fn, repeat=repeat, warmup=2)
+            print(f"  {name:<32} p50 {results[name]['p50_ms']:.2f}ms  p99 {results[name]['p99_ms']:.2f}ms")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CLIP 임베딩 추출 지연 시간 벤치마크")
+    parser.add_argument("--resolutions", type=int, nargs="+", default=[512, 1920, 4000])
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    print(f"🔄 임베딩 벤치마크 실행 중 (백엔드: {clip_service.BACKEND})...")
+    results = run(args.resolutions, args.batches, args.repeat)
+    save_results(f"embedding-{clip_service.BACKEND}", results, args.output)
+    if args.compare and compare_results(args.compare, results):
+        sys.exit(1)
@@ -0,0 +1,104 @@
+"""
+/api/match 부하 테스트
+- 인프로세스 ASGI 클라이언트 (httpx.ASGITransport)로 FastAPI 앱에 직접 요청
+  → 네트워크/프록시 없이 앱 자체의 처리량과 지연 시간 측정
+- 동시성 C로 총 N개 요청, p50/p95/p99 지연 시간과 RPS, 상태 코드 분포 출력
+- 기본값은 요청마다 다른 바이트 (임베딩 캐시를 우회해 실제 추론 경로 측정)
+- 모든 요청이 한 클라이언트에서 오므로 클라이언트별 토큰 버킷은 끈 채로 측정 (ADMISSION_CLIENT_RATE 미설정 시 0)
+  → 동시 처리 한도에 의한 503 (과부하 시 거절)은 상태 코드 분포에 그대로 나타남
+
+사용법:
+    python benchmarks/bench_load.py --concurrency 1 4 16 --requests 200
+    python benchmarks/bench_load.py --image photo.jpg --same-image   # 모든 요청에 같은 바이트 (캐시 적중 경로)
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List
+
+import httpx
+
+from common import compare_results, percentiles, save_results
+from bench_embedding import synthetic_jpeg
+
+os.environ.setdefault("ADMISSION_CLIENT_RATE", "0")
+
+from main import app
+
+
+def make_payload(image: bytes, index: int, unique: bool = True) -> bytes:
+    # JPEG EOI 뒤의 바이트는 디코더가 무시 → 내용은 같지만 해시가 다른 이미지
+    return image + index.to_bytes(8, "little") if unique else image
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    path: str,
+    image: bytes,
+    concurrency: int,
+    total: int,
+    unique: bool,
+    first_index: int = 0,
+) -> dict:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    # 단계마다 번호를 이어서 매김 → 앞 단계에서 캐시된 이미지를 다시 보내지 않음
+    counter = iter(range(first_index, first_index + total))
+
+    async def worker():
+        for i in counter:
+            files = {"file": ("bench.jpg", make_payload(image, i, unique), "image/jpeg")}
+            start = time.perf_counter()
+            response = await client.post(path, files=files)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    stats = percentiles(latencies)
+    stats["rps"] = round(total / elapsed, 2)
+    stats["status"] = {str(k): v for k, v in sorted(statuses.items())}
+    return stats
+
+
+async def run(levels, total: int, path: str, image: bytes, unique: bool) -> dict:
+    results = {}
+    # ASGITransport는 lifespan을 실행하지 않으므로 직접 실행 (모델/카탈로그 로딩)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            for level, concurrency in enumerate(levels):
+                stats = await run_level(client, path, image, concurrency, total, unique, level * total)
+                results[f"{path}/c={concurrency}"] = stats
+                print(
+                    f"  c={concurrency:<4} rps {stats['rps']:<8} p50 {stats['p50_ms']:.1f}ms "
+                    f"p95 {stats['p95_ms']:.1f}ms p99 {stats['p99_ms']:.1f}ms  {stats['status']}"
+                )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/api/match 인프로세스 부하 테스트")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=100, help="동시성 단계별 총 요청 수")
+    parser.add_argument("--path", default="/api/match")
+    parser.add_argument("--image", type=Path, default=None, help="업로드할 이미지 (기본값: 합성 1920px JPEG)")
+    parser.add_argument("--same-image", action="store_true", help="모든 요청에 같은 바이트 (임베딩 캐시 적중 경로 측정)")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    image = args.image.read_bytes() if args.image else synthetic_jpeg(1920, 1440)
+
+    print(f"🔄 부하 테스트 실행 중 ({args.path}, 요청 {args.requests}개/단계)...")
+    results = asyncio.run(run(args.concurrency, args.requests, args.path, image, not args.same_image))
+    save_results("load", results, args.output)
+    if args.compare and compare_results(args.compare, results):
+        sys.exit(1)
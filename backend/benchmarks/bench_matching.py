@@ -0,0 +1,87 @@
+"""
+매칭 핫패스 마이크로 벤치마크
+- l2_normalize / cosine_similarity_matrix / find_best_match / find_best_matches
+- 메타데이터 필터 검색 (gender / gender + 나이 범위, MATCH_FILTER_PARTITIONS 설정에 따라 분할 사용)
+- 카탈로그 크기 × 배치 크기 조합, 합성 프로토타입 사용 (모델 불필요)
+
+사용법:
+    python benchmarks/bench_matching.py
+    python benchmarks/bench_matching.py --sizes 100 1000 50000 --batches 1 16 --compare benchmarks/results/matching-xxx.json
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from common import compare_results, save_results, synthetic_metas, synthetic_prototypes, time_it
+
+from services.matching_service import MatchingService, l2_normalize
+from services.metadata_index import MatchFilter
+from services.prototype_store import save_prototype_store
+
+
+def build_service(matrix: np.ndarray, workdir: Path, index_type: str) -> MatchingService:
+    """
+    합성 프로토타입으로 MatchingService 생성 (바이너리 저장소 경유)
+    """
+    path = workdir / f"prototypes-{matrix.shape[0]}.npy"
+    if not path.exists():
+        save_prototype_store(str(path), matrix, synthetic_metas(matrix.shape[0]))
+    return MatchingService(str(path), expected_dim=matrix.shape[1], index_type=index_type)
+
+
+def run(sizes, batches, repeat: int, index_type: str) -> dict:
+    results = {}
+    rng = np.random.default_rng(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for n in sizes:
+            matrix = synthetic_prototypes(n)
+            service = build_service(matrix, workdir, index_type)
+
+            for b in batches:
+                queries = rng.standard_normal((b, matrix.shape[1])).astype(np.float32)
+                normalized = l2_normalize(queries)
+
+                cases = {
+                    f"l2_normalize/N={n}/B={b}": lambda: l2_normalize(queries),
+                    f"cosine_similarity_matrix/N={n}/B={b}": lambda: MatchingService.cosine_similarity_matrix(
+                        normalized if b > 1 else normalized[0], service.prototypes_matrix
+                    ),
+                    f"find_best_matches/N={n}/B={b}": lambda: service.find_best_matches(queries, top_k=3),
+                }
+                if b == 1:
+                    cases[f"find_best_match/N={n}"] = lambda: service.find_best_match(queries[0], top_k=3)
+                    cases[f"find_best_match/gender/N={n}"] = lambda: service.find_best_match(
+                        queries[0], top_k=3, filters=MatchFilter(gender="female")
+                    )
+                    cases[f"find_best_match/gender+age/N={n}"] = lambda: service.find_best_match(
+                        queries[0], top_k=3, filters=MatchFilter(gender="female", min_age=20, max_age=40)
+                    )
+
+                for name, fn in cases.items():
+                    results[name] = time_it(fn, repeat=repeat)
+                    print(f"  {name:<48} p50 {results[name]['p50_ms']:.4f}ms  p99 {results[name]['p99_ms']:.4f}ms")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="매칭 핫패스 마이크로 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--index", default="brute", help="MatchingService 인덱스 타입")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    print("🔄 매칭 벤치마크 실행 중...")
+    results = run(args.sizes, args.batches, args.repeat, args.index)
+    save_results("matching", results, args.output)
+    if args.compare and compare_results(args.compare, results):
+        sys.exit(1)
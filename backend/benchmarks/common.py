@@ -0,0 +1,129 @@
+"""
+벤치마크 공통 유틸
+- 타이머 / 백분위수 통계
+- 합성 프로토타입 생성
+- 결과 JSON 저장 및 이전 결과와 비교
+"""
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """
+    소요 시간 샘플(초) → ms 단위 통계
+    """
+    arr = np.asarray(samples) * 1000
+    return {
+        "n": int(arr.size),
+        "mean_ms": round(float(arr.mean()), 4),
+        "p50_ms": round(float(np.percentile(arr, 50)), 4),
+        "p95_ms": round(float(np.percentile(arr, 95)), 4),
+        "p99_ms": round(float(np.percentile(arr, 99)), 4),
+        "stdev_ms": round(float(statistics.pstdev(arr)), 4),
+    }
+
+
+def time_it(fn: Callable[[], Any], repeat: int = 100, warmup: int = 5) -> Dict[str, float]:
+    """
+    함수 반복 실행 시간 측정
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def synthetic_prototypes(n: int, dim: int = 512, seed: int = 0) -> np.ndarray:
+    """
+    L2 정규화된 합성 프로토타입 행렬 (N, D)
+    """
+    rng = np.random.default_rng(seed)
+    mat = rng.standard_normal((n, dim)).astype(np.float32)
+    return mat / np.linalg.norm(mat, axis=1, keepdims=True)
+
+
+def synthetic_metas(n: int) -> List[Dict[str, Any]]:
+    genders = ("Male", "Female")
+    return [
+        {
+            "id": i,
+            "name": f"Character {i}",
+            "age": 10 + i % 70,
+            "gender": genders[i % 2],
+            "occupation": f"Job {i % 20}",
+            "portrait_path": f"/character/{i}.webp",
+        }
+        for i in range(n)
+    ]
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save_results(name: str, results: Dict[str, Any], output: Optional[Path] = None) -> Path:
+    """
+    결과를 benchmarks/results/<name>-<시각>.json 으로 저장
+    """
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+
+    payload = {
+        "benchmark": name,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"💾 결과 저장: {output}")
+    return output
+
+
+def compare_results(baseline: Path, current: Dict[str, Any], key: str = "p50_ms", tolerance: float = 0.10) -> int:
+    """
+    이전 결과와 비교해 key 지표가 tolerance 이상 느려진 항목 출력
+
+    Returns:
+        회귀 항목 수 (스크립트는 0이 아니면 종료 코드 1 → CI에서 실패 처리)
+    """
+    with open(baseline, "r", encoding="utf-8") as f:
+        base = json.load(f)["results"]
+
+    regressions = 0
+    print(f"\n📊 {baseline.name} 대비 {key} 비교 (허용 {tolerance * 100:.0f}%)")
+    for case, stats in current.items():
+        old = base.get(case, {}).get(key)
+        new = stats.get(key) if isinstance(stats, dict) else None
+        if old is None or new is None or old == 0:
+            continue
+        change = (new - old) / old
+        mark = "❌" if change > tolerance else "✅"
+        regressions += change > tolerance
+        print(f"  {mark} {case}: {old:.4f} → {new:.4f} ({change * 100:+.1f}%)")
+    return regressions
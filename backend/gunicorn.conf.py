@@ -0,0 +1,58 @@
+"""
+프로덕션 실행 설정 (멀티 워커)
+
+    gunicorn -c gunicorn.conf.py main:app
+
+- preload: 부모 프로세스가 카탈로그/CLIP 가중치를 한 번만 로딩한 뒤 워커를 fork
+  → 가중치는 torch 공유 메모리 (CLIP_BACKEND=torch만), 카탈로그(.npy)는 memmap으로 모든 워커가 공유
+- 워커 수: WEB_CONCURRENCY (기본값: 1)
+  - 2 이상은 명시적으로 켤 때만: 수락 제어/임베딩 캐시는 워커마다 따로 존재하고,
+    가중치 공유(torch 공유 메모리)에 모델 크기만큼 /dev/shm이 필요 (Docker 기본값 64MB → --shm-size)
+  - 2 이상이면 작업 API(/api/jobs)는 비활성화 (작업이 받은 워커 메모리에만 있음)
+- 워커당 torch 스레드 수: INFERENCE_TORCH_THREADS (기본값: 코어 수 / 워커 수)
+"""
+
+import os
+import shutil
+import tempfile
+
+cpu_count = os.cpu_count() or 1
+
+bind = f"0.0.0.0:{os.getenv('PORT', 7860)}"
+workers = int(os.getenv("WEB_CONCURRENCY", 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+# 워커끼리 코어를 나눠 쓰도록 torch intra-op 스레드 수 제한 (앱 임포트 전에 설정)
+os.environ.setdefault("INFERENCE_TORCH_THREADS", str(max(1, cpu_count // workers)))
+
+# 워커별 Prometheus 메트릭을 합산하기 위한 공유 디렉토리 (앱 임포트 전에 설정, 이전 실행 파일 정리)
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "simpson-finder-metrics"),
+)
+shutil.rmtree(metrics_dir, ignore_errors=True)
+os.makedirs(metrics_dir, exist_ok=True)
+
+
+def when_ready(server):
+    # preload된 앱 임포트 이후, 워커 fork 직전에 공유 자원 로딩
+    from services.job_queue import job_queue
+    from services.startup import preload_for_workers
+
+    # -w 옵션은 설정 파일의 workers보다 우선하므로 실제 값은 server.cfg에서 확인
+    multi_worker = server.cfg.workers > 1
+    if multi_worker:
+        job_queue.enabled = False
+
+    # 워커가 하나면 가중치를 공유할 필요가 없으므로 /dev/shm을 쓰지 않음
+    preload_for_workers(share_weights=multi_worker)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
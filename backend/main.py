@@ -3,28 +3,160 @@ Simpson Finder - Backend API
 FastAPI 서버로 CLIP 임베딩 기반 캐릭터 매칭 제공
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 import uvicorn
+import asyncio
+import hmac
+import logging
+import math
 import os
-from typing import Dict, Any
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
 
 # CLIP 및 매칭 서비스 임포트
-from services.clip_service import clip_service
-from services.matching_service import matching_service
+from services.admission import (
+    ADMISSION_ENABLED,
+    AdmissionMiddleware,
+    AdmissionRejected,
+    admission_charge,
+    admission_limiter,
+    client_buckets,
+)
+from services.batching_service import embedding_batcher
+from services.catalog_watcher import catalog_watcher
+from services.clip_service import CLIPService
+from services.embedding_cache import content_digest, embedding_cache
+from services.embedding_log import embedding_log
+from services.face_crop import FaceBox, face_detector, parse_face_box
+from services.fast_json import FastJSONResponse, FragmentJSONResponse, encode_response
+from services.image_ingest import (
+    MULTIPART_OVERHEAD,
+    ImageTooLargeError,
+    InvalidImageError,
+    UploadSizeLimitMiddleware,
+    read_upload,
+)
+from services.inference_pool import InferenceQueueFullError, inference_pool
+from services.job_queue import JobQueueFullError, job_queue
+from services.matching_service import ReloadInProgressError, matching_service
+from services.metadata_index import MatchFilter
+from services.metrics import (
+    RequestMetricsMiddleware,
+    record_error,
+    register_runtime_collector,
+    render_metrics,
+    stage_timer,
+)
+from services.portrait_store import PORTRAIT_CACHE_CONTROL, resolve_portrait
+from services.single_flight import embedding_flight
+from services.startup import STARTUP_BACKGROUND, run_startup, startup_state
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+logging.basicConfig(
+    level=LOG_LEVEL,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger("simpson_finder")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    앱 수명주기 관리
+    - 카탈로그/모델 로딩 및 워밍업 (STARTUP_BACKGROUND=1이면 백그라운드 실행)
+    - 추론 워커 풀 및 마이크로 배처 루프 시작/종료
+    - 카탈로그 파일 감시 (변경 시 무중단 리로드)
+    - 비동기 매칭 작업 워커 시작/종료
+    """
+    await embedding_batcher.start()
+    await catalog_watcher.start()
+    if job_queue.enabled:
+        await job_queue.start(run_match_job, retryable=(InferenceQueueFullError,))
+    else:
+        logger.warning("⚠️ 워커 프로세스가 여럿이라 작업 API(/api/jobs)를 비활성화합니다.")
+
+    startup_task = None
+    if STARTUP_BACKGROUND:
+        startup_task = asyncio.create_task(run_startup(startup_state, raise_on_error=False))
+    else:
+        await run_startup(startup_state)
+
+    yield
+
+    if startup_task is not None and not startup_task.done():
+        startup_task.cancel()
+    await job_queue.stop()
+    await catalog_watcher.stop()
+    await embedding_batcher.stop()
+    inference_pool.shutdown()
+    embedding_cache.close()
+    embedding_log.close()
+
 
 app = FastAPI(
     title="Simpson Finder API",
     description="AI-powered Simpson character matching service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
+)
+
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", 64))
+MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", 64 * 1024 * 1024))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # 미설정 시 관리자 엔드포인트 비활성화
+
+# 작업은 받은 워커 프로세스 메모리에만 있음 → 워커가 여럿이면 조회가 다른 워커로 가서 404가 되므로 비활성화
+# (uvicorn --workers / gunicorn 모두 WEB_CONCURRENCY를 읽음, gunicorn -w는 gunicorn.conf.py에서 처리)
+if int(os.getenv("WEB_CONCURRENCY", 1)) > 1:
+    job_queue.enabled = False
+
+# 업로드 본문 크기 제한 (버퍼링 전에 스트리밍 단계에서 거절)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/api/match": MAX_FILE_SIZE + MULTIPART_OVERHEAD,
+        "/api/match/batch": MAX_BATCH_BYTES + MULTIPART_OVERHEAD,
+        "/api/jobs": MAX_FILE_SIZE + MULTIPART_OVERHEAD,
+    }
 )
 
+# 수락 제어: 클라이언트별 토큰 버킷 + 적응형 동시 처리 한도 (본문을 받기 전에 429/503)
+# - 헬스 체크/통계 등 나머지 경로는 적용하지 않음
+if ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiter=admission_limiter,
+        buckets=client_buckets,
+        limited_paths=("/api/match", "/api/match/batch"),
+        rate_limited_paths=("/api/jobs",),
+    )
+    # 한도는 요청 전체 시간(업로드 수신 포함)이 아니라 추론 호출 시간을 따라감
+    inference_pool.latency_listeners.append(admission_limiter.observe)
+
 ALLOWED_ORIGINS = os.getenv(
     "ALLOWED_ORIGINS",
     "http://localhost:3000,http://localhost:3001"
 ).split(",")
 
+# 요청 시간/진행 중 요청 수 메트릭
+app.add_middleware(
+    RequestMetricsMiddleware,
+    paths=("/api/match", "/api/match/batch", "/api/jobs")
+)
+register_runtime_collector(
+    embedding_cache,
+    inference_pool,
+    embedding_flight,
+    job_queue,
+    admission_limiter if ADMISSION_ENABLED else None,
+)
+
 # CORS 설정 (Next.js에서 접근 허용)
 app.add_middleware(
     CORSMiddleware,
@@ -34,6 +166,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """
+    본문을 읽은 뒤의 추가 과금 거절 (일괄 매칭) → 미들웨어 거절과 같은 형식
+    """
+    return JSONResponse(
+        status_code=exc.status,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
+
 @app.get('/')
 async def root():
     """
@@ -45,75 +189,536 @@ async def root():
         "version": "1.0.0"
     }
 
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+CLIP_MODEL_ID = f"{CLIPService.MODEL_NAME}/{CLIPService.PRETRAINED}/{CLIPService.BACKEND}"
+if face_detector.enabled:
+    # 서버측 얼굴 감지를 켜면 같은 이미지라도 임베딩이 달라지므로 캐시 키 분리
+    CLIP_MODEL_ID += f"/face:{face_detector.kind}"
+
+
+async def read_image(file: UploadFile) -> bytes:
+    """
+    업로드 파일 검증 및 읽기
+    """
+    # 이미지 파일 검증
+    if not file.content_type or not file.content_type.startswith('image/'):
+        record_error("unsupported_type")
+        raise HTTPException(status_code=400, detail='이미지 파일만 업로드 가능합니다.')
+
+    try:
+        with stage_timer("upload_read"):
+            return await read_upload(file, MAX_FILE_SIZE)
+    except ImageTooLargeError:
+        record_error("too_large")
+        raise HTTPException(
+            status_code=413,
+            detail="파일이 너무 큽니다 (최대 10MB)"
+        )
+
+
+async def embed_image(image_data: bytes, face_box: Optional[FaceBox] = None) -> Tuple[str, np.ndarray]:
+    """
+    CLIP 임베딩 추출 (캐시 확인 후, 동시 요청과 묶어서 배치 추론)
+    - 같은 이미지가 동시에 여러 번 들어오면 추론은 1번만 실행하고 결과 공유
+    - 얼굴 박스가 있으면 얼굴 영역만 임베딩 (박스까지 캐시 키에 포함)
+
+    Returns:
+        (콘텐츠 해시, 임베딩)
+    """
+    model_id = CLIP_MODEL_ID if face_box is None else f"{CLIP_MODEL_ID}#box={','.join(map(str, face_box))}"
+    digest = content_digest(image_data, model_id)
+    user_embedding = await embedding_cache.get(digest)
+    if user_embedding is None:
+        user_embedding = await embedding_flight.do(digest, lambda: _extract_and_cache(digest, image_data, face_box))
+    else:
+        logger.debug("⚡ 캐시된 임베딩 사용")
+    return digest, user_embedding
+
+
+async def _extract_and_cache(digest: str, image_data: bytes, face_box: Optional[FaceBox]) -> np.ndarray:
+    user_embedding = await embedding_batcher.submit(image_data, face_box)
+    embedding_cache.put(digest, user_embedding)
+    logger.debug(f"✅ 임베딩 추출 완료 (차원: {user_embedding.shape})")
+    return user_embedding
+
+
+def log_match(
+    digest: str,
+    embedding: np.ndarray,
+    result: Dict[str, Any],
+    filters: Optional[MatchFilter] = None,
+) -> None:
+    """
+    임베딩 로그 기록 (EMBEDDING_LOG_DIR 설정 시)
+    - 필터 조건도 함께 기록 → 재매칭 시 같은 조건으로 비교
+    """
+    if not embedding_log.enabled:
+        return
+    top = result['top']
+    embedding_log.append(
+        digest,
+        embedding,
+        top['character'] if top is not None else None,
+        top['cosine'] if top is not None else 0.0,
+        matching_service.snapshot.version,
+        filters.to_dict() if filters is not None else None,
+    )
+
+
+def to_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    프론트엔드 호환성을 위한 응답 형식 변환
+    """
+    return {
+        "character": result['top']['character'],
+        "similarity": result['top']['score'],
+        "candidates": result['candidates']  # 추가 정보
+    }
+
+
+def ensure_ready() -> None:
+    """
+    모델/카탈로그 로딩 전 요청은 503으로 거절
+    """
+    if not startup_state.ready:
+        record_error("not_ready")
+        raise HTTPException(
+            status_code=503,
+            detail="서버가 아직 준비 중입니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "5"}
+        )
+
+
+def build_filter(
+    gender: Optional[str],
+    min_age: Optional[float],
+    max_age: Optional[float],
+    occupation: Optional[str],
+) -> Optional[MatchFilter]:
+    """
+    폼 필드 → 매칭 필터 (조건이 없으면 None)
+    - 조건에 맞는 캐릭터가 없으면 추론 전에 422로 거절
+    """
+    if min_age is not None and max_age is not None and min_age > max_age:
+        raise HTTPException(status_code=400, detail="min_age는 max_age보다 클 수 없습니다.")
+
+    filters = MatchFilter(gender=gender, min_age=min_age, max_age=max_age, occupation=occupation)
+    if filters.is_empty:
+        return None
+    if not matching_service.has_candidates(filters):
+        record_error("unmatched")
+        raise HTTPException(status_code=422, detail="조건에 맞는 캐릭터가 없습니다.")
+    return filters
+
+
+def queue_full_error() -> HTTPException:
+    record_error("queue_full")
+    # 추론 대기열이 넘칠 만큼 받았음 → 동시 처리 한도 감소
+    admission_limiter.on_overload()
+    return HTTPException(
+        status_code=503,
+        detail="서버가 혼잡합니다. 잠시 후 다시 시도해주세요.",
+        headers={"Retry-After": "1"}
+    )
+
+
+def to_http_error(e: Exception) -> HTTPException:
+    """
+    매칭 중 발생한 예외 → HTTP 오류 (에러 메트릭 기록 포함)
+    """
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, InferenceQueueFullError):
+        return queue_full_error()
+    if isinstance(e, ImageTooLargeError):
+        record_error("too_large")
+        return HTTPException(status_code=413, detail=str(e))
+    if isinstance(e, InvalidImageError):
+        record_error("invalid_image")
+        return HTTPException(status_code=400, detail=str(e))
+    record_error("internal")
+    logger.exception(f"❌ 매칭 중 오류: {str(e)}")
+    return HTTPException(status_code=500, detail=f"매칭 중 오류 발생: {str(e)}")
+
+
+def parse_box_field(face_box: Optional[str]) -> Optional[FaceBox]:
+    try:
+        return parse_face_box(face_box)
+    except ValueError as e:
+        record_error("invalid_image")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def match_image(
+    image_data: bytes,
+    box: Optional[FaceBox],
+    filters: Optional[MatchFilter],
+) -> Dict[str, Any]:
+    """
+    이미지 한 장 임베딩 + 매칭 (/api/match와 작업 큐 공용)
+
+    Returns:
+        to_response 형식의 매칭 결과
+    """
+    # 1. CLIP 임베딩 추출
+    digest, user_embedding = await embed_image(image_data, box)
+
+    # 2. 가장 닮은 캐릭터 찾기 (Top-3, 임계값 없음)
+    with stage_timer("matching"):
+        result = matching_service.find_best_match(
+            user_embedding,
+            top_k=3,
+            threshold=None,  # Unknown 처리 비활성화 (항상 매칭)
+            score_mode="percent",
+            filters=filters
+        )
+    log_match(digest, user_embedding, result, filters)
+
+    if result['top'] is None:
+        # Unknown 케이스 (임계값 설정 시)
+        record_error("unmatched")
+        raise HTTPException(status_code=422, detail="매칭 실패: 유사도가 너무 낮습니다.")
+
+    response = to_response(result)
+    logger.debug(f"✅ 매칭 완료: {response['character']['name']} ({response['similarity']}%)")
+    return response
+
+
+async def run_match_job(payload: Tuple[bytes, Optional[FaceBox], Optional[MatchFilter]]) -> Dict[str, Any]:
+    """
+    작업 큐 핸들러
+    - 추론 대기열 가득 참(InferenceQueueFullError)은 그대로 올려서 작업 큐가 재시도
+    """
+    try:
+        return await match_image(*payload)
+    except InferenceQueueFullError:
+        raise
+    except Exception as e:
+        raise to_http_error(e)
+
 
 @app.post('/api/match')
-async def match_character(file: UploadFile = File(...)) -> Dict[str, Any]:
+async def match_character(
+    file: UploadFile = File(...),
+    face_box: Optional[str] = Form(None),
+    gender: Optional[str] = Form(None),
+    min_age: Optional[float] = Form(None),
+    max_age: Optional[float] = Form(None),
+    occupation: Optional[str] = Form(None),
+) -> Dict[str, Any]:
     """
     캐릭터 매칭 엔드포인트
 
     Args:
         file: 업로드된 사용자 이미지
+        face_box: (선택) 얼굴 박스 "x,y,w,h" (원본 이미지 픽셀 좌표), 주어지면 얼굴 영역만 매칭
+        gender, min_age, max_age, occupation: (선택) 이 조건에 맞는 캐릭터 중에서만 매칭
 
     Returns:
         character: 매칭된 캐릭터 정보
         similarity: 유사도 (0-100)
         candidates: Top-3 후보 리스트 (선택적)
     """
+    ensure_ready()
+    filters = build_filter(gender, min_age, max_age, occupation)
+    box = parse_box_field(face_box)
+
     try:
-        # 이미지 파일 검증
-        if not file.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail='이미지 파일만 업로드 가능합니다.')
+        # 업로드된 이미지 읽기 → 임베딩 → 매칭
+        image_data = await read_image(file)
+        logger.debug(f"📸 이미지 분석 중: {file.filename}")
+        response = await match_image(image_data, box, filters)
+    except Exception as e:
+        raise to_http_error(e)
+
+    with stage_timer("serialization"):
+        return FragmentJSONResponse(content=response)
+
+
+@app.post('/api/match/batch')
+async def match_characters_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    gender: Optional[str] = Form(None),
+    min_age: Optional[float] = Form(None),
+    max_age: Optional[float] = Form(None),
+    occupation: Optional[str] = Form(None),
+) -> Dict[str, Any]:
+    """
+    여러 이미지 일괄 매칭 엔드포인트 (모더레이션 파이프라인 등 대량 처리용)
+
+    Args:
+        files: 업로드된 이미지 목록 (최대 MAX_BATCH_FILES개)
+        gender, min_age, max_age, occupation: (선택) 모든 이미지에 같은 필터 적용
+
+    Returns:
+        results: 입력 순서대로 {filename, character, similarity, candidates} 또는 {filename, error}
+    """
+    ensure_ready()
+    filters = build_filter(gender, min_age, max_age, occupation)
+
+    if len(files) > MAX_BATCH_FILES:
+        record_error("too_large")
+        raise HTTPException(
+            status_code=413,
+            detail=f"한 번에 최대 {MAX_BATCH_FILES}개까지 업로드 가능합니다."
+        )
+
+    logger.debug(f"📸 이미지 {len(files)}개 일괄 분석 중")
 
-        # 1. 업로드된 이미지 읽기
-        image_data = await file.read()
+    results: List[Dict[str, Any]] = [{"filename": f.filename} for f in files]
+    embeddings: Dict[int, Tuple[str, np.ndarray]] = {}
 
-        if len(image_data) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail="파일이 너무 큽니다 (최대 10MB)"
+    # 1. 읽기 + 임베딩 추출
+    # - 수락 제어: 미들웨어는 요청당 1개만 과금 → 이미지 수만큼 추가 과금 (슬롯/토큰)
+    # - 배치 크기 단위로 나눠 제출해서 추론 대기열을 혼자 다 차지하지 않도록 함
+    chunk_size = embedding_batcher.max_batch_size
+    async with admission_charge(request.scope, len(files)):
+        for start in range(0, len(files), chunk_size):
+            chunk = list(enumerate(files[start:start + chunk_size], start))
+            outcomes = await asyncio.gather(
+                *[_read_and_embed(file) for _, file in chunk],
+                return_exceptions=True
             )
-        
-        print(f"📸 이미지 분석 중: {file.filename}")
+            for (i, _), outcome in zip(chunk, outcomes):
+                if isinstance(outcome, InferenceQueueFullError):
+                    raise queue_full_error()
+                if isinstance(outcome, HTTPException):
+                    results[i]["error"] = outcome.detail
+                elif isinstance(outcome, ImageTooLargeError):
+                    record_error("too_large")
+                    results[i]["error"] = str(outcome)
+                elif isinstance(outcome, InvalidImageError):
+                    record_error("invalid_image")
+                    results[i]["error"] = str(outcome)
+                elif isinstance(outcome, Exception):
+                    record_error("internal")
+                    results[i]["error"] = f"임베딩 추출 실패: {str(outcome)}"
+                else:
+                    embeddings[i] = outcome
 
-        # 2. CLIP 임베딩 추출
-        user_embedding = clip_service.extract_embedding(image_data)
-        print(f"✅ 임베딩 추출 완료 (차원: {user_embedding.shape})")
+    # 2. 성공한 임베딩 전체를 한 번의 행렬곱으로 매칭
+    if embeddings:
+        order = sorted(embeddings)
+        with stage_timer("matching"):
+            matches = matching_service.find_best_matches(
+                np.stack([embeddings[i][1] for i in order], axis=0),
+                top_k=3,
+                threshold=None,
+                score_mode="percent",
+                filters=filters
+            )
+        for i, result in zip(order, matches):
+            log_match(*embeddings[i], result, filters)
+            if result['top'] is not None:
+                results[i].update(to_response(result))
+            else:
+                results[i]["error"] = "매칭 실패: 유사도가 너무 낮습니다."
 
-        # 3. 가장 닮은 캐릭터 찾기 (Top-3, 임계값 없음)
-        print("🔍 캐릭터 매칭 중...")
-        result = matching_service.find_best_match(
-            user_embedding,
-            top_k=3,
-            threshold=None,  # Unknown 처리 비활성화 (항상 매칭)
-            score_mode="percent"
+    logger.debug(f"✅ 일괄 매칭 완료: {len(embeddings)}/{len(files)}개 성공")
+    with stage_timer("serialization"):
+        return FragmentJSONResponse(content={"results": results})
+
+
+async def _read_and_embed(file: UploadFile) -> Tuple[str, np.ndarray]:
+    return await embed_image(await read_image(file))
+
+@app.post('/api/jobs', status_code=202)
+async def create_match_job(
+    file: UploadFile = File(...),
+    face_box: Optional[str] = Form(None),
+    gender: Optional[str] = Form(None),
+    min_age: Optional[float] = Form(None),
+    max_age: Optional[float] = Form(None),
+    occupation: Optional[str] = Form(None),
+) -> Dict[str, Any]:
+    """
+    비동기 매칭 작업 등록 (/api/match와 같은 입력, 결과는 나중에 조회)
+    - 우선순위는 클라이언트가 정하지 않음 (익명 요청이 다른 사용자를 굶길 수 있으므로), 모두 들어온 순서
+
+    Returns:
+        id: 작업 id
+        status: "queued"
+        position: 대기 순번 (0이면 다음 차례)
+    """
+    ensure_jobs_enabled()
+    ensure_ready()
+    filters = build_filter(gender, min_age, max_age, occupation)
+    box = parse_box_field(face_box)
+    image_data = await read_image(file)
+
+    try:
+        job = await job_queue.submit((image_data, box, filters))
+    except JobQueueFullError as e:
+        record_error("queue_full")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    return JSONResponse(
+        status_code=202,
+        content=job_queue.to_dict(job),
+        headers={"Location": f"/api/jobs/{job.id}"}
+    )
+
+
+def ensure_jobs_enabled() -> None:
+    """
+    작업 API 사용 가능 여부 확인 (워커 프로세스가 여럿이면 501)
+    """
+    if not job_queue.enabled:
+        raise HTTPException(
+            status_code=501,
+            detail="작업 API는 워커 프로세스가 하나일 때만 사용할 수 있습니다. /api/match를 사용하세요."
         )
 
-        # 프론트엔드 호환성을 위한 응답 형식 변환
-        if result['top'] is not None:
-            response = {
-                "character": result['top']['character'],
-                "similarity": result['top']['score'],
-                "candidates": result['candidates']  # 추가 정보
-            }
-            print(f"✅ 매칭 완료: {response['character']['name']} ({response['similarity']}%)")
-            return response
-        else:
-            # Unknown 케이스 (임계값 설정 시)
-            raise HTTPException(status_code=422, detail="매칭 실패: 유사도가 너무 낮습니다.")
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ 매칭 중 오류: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"매칭 중 오류 발생: {str(e)}")
-    
+
+def get_job_or_404(job_id: str):
+    ensure_jobs_enabled()
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업이 없거나 보관 기간이 지났습니다.")
+    return job
+
+
+@app.get('/api/jobs/{job_id}')
+async def get_match_job(job_id: str):
+    """
+    작업 상태 조회 (폴링)
+    - queued: position (대기 순번), running, done: result (/api/match 응답과 같음), failed: error {status, detail}
+    - 끝나지 않은 작업은 Retry-After로 다음 폴링 간격 안내
+    """
+    job = get_job_or_404(job_id)
+    headers = None if job.finished else {"Retry-After": "1"}
+    return FragmentJSONResponse(content=job_queue.to_dict(job), headers=headers)
+
+
+@app.get('/api/jobs/{job_id}/events')
+async def stream_match_job(job_id: str):
+    """
+    작업 상태 스트림 (Server-Sent Events)
+    - 상태나 대기 순번이 바뀔 때마다 이벤트 전송 (이벤트 이름 = 상태)
+    - done / failed 이벤트를 보낸 뒤 스트림 종료 (클라이언트가 끊으면 Starlette가 생성기 취소)
+    """
+    job = get_job_or_404(job_id)
+
+    async def events():
+        last = None
+        idle = 0
+        while True:
+            content = job_queue.to_dict(job)
+            state = (job.status, content.get("position"))
+            if state != last:
+                last, idle = state, 0
+                yield b"event: " + job.status.encode() + b"\ndata: " + encode_response(content) + b"\n\n"
+            if job.finished:
+                return
+            try:
+                # 대기 순번은 다른 작업이 빠질 때도 바뀌므로 1초마다 다시 확인
+                await asyncio.wait_for(job.changed.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                idle += 1
+                if idle % 15 == 0:
+                    # 프록시 유휴 연결 종료 방지
+                    yield b": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get('/portraits/{character_id}/{filename}')
+async def portrait(character_id: int, filename: str, if_none_match: str = Header(default="")):
+    """
+    미리 줄여 둔 캐릭터 초상화 (WebP)
+    - URL에 내용 해시가 들어 있으므로 1년 immutable 캐시 + 강한 ETag
+    - If-None-Match 일치 시 본문 없이 304
+    """
+    resolved = resolve_portrait(character_id, filename)
+    if resolved is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    path, etag = resolved
+    headers = {"ETag": etag, "Cache-Control": PORTRAIT_CACHE_CONTROL}
+    if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="image/webp", headers=headers)
+
 @app.get('/api/health')
 async def health_check():
     """
-    서버 상태 확인
+    서버 상태 확인 (liveness)
+    - 로딩 중에도 200을 반환해 플랫폼 health check가 재시작을 유발하지 않도록 함
+    """
+    return {"status": "healthy", "phase": startup_state.phase}
+
+@app.get('/api/health/live')
+async def liveness():
+    """
+    Liveness: 프로세스와 이벤트 루프가 응답하는지 확인
+    """
+    return {"status": "alive"}
+
+@app.get('/api/health/ready')
+async def readiness():
+    """
+    Readiness: 카탈로그/모델 로딩 및 워밍업 완료 여부와 단계별 소요 시간
+    """
+    status_code = 200 if startup_state.ready else 503
+    return JSONResponse(status_code=status_code, content=startup_state.to_dict())
+
+@app.post('/api/admin/reload')
+async def reload_catalog(x_admin_token: str = Header(default="")):
+    """
+    카탈로그 핫 리로드 (prototypes 파일 갱신 후 호출)
+    - 새 스냅샷을 백그라운드 스레드에서 만든 뒤 교체, 진행 중인 요청은 이전 스냅샷으로 처리
+    - X-Admin-Token 헤더 필요 (ADMIN_TOKEN 미설정 시 404)
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(x_admin_token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
+
+    try:
+        snapshot = await asyncio.to_thread(matching_service.reload)
+    except ReloadInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.exception(f"❌ 카탈로그 리로드 실패: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"카탈로그 리로드 실패 (기존 카탈로그 유지): {str(e)}")
+
+    return snapshot.to_dict()
+
+@app.get('/api/stats')
+async def inference_stats():
+    """
+    추론 워커 풀 상태 및 단계별 소요 시간
+    """
+    snapshot = matching_service.snapshot
+    return {
+        "executor": inference_pool.executor_type,
+        "workers": inference_pool.workers,
+        "pending": inference_pool.pending,
+        "max_queue": inference_pool.max_queue,
+        "stages": inference_pool.stats(),
+        "cache": embedding_cache.stats(),
+        "coalescing": embedding_flight.stats(),
+        "jobs": job_queue.stats(),
+        "admission": {
+            "enabled": ADMISSION_ENABLED,
+            **admission_limiter.stats(),
+            "clients": client_buckets.stats(),
+        },
+        "embedding_log": embedding_log.stats(),
+        "catalog": snapshot.to_dict() if snapshot is not None else None
+    }
+
+@app.get('/metrics')
+async def metrics():
+    """
+    Prometheus 메트릭 (텍스트 포맷)
     """
-    return {"status": "healthy"}
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
 if __name__ == "__main__":
     # 서버 실행
@@ -124,5 +729,5 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=port,
         reload=True,  # 개발 모드: 코드 변경 시 자동 재시작
-        log_level="info"
+        log_level=LOG_LEVEL.lower()
     )
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+IVF 인덱스 생성 스크립트
+- 프로토타입 행렬로 k-means coarse quantizer 학습
+- <프로토타입 경로>.ivf.npz 로 저장 (MATCH_INDEX=ivf 일 때 자동 로딩)
+- 전체 검색 대비 recall@k 및 평균 검색 시간 출력 (nprobe 조절용)
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.prototype_store import load_prototype_store, load_prototypes_json
+from services.vector_index import BruteForceIndex, IVFIndex
+
+
+def evaluate(index: IVFIndex, matrix: np.ndarray, k: int, queries: int, seed: int = 0) -> None:
+    """
+    nprobe별 recall@k / 검색 시간 측정
+    - 질의: 프로토타입에 노이즈를 섞은 벡터
+    """
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(matrix.shape[0], size=min(queries, matrix.shape[0]), replace=False)
+    q = np.asarray(matrix[picks]) + rng.normal(scale=0.05, size=(len(picks), matrix.shape[1]))
+    q = (q / np.linalg.norm(q, axis=1, keepdims=True)).astype(np.float32)
+
+    exact, _ = BruteForceIndex(matrix).search(q, k)
+
+    print(f"\n📊 recall@{k} (질의 {len(picks)}개)")
+    for nprobe in sorted({1, 2, 4, 8, 16, 32, index.nlist}):
+        if nprobe > index.nlist:
+            continue
+        index.nprobe = nprobe
+        start = time.perf_counter()
+        approx, _ = index.search(q, k)
+        elapsed = (time.perf_counter() - start) / len(picks) * 1000
+
+        recall = np.mean([len(set(a) & set(e)) / len(e) for a, e in zip(approx.tolist(), exact.tolist())])
+        print(f"  nprobe={nprobe:>4}  recall={recall:.3f}  {elapsed:.3f}ms/query")
+
+
+def build_index(source: Path, output: Path, nlist: int, iters: int, k: int, queries: int) -> None:
+    """
+    프로토타입으로 IVF 인덱스 생성 후 저장
+    """
+    print(f"🔄 {source.name} 로딩 중...")
+    if source.suffix == ".npy":
+        matrix, _, _ = load_prototype_store(str(source))
+    else:
+        matrix, _, _ = load_prototypes_json(str(source))
+    print(f"  ✅ {matrix.shape[0]}개 임베딩")
+
+    start = time.perf_counter()
+    index = IVFIndex.build(matrix, nlist=nlist or None, iters=iters)
+    print(f"✅ IVF 인덱스 생성 완료 (nlist={index.nlist}, {time.perf_counter() - start:.2f}s)")
+
+    index.save(str(output))
+    print(f"💾 저장 위치: {output}")
+
+    if queries > 0:
+        evaluate(index, matrix, k, queries)
+
+
+if __name__ == "__main__":
+    data_dir = Path(__file__).parent.parent / "data"
+
+    parser = argparse.ArgumentParser(description="프로토타입 IVF 인덱스 생성")
+    parser.add_argument("--source", type=Path, default=None, help="prototypes.npy 또는 prototypes.json")
+    parser.add_argument("--output", type=Path, default=None, help="기본값: <source>.ivf.npz")
+    parser.add_argument("--nlist", type=int, default=0, help="클러스터 수 (0이면 sqrt(N))")
+    parser.add_argument("--iters", type=int, default=20)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=200, help="recall 측정 질의 수 (0이면 생략)")
+    args = parser.parse_args()
+
+    source = args.source
+    if source is None:
+        source = data_dir / "prototypes.npy"
+        if not source.exists():
+            source = data_dir / "prototypes.json"
+    output = args.output or source.with_suffix(".ivf.npz")
+
+    build_index(source, output, args.nlist, args.iters, args.k, args.queries)
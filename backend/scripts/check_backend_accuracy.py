@@ -0,0 +1,120 @@
+"""
+추론 백엔드 정확도 검증 스크립트
+- 프로토타입 캐릭터 초상화를 fp32(torch)와 비교 대상 백엔드(int8 / onnx)로 각각 임베딩
+- 두 임베딩을 같은 프로토타입 집합에 매칭해 Top-1 일치율과 코사인 유사도 비교
+- 이미지는 --images-dir (파일명: <캐릭터 id>.webp 등) 또는 CDN에서 다운로드
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+import torch
+from PIL import Image
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.clip_engines import CLIP_BACKENDS, DEFAULT_ONNX_PATH, create_engine
+from services.clip_service import CLIPService
+from services.matching_service import MatchingService
+
+CDN_URL = "https://cdn.thesimpsonsapi.com"
+
+
+def load_portraits(metas: List[Dict], images_dir: Optional[Path], limit: int) -> Dict[int, bytes]:
+    """
+    캐릭터 초상화 바이트 수집
+    """
+    images: Dict[int, bytes] = {}
+    for meta in metas[:limit]:
+        char_id = meta.get("id")
+        portrait_path = meta.get("portrait_path")
+        if char_id is None or not portrait_path:
+            continue
+
+        try:
+            if images_dir is not None:
+                path = images_dir / Path(portrait_path).name
+                if not path.exists():
+                    continue
+                images[char_id] = path.read_bytes()
+            else:
+                response = requests.get(f"{CDN_URL}/500{portrait_path}", timeout=10)
+                response.raise_for_status()
+                images[char_id] = response.content
+        except Exception as e:
+            print(f"  ⚠️ {meta.get('name')} 이미지 로딩 실패: {str(e)}")
+
+    return images
+
+
+def embed_all(engine, images: List[bytes], batch_size: int) -> Tuple[np.ndarray, float]:
+    """
+    엔진으로 전체 이미지 임베딩 (L2 정규화) 및 이미지당 평균 forward 시간(ms)
+    """
+    chunks = []
+    elapsed = 0.0
+    for start in range(0, len(images), batch_size):
+        batch = torch.stack([
+            engine.preprocess(Image.open(io.BytesIO(data)).convert("RGB"))
+            for data in images[start:start + batch_size]
+        ])
+        t0 = time.perf_counter()
+        chunks.append(engine.encode(batch))
+        elapsed += time.perf_counter() - t0
+
+    emb = np.concatenate(chunks, axis=0)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+    return emb, elapsed / len(images) * 1000
+
+
+def check_accuracy(backend: str, images_dir: Optional[Path], limit: int, batch_size: int, onnx_path: str) -> None:
+    matching = MatchingService(index_type="brute")
+
+    print("🔄 초상화 이미지 수집 중...")
+    images = load_portraits(matching.prototypes_meta, images_dir, limit)
+    if not images:
+        print("❌ 비교할 이미지가 없습니다.")
+        return
+    print(f"  ✅ {len(images)}개 이미지\n")
+
+    device = torch.device('cpu')
+    print("🔄 fp32 기준 엔진 로딩 중...")
+    reference = create_engine("torch", CLIPService.MODEL_NAME, CLIPService.PRETRAINED, device)
+    print(f"🔄 {backend} 엔진 로딩 중...")
+    candidate = create_engine(backend, CLIPService.MODEL_NAME, CLIPService.PRETRAINED, device, onnx_path=onnx_path)
+
+    data = list(images.values())
+    ref_emb, ref_ms = embed_all(reference, data, batch_size)
+    cand_emb, cand_ms = embed_all(candidate, data, batch_size)
+
+    ref_top = [r["top"]["character"]["id"] for r in matching.find_best_matches(ref_emb, top_k=1)]
+    cand_top = [r["top"]["character"]["id"] for r in matching.find_best_matches(cand_emb, top_k=1)]
+
+    agreement = np.mean([a == b for a, b in zip(ref_top, cand_top)])
+    cosine = np.sum(ref_emb * cand_emb, axis=1)
+
+    print(f"\n{'='*60}")
+    print(f"📊 {backend} vs fp32 ({len(data)}개 이미지)")
+    print(f"  - Top-1 일치율: {agreement * 100:.2f}%")
+    print(f"  - 임베딩 코사인: 평균 {cosine.mean():.5f} / 최소 {cosine.min():.5f}")
+    print(f"  - forward 시간: fp32 {ref_ms:.1f}ms → {backend} {cand_ms:.1f}ms (이미지당)")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="추론 백엔드 Top-1 일치율 검증")
+    parser.add_argument("--backend", choices=[b for b in CLIP_BACKENDS if b != "torch"], default="int8")
+    parser.add_argument("--images-dir", type=Path, default=None, help="초상화 디렉토리 (없으면 CDN에서 다운로드)")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--onnx-path", default=DEFAULT_ONNX_PATH)
+    args = parser.parse_args()
+
+    check_accuracy(args.backend, args.images_dir, args.limit, args.batch_size, args.onnx_path)
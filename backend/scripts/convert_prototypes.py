@@ -0,0 +1,57 @@
+"""
+prototypes.json → 바이너리 저장소 변환 스크립트
+- data/prototypes.json을 읽어 L2 정규화된 행렬을 data/prototypes.npy로 저장
+- 메타데이터는 data/prototypes.meta.json으로 분리
+- --max-per-character: 캐릭터별 임베딩을 k-means 중심 N개로 축약 (검색 비용 상한)
+- MatchingService는 .npy가 있으면 자동으로 memmap 로딩
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.prototype_store import (
+    SUPPORTED_DTYPES,
+    collapse_prototypes,
+    load_prototypes_json,
+    save_prototype_store,
+)
+
+
+def convert_prototypes(source: Path, output: Path, dtype: str, max_per_character: int = 0) -> None:
+    """
+    JSON 프로토타입을 바이너리 저장소로 변환
+    """
+    print(f"🔄 {source.name} 로딩 중...")
+    matrix, metas, offsets = load_prototypes_json(str(source))
+    print(f"  ✅ 캐릭터 {len(metas)}개, {matrix.shape[0]}개 임베딩 (차원: {matrix.shape[1]})")
+
+    if max_per_character > 0:
+        matrix, offsets = collapse_prototypes(matrix, offsets, max_per_character)
+        print(f"  🔀 캐릭터당 최대 {max_per_character}개로 축약 → {matrix.shape[0]}개 임베딩")
+
+    matrix_path, meta_path = save_prototype_store(str(output), matrix, metas, dtype=dtype, offsets=offsets)
+
+    json_size = source.stat().st_size
+    bin_size = Path(matrix_path).stat().st_size + Path(meta_path).stat().st_size
+
+    print(f"\n💾 저장 완료 ({dtype})")
+    print(f"  - 행렬: {matrix_path}")
+    print(f"  - 메타: {meta_path}")
+    print(f"  - 크기: {json_size / 1024:.1f}KB → {bin_size / 1024:.1f}KB")
+
+
+if __name__ == "__main__":
+    data_dir = Path(__file__).parent.parent / "data"
+
+    parser = argparse.ArgumentParser(description="prototypes.json을 memmap 가능한 바이너리 저장소로 변환")
+    parser.add_argument("--source", type=Path, default=data_dir / "prototypes.json")
+    parser.add_argument("--output", type=Path, default=data_dir / "prototypes.npy")
+    parser.add_argument("--dtype", choices=SUPPORTED_DTYPES, default="float32")
+    parser.add_argument("--max-per-character", type=int, default=0, help="캐릭터별 k-means 중심 수 (0이면 축약 안 함)")
+    args = parser.parse_args()
+
+    convert_prototypes(args.source, args.output, args.dtype, args.max_per_character)
@@ -0,0 +1,54 @@
+"""
+CLIP 이미지 인코더 ONNX export 스크립트
+- open_clip ViT-B-32 visual tower만 export (텍스트 타워 제외)
+- 배치 차원은 동적 축으로 지정
+- CLIP_BACKEND=onnx 일 때 CLIP_ONNX_PATH (기본값: data/clip_visual.onnx)에서 로딩
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import torch
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.clip_engines import DEFAULT_ONNX_PATH, load_visual_tower
+from services.clip_service import CLIPService
+
+
+def export_onnx(output: Path, opset: int) -> None:
+    """
+    fp32 visual tower를 ONNX로 export
+    """
+    print("🔄 CLIP 이미지 인코더 로딩 중...")
+    visual, _ = load_visual_tower(CLIPService.MODEL_NAME, CLIPService.PRETRAINED)
+    image_size = visual.image_size
+    if isinstance(image_size, int):
+        image_size = (image_size, image_size)
+
+    dummy = torch.randn(1, 3, *image_size)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    print(f"🔄 ONNX export 중 (opset {opset})...")
+    torch.onnx.export(
+        visual,
+        dummy,
+        str(output),
+        input_names=["pixel_values"],
+        output_names=["image_embeds"],
+        dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+        opset_version=opset,
+    )
+
+    print(f"✅ 저장 위치: {output} ({output.stat().st_size / 1024 / 1024:.1f}MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CLIP visual tower ONNX export")
+    parser.add_argument("--output", type=Path, default=Path(DEFAULT_ONNX_PATH).resolve())
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    export_onnx(args.output, args.opset)
@@ -1,131 +1,401 @@
 """
 캐릭터 임베딩 생성 스크립트
-- The Simpsons API에서 캐릭터 목록 조회
-- 각 캐릭터 이미지를 CLIP으로 임베딩 추출
-- data/prototypes.json에 저장
+- The Simpsons API에서 캐릭터 목록 조회 (페이지 병렬 조회)
+- 초상화 이미지 병렬 다운로드 (커넥션 풀 세션 + 로컬 이미지 캐시)
+- CLIP 배치 임베딩 추출
+- 캐릭터당 여러 임베딩: --augment (좌우 반전/중앙 크롭), --extra-images DIR/<id>/*
+- 배치마다 체크포인트 기록 → 중단 후 재실행 시 이어서 진행
+- --incremental: 이미지 해시가 바뀐 캐릭터만 다시 임베딩 (--refresh-images와 함께 쓰면 CDN 변경 감지)
+- 초상화 크기별 WebP 변형을 --portraits-dir에 저장하고 URL을 메타데이터 "portraits"에 기록
+- data/prototypes.json + data/prototypes.npy(바이너리 저장소)에 저장
+
+오프라인 실행 (--fixtures DIR):
+    DIR/api/page-1.json, page-2.json ...   ← API 응답 ({"results": [...]})
+    DIR/cdn/500/character/1.webp ...       ← CDN 이미지
 """
 
-import requests
+import argparse
+import hashlib
+import io
 import json
 import os
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import requests
+from PIL import Image, ImageOps
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # 프로젝트 루트를 sys.path에 추가
 sys.path.append(str(Path(__file__).parent.parent))
 
 from services.clip_service import clip_service
+from services.portrait_store import PORTRAIT_DIR, save_portraits
+from services.prototype_store import l2_normalize, save_prototype_store
+
+API_URL = "https://thesimpsonsapi.com/api/characters"
+CDN_URL = "https://cdn.thesimpsonsapi.com"
+DATA_DIR = Path(__file__).parent.parent / "data"
 
-def fetch_characters(max_pages=25):
+META_FIELDS = ("id", "name", "age", "gender", "occupation", "portrait_path", "portraits")
+EXTRA_IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp")
+
+
+class Fetcher:
     """
-    The Simpsons API에서 캐릭터 목록 조회
-    - 페이지네이션 방식 (페이지당 20개)
+    HTTP(S) / file:// 공용 다운로더
+    - HTTP: 커넥션 풀 + 재시도 세션 (스레드 간 공유)
+    - file://: 로컬 픽스처 디렉토리 (오프라인 테스트용)
     """
-    api_url = "https://thesimpsonsapi.com/api/characters"
-    cdn_url = "https://cdn.thesimpsonsapi.com"
-    
-    print(f"🔄 캐릭터 목록 조회 중...")
-    
-    all_characters = []
-    
-    for page in range(1, max_pages + 1):
+
+    def __init__(self, pool_size: int = 8, timeout: float = 10):
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url: str) -> bytes:
+        if url.startswith("file://"):
+            with open(url[len("file://"):], "rb") as f:
+                return f.read()
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+
+def page_url(api_url: str, page: int) -> str:
+    if api_url.startswith("file://"):
+        return f"{api_url}/page-{page}.json"
+    return f"{api_url}?page={page}"
+
+
+def fetch_characters(fetcher: Fetcher, api_url: str, cdn_url: str, max_pages: int, workers: int) -> List[Dict[str, Any]]:
+    """
+    캐릭터 목록 조회
+    - 페이지를 병렬로 요청하고, 첫 실패/빈 페이지 이전까지만 사용
+    """
+    print("🔄 캐릭터 목록 조회 중...")
+
+    def fetch_page(page: int) -> Optional[List[Dict[str, Any]]]:
         try:
-            print(f"  📄 페이지 {page} 조회 중...")
-            response = requests.get(f"{api_url}?page={page}", timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            characters = data.get('results', [])
-            
-            # portrait_path를 전체 URL로 변환
-            for char in characters:
-                portrait_path = char.get('portrait_path')
-                if portrait_path:
-                    # "/character/1.webp" → "https://cdn.thesimpsonsapi.com/500/character/1.webp"
-                    char['image_url'] = f"{cdn_url}/500{portrait_path}"
-            
-            all_characters.extend(characters)
-            print(f"  ✅ {len(characters)}개 캐릭터 조회")
-            
+            return json.loads(fetcher.get(page_url(api_url, page))).get("results", [])
         except Exception as e:
             print(f"  ❌ 페이지 {page} 조회 실패: {str(e)}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pages = list(executor.map(fetch_page, range(1, max_pages + 1)))
+
+    all_characters = []
+    for page, characters in enumerate(pages, 1):
+        if not characters:
             break
-    
+        for char in characters:
+            portrait_path = char.get("portrait_path")
+            if portrait_path:
+                # "/character/1.webp" → "https://cdn.thesimpsonsapi.com/500/character/1.webp"
+                char["image_url"] = f"{cdn_url}/500{portrait_path}"
+        all_characters.extend(characters)
+        print(f"  📄 페이지 {page}: {len(characters)}개")
+
     print(f"✅ 총 {len(all_characters)}개 캐릭터 조회 완료\n")
     return all_characters
 
-def download_image(url: str) -> bytes:
+
+def load_image(fetcher: Fetcher, character: Dict[str, Any], cache_dir: Path, refresh: bool = False) -> bytes:
+    """
+    초상화 이미지 로딩 (로컬 캐시 우선, 없으면 다운로드 후 캐시)
+    - refresh: 캐시를 무시하고 다시 다운로드 (CDN 이미지 변경 감지용)
+    """
+    cache_path = cache_dir / character["portrait_path"].lstrip("/")
+    if cache_path.exists() and not refresh:
+        return cache_path.read_bytes()
+
+    data = fetcher.get(character["image_url"])
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, cache_path)
+    return data
+
+
+def augmented_views(data: bytes, crop: float = 0.85) -> List[bytes]:
+    """
+    초상화 증강 뷰 (좌우 반전, 중앙 크롭)
+    """
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    width, height = image.size
+    dx, dy = int(width * (1 - crop) / 2), int(height * (1 - crop) / 2)
+
+    views = []
+    for view in (ImageOps.mirror(image), image.crop((dx, dy, width - dx, height - dy))):
+        buffer = io.BytesIO()
+        view.save(buffer, format="PNG")
+        views.append(buffer.getvalue())
+    return views
+
+
+def character_images(
+    character: Dict[str, Any],
+    portrait: bytes,
+    augment: bool,
+    extra_dir: Optional[Path],
+) -> List[bytes]:
+    """
+    캐릭터 하나의 임베딩 대상 이미지 목록 (초상화 → 증강 뷰 → 추가 이미지 순서)
+    """
+    images = [portrait]
+    if augment:
+        images.extend(augmented_views(portrait))
+    if extra_dir is not None:
+        char_dir = extra_dir / str(character["id"])
+        if char_dir.is_dir():
+            images.extend(
+                path.read_bytes() for path in sorted(char_dir.iterdir())
+                if path.suffix.lower() in EXTRA_IMAGE_SUFFIXES
+            )
+    return images
+
+
+def images_digest(images: List[bytes], augment: bool) -> str:
+    """
+    이미지 목록 해시 (이미지/증강 설정이 바뀌면 다시 임베딩)
+    """
+    h = hashlib.sha256(b"augment" if augment else b"plain")
+    for data in images:
+        h.update(hashlib.sha256(data).digest())
+    return h.hexdigest()
+
+
+def load_checkpoint(path: Path) -> Dict[Any, Dict[str, Any]]:
     """
-    이미지 URL에서 바이트 데이터 다운로드
+    체크포인트(JSON Lines) 로딩 → {캐릭터 id: 프로토타입}
+    - 중단 시 마지막 줄이 잘렸을 수 있으므로 파싱 실패 줄은 무시
     """
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()
-    return response.content
+    done: Dict[Any, Dict[str, Any]] = {}
+    if not path.exists():
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                proto = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[proto["id"]] = proto
+    return done
+
+
+def load_previous(path: Path) -> Dict[Any, Dict[str, Any]]:
+    """
+    이전 실행 결과 로딩 (incremental 모드) → {캐릭터 id: 프로토타입}
+    """
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {proto["id"]: proto for proto in json.load(f) if "image_sha256" in proto}
+
+
+def to_prototype(character: Dict[str, Any], image_sha256: str, embeddings: List[List[float]]) -> Dict[str, Any]:
+    """
+    프로토타입 항목 (임베딩이 1개면 "embedding", 여러 개면 "embeddings")
+    """
+    proto = {field: character.get(field) for field in META_FIELDS}
+    proto["image_sha256"] = image_sha256
+    if len(embeddings) == 1:
+        proto["embedding"] = embeddings[0]
+    else:
+        proto["embeddings"] = embeddings
+    return proto
+
 
-def generate_prototypes():
+def proto_embeddings(proto: Dict[str, Any]) -> List[List[float]]:
+    return proto["embeddings"] if "embeddings" in proto else [proto["embedding"]]
+
+
+def embed_batch(batch: List[Dict[str, Any]], images: List[List[bytes]]) -> List[Optional[List[List[float]]]]:
+    """
+    배치 임베딩 (캐릭터별 이미지 목록을 펼쳐 한 번에 추론)
+    - 실패 시 캐릭터 단위로 재시도해서 실패 캐릭터만 제외
+    """
+    flat = [data for char_images in images for data in char_images]
+    try:
+        embeddings = [emb.tolist() for emb in clip_service.extract_embeddings(flat)]
+    except Exception:
+        results: List[Optional[List[List[float]]]] = []
+        for character, char_images in zip(batch, images):
+            try:
+                results.append([emb.tolist() for emb in clip_service.extract_embeddings(char_images)])
+            except Exception as e:
+                print(f"  ❌ {character.get('name')} 임베딩 실패: {str(e)}")
+                results.append(None)
+        return results
+
+    results = []
+    start = 0
+    for char_images in images:
+        results.append(embeddings[start:start + len(char_images)])
+        start += len(char_images)
+    return results
+
+
+def generate_prototypes(
+    api_url: str = API_URL,
+    cdn_url: str = CDN_URL,
+    max_pages: int = 25,
+    workers: int = 8,
+    batch_size: int = 16,
+    cache_dir: Path = DATA_DIR / "images",
+    output_path: Path = DATA_DIR / "prototypes.json",
+    incremental: bool = False,
+    refresh_images: bool = False,
+    augment: bool = False,
+    extra_dir: Optional[Path] = None,
+    portraits_dir: Optional[Path] = Path(PORTRAIT_DIR),
+) -> None:
     """
     모든 캐릭터의 임베딩 생성 및 저장
     """
-    # 캐릭터 목록 조회 (5페이지 = 100개)
-    characters = fetch_characters(max_pages=25)
-    
-    prototypes = []
-    success_count = 0
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = output_path.with_suffix(".checkpoint.jsonl")
+    fetcher = Fetcher(pool_size=workers)
+
+    characters = [
+        c for c in fetch_characters(fetcher, api_url, cdn_url, max_pages, workers)
+        if c.get("image_url") and c.get("id") is not None
+    ]
+
+    done = load_checkpoint(checkpoint_path)
+    previous = load_previous(output_path) if incremental else {}
+    if done:
+        print(f"♻️ 체크포인트에서 {len(done)}개 이어서 진행")
+
+    pending = [c for c in characters if c["id"] not in done]
+    reused = 0
     fail_count = 0
-    
-    for idx, character in enumerate(characters, 1):
-        try:
-            name = character.get('name', 'Unknown')
-            print(f"[{idx}/{len(characters)}] {name}")
-            
-            # 이미지 URL 가져오기
-            image_url = character.get('image_url')
-            
-            if not image_url:
-                print(f"  ⚠️ 이미지 URL 없음")
-                fail_count += 1
-                continue
-            
-            # 이미지 다운로드
-            print(f"  📥 이미지 다운로드 중...")
-            image_data = download_image(image_url)
-            
-            # CLIP 임베딩 추출
-            print(f"  🔄 임베딩 추출 중...")
-            embedding = clip_service.extract_embedding(image_data)
-            
-            # 결과 저장
-            prototypes.append({
-                "id": character.get('id'),
-                "name": character.get('name'),
-                "age": character.get('age'),
-                "gender": character.get('gender'),
-                "occupation": character.get('occupation'),
-                "portrait_path": character.get('portrait_path'),
-                "embedding": embedding.tolist()  # numpy → list 변환
-            })
-            
-            success_count += 1
-            print(f"  ✅ 성공\n")
-        
-        except Exception as e:
-            print(f"  ❌ 실패: {str(e)}\n")
-            fail_count += 1
-    
-    # data 폴더 생성
-    data_dir = Path(__file__).parent.parent / "data"
-    data_dir.mkdir(exist_ok=True)
-    
-    # JSON 파일로 저장
-    output_path = data_dir / "prototypes.json"
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(prototypes, f, ensure_ascii=False, indent=2)
-    
+
+    with ThreadPoolExecutor(max_workers=workers) as executor, \
+            open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        # 모든 다운로드를 먼저 예약 → 임베딩하는 동안 다음 배치 이미지가 미리 받아짐
+        downloads: Dict[Any, Future] = {
+            c["id"]: executor.submit(load_image, fetcher, c, cache_dir, refresh_images) for c in pending
+        }
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            print(f"[{min(start + batch_size, len(pending))}/{len(pending)}] 배치 처리 중...")
+
+            to_embed: List[Dict[str, Any]] = []
+            images: List[List[bytes]] = []
+            hashes: Dict[Any, str] = {}
+            new_protos: List[Dict[str, Any]] = []
+
+            for character in batch:
+                try:
+                    data = downloads.pop(character["id"]).result()
+                    char_images = character_images(character, data, augment, extra_dir)
+                except Exception as e:
+                    print(f"  ❌ {character.get('name')} 이미지 준비 실패: {str(e)}")
+                    fail_count += 1
+                    continue
+
+                if portraits_dir is not None:
+                    try:
+                        character["portraits"] = save_portraits(character["id"], data, str(portraits_dir))
+                    except Exception as e:
+                        # 초상화 변형이 없으면 프론트엔드가 CDN 이미지를 사용
+                        print(f"  ⚠️ {character.get('name')} 초상화 저장 실패: {str(e)}")
+
+                sha = images_digest(char_images, augment) if len(char_images) > 1 else hashlib.sha256(data).hexdigest()
+                prev = previous.get(character["id"])
+                if prev is not None and prev.get("image_sha256") == sha:
+                    # 이미지가 바뀌지 않았으면 이전 임베딩 재사용
+                    new_protos.append(to_prototype(character, sha, proto_embeddings(prev)))
+                    reused += 1
+                    continue
+
+                hashes[character["id"]] = sha
+                to_embed.append(character)
+                images.append(char_images)
+
+            if to_embed:
+                for character, embedding in zip(to_embed, embed_batch(to_embed, images)):
+                    if embedding is None:
+                        fail_count += 1
+                        continue
+                    new_protos.append(to_prototype(character, hashes[character["id"]], embedding))
+
+            for proto in new_protos:
+                done[proto["id"]] = proto
+                checkpoint.write(json.dumps(proto, ensure_ascii=False) + "\n")
+            checkpoint.flush()
+
+    # API 순서대로 정렬 (API에서 사라진 캐릭터는 제외)
+    prototypes = [done[c["id"]] for c in characters if c["id"] in done]
+    if not prototypes:
+        print("❌ 생성된 임베딩이 없습니다.")
+        return
+
+    tmp_path = output_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(prototypes, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, output_path)
+
+    # 바이너리 저장소도 함께 갱신 (MatchingService는 .npy를 우선 로딩하므로 항상 동기화)
+    rows = [proto_embeddings(p) for p in prototypes]
+    matrix = l2_normalize(np.array([emb for char_rows in rows for emb in char_rows], dtype=np.float32))
+    offsets = np.concatenate([[0], np.cumsum([len(char_rows) for char_rows in rows])])
+    metas = [{k: v for k, v in p.items() if k not in ("embedding", "embeddings")} for p in prototypes]
+    npy_path, _ = save_prototype_store(str(output_path.with_suffix(".npy")), matrix, metas, offsets=offsets)
+
+    checkpoint_path.unlink(missing_ok=True)
+
     print(f"\n{'='*60}")
-    print(f"✅ 총 {success_count}개 캐릭터 임베딩 생성 완료")
+    print(f"✅ 총 {len(prototypes)}개 캐릭터, {matrix.shape[0]}개 임베딩 저장 (재사용 {reused}개)")
     print(f"❌ 실패: {fail_count}개")
-    print(f"💾 저장 위치: {output_path}")
+    print(f"💾 저장 위치: {output_path}, {npy_path}")
     print(f"{'='*60}")
 
+
 if __name__ == "__main__":
-    generate_prototypes()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="캐릭터 프로토타입 임베딩 생성")
+    parser.add_argument("--api-url", default=API_URL)
+    parser.add_argument("--cdn-url", default=CDN_URL)
+    parser.add_argument("--fixtures", type=Path, default=None, help="오프라인 픽스처 디렉토리 (api/, cdn/)")
+    parser.add_argument("--max-pages", type=int, default=25)
+    parser.add_argument("--workers", type=int, default=8, help="동시 다운로드 수")
+    parser.add_argument("--batch-size", type=int, default=16, help="CLIP 배치 크기")
+    parser.add_argument("--cache-dir", type=Path, default=DATA_DIR / "images")
+    parser.add_argument("--output", type=Path, default=DATA_DIR / "prototypes.json")
+    parser.add_argument("--incremental", action="store_true", help="이미지가 바뀐 캐릭터만 다시 임베딩")
+    parser.add_argument("--refresh-images", action="store_true", help="이미지 캐시를 무시하고 다시 다운로드")
+    parser.add_argument("--augment", action="store_true", help="좌우 반전/중앙 크롭 뷰도 임베딩 (캐릭터당 3개)")
+    parser.add_argument("--extra-images", type=Path, default=None, help="캐릭터별 추가 이미지 디렉토리 (DIR/<id>/*.png)")
+    parser.add_argument("--portraits-dir", type=Path, default=Path(PORTRAIT_DIR), help="크기별 초상화 저장 디렉토리")
+    parser.add_argument("--no-portraits", action="store_true", help="초상화 변형을 만들지 않음 (CDN 이미지 사용)")
+    args = parser.parse_args()
+
+    api_url, cdn_url = args.api_url, args.cdn_url
+    if args.fixtures is not None:
+        fixtures = args.fixtures.resolve()
+        api_url, cdn_url = f"file://{fixtures / 'api'}", f"file://{fixtures / 'cdn'}"
+
+    generate_prototypes(
+        api_url=api_url,
+        cdn_url=cdn_url,
+        max_pages=args.max_pages,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        cache_dir=args.cache_dir,
+        output_path=args.output,
+        incremental=args.incremental,
+        refresh_images=args.refresh_images,
+        augment=args.augment,
+        extra_dir=args.extra_images,
+        portraits_dir=None if args.no_portraits else args.portraits_dir,
+    )
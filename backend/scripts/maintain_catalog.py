@@ -0,0 +1,217 @@
+"""
+카탈로그 정리 스크립트
+- --remove-real-people: 실제 인물 캐릭터 제거 (이름 패턴 전체를 정규식 하나로 검사)
+- --near-duplicates T: 코사인 T 이상인 프로토타입 쌍 탐지 (블록 단위 N×N, 메모리 상한)
+  - 같은 캐릭터 안의 중복 행은 제거 → 캐릭터당 행 수와 쿼리당 매칭 비용 감소
+  - 다른 캐릭터끼리 겹치면 보고, --drop-duplicate-characters면 뒤쪽 캐릭터 제거
+- --sort-by gender: 캐릭터를 필드 값 순서로 재배치 → 서버의 값별 필터 부분 행렬(MATCH_FILTER_PARTITIONS)이
+  memmap 슬라이스가 되어 복사본을 만들지 않음
+- 출력은 확장자로 형식 결정: .npy (바이너리 저장소) / .json (compact prototypes.json)
+  - 남길 행만 청크 단위로 출력 파일에 바로 기록 (필터링된 행렬 복사본을 만들지 않음)
+  - 기존 파일을 덮어쓰면 .backup으로 복사해 둠, 실행 중인 서버는 파일 변경을 감지해 리로드
+
+    python scripts/maintain_catalog.py --remove-real-people --near-duplicates 0.98
+    python scripts/maintain_catalog.py --source data/prototypes.json --output data/prototypes.json --output data/prototypes.npy --remove-real-people
+    python scripts/maintain_catalog.py --sort-by gender
+"""
+
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.catalog_maintenance import (
+    BLOCK_ROWS,
+    REAL_PERSON_PATTERN,
+    duplicate_characters,
+    find_near_duplicates,
+)
+from services.metadata_index import PARTITION_FIELDS
+from services.prototype_store import (
+    SUPPORTED_DTYPES,
+    load_prototype_store,
+    load_prototypes_json,
+    meta_path_for,
+    save_prototype_store,
+    save_prototypes_json,
+)
+
+
+def load_catalog(source: Path):
+    if source.suffix == ".npy":
+        return load_prototype_store(str(source))
+    return load_prototypes_json(str(source))
+
+
+def select_rows(offsets: np.ndarray, keep_chars: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    남길 캐릭터의 (행 번호, 새 offsets)
+    """
+    counts = np.diff(offsets)
+    rows = np.flatnonzero(np.repeat(keep_chars, counts))
+    new_offsets = np.concatenate([[0], np.cumsum(counts[keep_chars])]).astype(np.int64)
+    return rows, new_offsets
+
+
+def sort_characters(
+    rows: np.ndarray,
+    offsets: np.ndarray,
+    metas: List[dict],
+    field: str,
+) -> Tuple[np.ndarray, np.ndarray, List[dict]]:
+    """
+    캐릭터를 필드 값(대소문자 무시) 순서로 재배치 (같은 값 안에서는 기존 순서 유지)
+    """
+    keys = [str(meta.get(field) or "").strip().lower() for meta in metas]
+    order = sorted(range(len(metas)), key=lambda c: keys[c])
+    counts = np.diff(offsets)
+    new_rows = np.concatenate([rows[offsets[c]:offsets[c + 1]] for c in order])
+    new_offsets = np.concatenate([[0], np.cumsum(counts[order])]).astype(np.int64)
+    return new_rows, new_offsets, [metas[c] for c in order]
+
+
+def backup(path: Path) -> None:
+    """
+    덮어쓸 파일을 .backup으로 복사 (재인코딩 없이 파일 복사)
+    """
+    paths = [path, Path(meta_path_for(str(path)))] if path.suffix == ".npy" else [path]
+    for p in paths:
+        if p.exists():
+            shutil.copy2(p, p.with_name(p.name + ".backup"))
+
+
+def maintain_catalog(
+    source: Path,
+    outputs: List[Path],
+    remove_real_people: bool = False,
+    near_duplicates: float = 0.0,
+    drop_duplicate_characters: bool = False,
+    block_rows: int = BLOCK_ROWS,
+    dtype: str = "float32",
+    show: int = 20,
+    dry_run: bool = False,
+    make_backup: bool = True,
+    sort_by: Optional[str] = None,
+) -> None:
+    """
+    카탈로그 정리 후 outputs에 저장
+    """
+    print(f"🔄 {source.name} 로딩 중...")
+    matrix, metas, offsets = load_catalog(source)
+    print(f"  ✅ 캐릭터 {len(metas)}개, {matrix.shape[0]}개 임베딩 (차원: {matrix.shape[1]})\n")
+
+    keep_chars = np.ones(len(metas), dtype=bool)
+
+    # 1. 실제 인물 제거 (이름당 정규식 검색 1번)
+    if remove_real_people:
+        print("🔍 실제 사람 캐릭터 검색 중...")
+        for c, meta in enumerate(metas):
+            if REAL_PERSON_PATTERN.search(meta.get("name") or ""):
+                keep_chars[c] = False
+                print(f"  ❌ 제거: {meta.get('name')}")
+        print(f"  → {int((~keep_chars).sum())}개 제거\n")
+
+    rows, sub_offsets = select_rows(offsets, keep_chars)
+    keep_rows = np.ones(rows.shape[0], dtype=bool)
+
+    # 2. 중복에 가까운 프로토타입 (남은 캐릭터 대상)
+    if near_duplicates > 0:
+        print(f"🔍 중복 프로토타입 검색 중 (코사인 ≥ {near_duplicates}, 블록 {block_rows}행)...")
+        start = time.perf_counter()
+        redundant, pairs = find_near_duplicates(matrix, sub_offsets, near_duplicates, block_rows, rows)
+        elapsed = time.perf_counter() - start
+        print(f"  ✅ {rows.shape[0]}×{rows.shape[0]} 유사도 검사 {elapsed:.2f}s")
+        print(f"  - 같은 캐릭터 안의 중복 행: {int(redundant.sum())}개 제거")
+        keep_rows &= ~redundant
+
+        kept_chars = np.flatnonzero(keep_chars)
+        print(f"  - 서로 겹치는 캐릭터 쌍: {len(pairs)}개")
+        for (a, b), sim in sorted(pairs.items(), key=lambda item: -item[1])[:show]:
+            name_a, name_b = metas[kept_chars[a]].get("name"), metas[kept_chars[b]].get("name")
+            print(f"    {name_a} ↔ {name_b}: {sim:.4f}")
+
+        if drop_duplicate_characters and pairs:
+            dropped = duplicate_characters(pairs)
+            row_chars = np.repeat(np.arange(len(kept_chars)), np.diff(sub_offsets))
+            keep_rows &= ~np.isin(row_chars, dropped)
+            keep_chars[kept_chars[dropped]] = False
+            print(f"  - 겹치는 뒤쪽 캐릭터 {len(dropped)}개 제거")
+        print()
+
+    # 최종 행/offsets (캐릭터별 남은 행 수로 다시 계산)
+    row_chars = np.repeat(np.arange(len(metas)), np.diff(offsets))[rows]
+    final_rows = rows[keep_rows]
+    counts = np.bincount(row_chars[keep_rows], minlength=len(metas))[keep_chars]
+    final_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    final_metas = [meta for meta, keep in zip(metas, keep_chars) if keep]
+
+    # 3. 필드 값 순서로 재배치 (값별 행이 연속 → 서버 필터 부분 행렬이 복사 없는 슬라이스)
+    if sort_by and final_metas:
+        final_rows, final_offsets, final_metas = sort_characters(final_rows, final_offsets, final_metas, sort_by)
+        print(f"🔀 {sort_by} 순서로 재배치\n")
+
+    print("📊 결과:")
+    print(f"  - 캐릭터: {len(metas)}개 → {len(final_metas)}개")
+    print(f"  - 임베딩: {matrix.shape[0]}개 → {final_rows.shape[0]}개")
+
+    if dry_run:
+        print("\n(--dry-run: 저장하지 않음)")
+        return
+    if not final_metas:
+        print("❌ 남은 캐릭터가 없어 저장하지 않습니다.")
+        sys.exit(1)
+
+    for output in outputs:
+        if make_backup and output.exists():
+            backup(output)
+        # 남길 행만 청크 단위로 기록 → 원본이 memmap이면 필요한 페이지만 읽음
+        if output.suffix == ".npy":
+            save_prototype_store(str(output), matrix, final_metas, dtype=dtype, offsets=final_offsets, rows=final_rows)
+        else:
+            save_prototypes_json(str(output), matrix, final_metas, final_offsets, rows=final_rows)
+        print(f"💾 저장: {output}")
+
+
+def default_source(data_dir: Path) -> Path:
+    npy_path = data_dir / "prototypes.npy"
+    return npy_path if npy_path.exists() else data_dir / "prototypes.json"
+
+
+if __name__ == "__main__":
+    data_dir = Path(__file__).parent.parent / "data"
+
+    parser = argparse.ArgumentParser(description="카탈로그 정리 (실제 인물 제거, 중복 프로토타입 제거)")
+    parser.add_argument("--source", type=Path, default=None, help="기본값: data/prototypes.npy 또는 data/prototypes.json")
+    parser.add_argument("--output", type=Path, action="append", default=None, help=".npy 또는 .json (여러 번 지정 가능, 기본값: --source)")
+    parser.add_argument("--remove-real-people", action="store_true")
+    parser.add_argument("--near-duplicates", type=float, default=0.0, help="중복으로 볼 코사인 유사도 (0이면 검사 안 함, 예: 0.98)")
+    parser.add_argument("--drop-duplicate-characters", action="store_true", help="겹치는 캐릭터 쌍 중 뒤쪽 캐릭터 제거")
+    parser.add_argument("--block-rows", type=int, default=BLOCK_ROWS, help="유사도 블록 크기 (메모리 = 블록² × 4바이트)")
+    parser.add_argument("--dtype", choices=SUPPORTED_DTYPES, default="float32", help=".npy 출력 dtype")
+    parser.add_argument("--show", type=int, default=20, help="출력할 겹치는 캐릭터 쌍 수")
+    parser.add_argument("--dry-run", action="store_true", help="결과만 출력하고 저장하지 않음")
+    parser.add_argument("--no-backup", action="store_true")
+    parser.add_argument("--sort-by", choices=PARTITION_FIELDS, default=None, help="캐릭터를 이 필드 값 순서로 저장 (필터 부분 행렬 복사 방지)")
+    args = parser.parse_args()
+
+    source = args.source or default_source(data_dir)
+    maintain_catalog(
+        source=source,
+        outputs=args.output or [source],
+        remove_real_people=args.remove_real_people,
+        near_duplicates=args.near_duplicates,
+        drop_duplicate_characters=args.drop_duplicate_characters,
+        block_rows=args.block_rows,
+        dtype=args.dtype,
+        show=args.show,
+        dry_run=args.dry_run,
+        make_backup=not args.no_backup,
+        sort_by=args.sort_by,
+    )
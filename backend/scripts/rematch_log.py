@@ -0,0 +1,115 @@
+"""
+임베딩 로그 재매칭 스크립트
+- EMBEDDING_LOG_DIR에 쌓인 사용자 임베딩을 새 프로토타입으로 다시 매칭
+- 큰 배치 단위 행렬곱으로 처리 (로그 파일은 memmap으로 읽음)
+- 필터를 적용한 매칭은 기록된 같은 필터로 재매칭 (필터 값별로 묶어서 검색)
+- Top-1이 바뀐 비율, 많이 바뀐 캐릭터 쌍, 처리 속도 출력
+
+    python scripts/rematch_log.py --prototypes data/prototypes.new.npy
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.embedding_log import decode_filter, log_files, read_log
+from services.matching_service import MatchingService
+from services.metadata_index import MatchFilter, MetadataIndex
+
+
+def top1_ids(service: MatchingService, embeddings: np.ndarray, ids: np.ndarray, filter_value: bytes) -> np.ndarray:
+    """
+    임베딩들의 새 Top-1 캐릭터 id (조건에 맞는 캐릭터가 없으면 -1)
+    """
+    snapshot = service.snapshot
+    if filter_value:
+        subset = snapshot.attributes.subset(MatchFilter(**decode_filter(filter_value)))
+        top_idx, _ = MetadataIndex.search(subset, embeddings, 1, service.aggregate, service.aggregate_top_n)
+    else:
+        top_idx, _ = snapshot.index.search(embeddings, 1)
+    if top_idx.shape[1] == 0:
+        return np.full(embeddings.shape[0], -1, dtype=np.int64)
+    return np.where(top_idx[:, 0] >= 0, ids[top_idx[:, 0]], -1)
+
+
+def rematch(log_dir: Path, prototypes: Path, batch_size: int, show: int) -> None:
+    """
+    로그 전체를 새 프로토타입으로 재매칭 후 변화 보고
+    """
+    files = log_files(str(log_dir))
+    if not files:
+        print(f"❌ 임베딩 로그가 없습니다: {log_dir}")
+        sys.exit(1)
+
+    print(f"🔄 {prototypes.name} 로딩 중...")
+    service = MatchingService(prototypes_path=str(prototypes))
+    snapshot = service.snapshot
+    ids = np.array([meta.get("id", -1) for meta in snapshot.metas], dtype=np.int64)
+    names = {int(meta.get("id", -1)): meta.get("name", "?") for meta in snapshot.metas}
+
+    total = 0
+    changed = 0
+    skipped = 0
+    transitions: Counter = Counter()
+    start = time.perf_counter()
+
+    for path in files:
+        records = read_log(path)
+        if records.shape[0] and records["embedding"].shape[1] != snapshot.matrix.shape[1]:
+            print(f"  ⚠️ 차원이 달라 건너뜀: {os.path.basename(path)}")
+            skipped += records.shape[0]
+            continue
+
+        for offset in range(0, records.shape[0], batch_size):
+            chunk = records[offset:offset + batch_size]
+            embeddings = np.ascontiguousarray(chunk["embedding"], dtype=np.float32)
+
+            # 버전 1 로그에는 필터 필드가 없음 → 필터 없음으로 취급
+            filters = chunk["filter"] if "filter" in chunk.dtype.names else np.zeros(chunk.shape[0], dtype="S1")
+            new_ids = np.empty(chunk.shape[0], dtype=np.int64)
+            for value in np.unique(filters):
+                rows = np.flatnonzero(filters == value)
+                new_ids[rows] = top1_ids(service, embeddings[rows], ids, bytes(value))
+
+            old_ids = chunk["character_id"]
+            diff = old_ids != new_ids
+
+            total += chunk.shape[0]
+            changed += int(diff.sum())
+            transitions.update(zip(old_ids[diff].tolist(), new_ids[diff].tolist()))
+
+    elapsed = time.perf_counter() - start
+
+    print(f"\n📊 재매칭 결과 (로그 파일 {len(files)}개)")
+    print(f"  레코드: {total}개" + (f" (차원 불일치 {skipped}개 제외)" if skipped else ""))
+    if total:
+        print(f"  Top-1 변경: {changed}개 ({changed / total * 100:.2f}%)")
+        print(f"  처리 시간: {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} records/s)")
+
+    if transitions and show > 0:
+        print(f"\n  가장 많이 바뀐 매칭 (상위 {show}개)")
+        for (old, new), count in transitions.most_common(show):
+            old_name = names.get(old, "알 수 없음" if old < 0 else f"삭제됨 #{old}")
+            print(f"    {old_name} → {names.get(new, '?')}: {count}")
+
+
+if __name__ == "__main__":
+    data_dir = Path(__file__).parent.parent / "data"
+
+    parser = argparse.ArgumentParser(description="임베딩 로그를 새 프로토타입으로 재매칭")
+    parser.add_argument("--prototypes", type=Path, required=True, help="새 prototypes.npy 또는 prototypes.json")
+    parser.add_argument("--log-dir", type=Path, default=None, help="기본값: EMBEDDING_LOG_DIR 또는 data/embedding_log")
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--show", type=int, default=10, help="출력할 변경 쌍 수")
+    args = parser.parse_args()
+
+    log_dir = args.log_dir or Path(os.getenv("EMBEDDING_LOG_DIR") or data_dir / "embedding_log")
+    rematch(log_dir, args.prototypes, args.batch_size, args.show)
@@ -0,0 +1,431 @@
+"""
+요청 수락 제어 (admission control)
+- 과부하 때 모든 요청을 받아 다 같이 느려지는 대신, 처리 가능한 만큼만 받고 나머지는 바로 거절
+- 적응형 동시 처리 한도 (AIMD)
+  - 추론 호출(대기열 + 디코딩 + forward) 시간이 목표(ADMISSION_TARGET_MS) 이하이고 한도를 다 쓰고 있으면 한도 +1/한도
+  - 요청 전체 시간은 쓰지 않음: 업로드 본문 수신 시간이 섞이면 느린 클라이언트 하나가 모두의 한도를 낮춤
+  - 목표 초과 또는 추론 대기열 가득 참이면 한도 × ADMISSION_BACKOFF (목표 시간당 최대 1번)
+- 한도가 차면 짧은 FIFO 대기열에서 기다리되, 예상 대기 시간이 ADMISSION_MAX_QUEUE_MS를 넘으면
+  기다리지 않고 503 + Retry-After (대기 시간이 SLO를 넘지 않음)
+- 클라이언트별 토큰 버킷 (선택, 기본값: 끔): 초당 ADMISSION_CLIENT_RATE개, 최대 ADMISSION_CLIENT_BURST개 → 초과 시 429
+  - 프록시 뒤에서는 소켓 주소가 모두 프록시라 사이트 전체가 버킷 하나를 나눠 씀
+    → ADMISSION_CLIENT_HEADER + ADMISSION_TRUSTED_PROXIES로 신뢰하는 프록시가 기록한 주소 사용
+- 지정한 경로(POST)만 적용, /api/health 등 나머지는 그대로 통과
+- 일괄 요청은 본문을 읽은 뒤 이미지 수만큼 추가 과금 (admission_charge, 슬롯/토큰을 이미지 단위로 셈)
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, Optional, Tuple
+
+from services.metrics import record_error
+
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") == "1"
+ADMISSION_INITIAL_LIMIT = float(os.getenv("ADMISSION_INITIAL_LIMIT", 8))
+ADMISSION_MIN_LIMIT = float(os.getenv("ADMISSION_MIN_LIMIT", 1))
+ADMISSION_MAX_LIMIT = float(os.getenv("ADMISSION_MAX_LIMIT", 64))
+ADMISSION_TARGET_MS = float(os.getenv("ADMISSION_TARGET_MS", 2000))
+ADMISSION_MAX_QUEUE_MS = float(os.getenv("ADMISSION_MAX_QUEUE_MS", 1000))
+ADMISSION_BACKOFF = float(os.getenv("ADMISSION_BACKOFF", 0.9))
+ADMISSION_CLIENT_RATE = float(os.getenv("ADMISSION_CLIENT_RATE", 0))  # 0이면 클라이언트별 제한 없음
+ADMISSION_CLIENT_BURST = float(os.getenv("ADMISSION_CLIENT_BURST", 10))
+# 프록시 뒤라면 프록시가 기록하는 클라이언트 주소 헤더 (예: x-forwarded-for, fly-client-ip), 비우면 소켓 주소 사용
+ADMISSION_CLIENT_HEADER = os.getenv("ADMISSION_CLIENT_HEADER", "").strip().lower()
+# 앞단의 신뢰하는 프록시 수: 헤더 값의 오른쪽에서 이 번째 항목이 클라이언트 주소
+# (왼쪽 항목은 클라이언트가 보낸 값 그대로라 위조 가능)
+ADMISSION_TRUSTED_PROXIES = int(os.getenv("ADMISSION_TRUSTED_PROXIES", 1))
+
+# 처리 시간 지수 이동 평균 가중치
+LATENCY_EWMA_ALPHA = 0.2
+MAX_TRACKED_CLIENTS = 10000
+
+
+class AdaptiveLimiter:
+    """
+    AIMD 동시 처리 한도 + SLO 상한이 있는 대기열
+    - asyncio 단일 스레드에서만 사용 (락 없음)
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = ADMISSION_INITIAL_LIMIT,
+        min_limit: float = ADMISSION_MIN_LIMIT,
+        max_limit: float = ADMISSION_MAX_LIMIT,
+        target_latency_ms: float = ADMISSION_TARGET_MS,
+        max_queue_ms: float = ADMISSION_MAX_QUEUE_MS,
+        backoff: float = ADMISSION_BACKOFF,
+    ):
+        """
+        Args:
+            initial_limit: 시작 동시 처리 한도
+            min_limit / max_limit: 한도 범위
+            target_latency_ms: 추론 호출 시간 목표 (넘으면 한도 감소)
+            max_queue_ms: 한도가 찼을 때 최대 대기 시간 (예상 대기가 더 길면 바로 거절)
+            backoff: 감소 시 곱하는 값 (0~1)
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("1 <= min_limit <= initial_limit <= max_limit 이어야 합니다.")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff는 0과 1 사이여야 합니다.")
+
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.target_latency = target_latency_ms / 1000.0
+        self.max_queue_wait = max_queue_ms / 1000.0
+        self.backoff = backoff
+
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        # (대기 Future, 요청 슬롯 수)
+        self._waiters: Deque[Tuple[asyncio.Future, int]] = deque()
+        self._last_decrease = 0.0
+
+        self.admitted = 0
+        self.shed = 0
+        self.decreases = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter, _ in self._waiters if not waiter.done())
+
+    def estimated_wait(self, weight: int = 1) -> float:
+        """
+        지금 대기열에 들어가면 예상되는 대기 시간 (초)
+        - 앞선 대기 슬롯 + 자신의 슬롯이 한도만큼 병렬로 처리된다고 가정
+        """
+        latency = self.latency if self.latency is not None else self.target_latency
+        queued = sum(units for waiter, units in self._waiters if not waiter.done())
+        return (queued + weight) * latency / max(int(self.limit), 1)
+
+    async def acquire(self, weight: int = 1) -> Optional[float]:
+        """
+        처리 슬롯 weight개 획득 (일괄 요청은 이미지 수만큼)
+
+        Returns:
+            None이면 수락 (끝나면 반드시 같은 weight로 release), 아니면 거절 + 재시도 권장 시간 (초)
+        """
+        if self.in_flight + weight <= int(self.limit) and not self.queued:
+            self.in_flight += weight
+            self.admitted += 1
+            return None
+
+        wait = self.estimated_wait(weight)
+        if wait > self.max_queue_wait:
+            # 기다려도 SLO 안에 처리될 수 없음 → 바로 거절
+            self.shed += 1
+            return wait
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, weight)
+        self._waiters.append(entry)
+        try:
+            await asyncio.wait_for(waiter, self.max_queue_wait)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # 시간 초과 직전에 슬롯을 받은 경우
+                self.admitted += 1
+                return None
+            self.shed += 1
+            return self.estimated_wait(weight)
+        except asyncio.CancelledError:
+            # 클라이언트가 끊겼는데 슬롯을 이미 받았다면 돌려줌
+            if waiter.done() and not waiter.cancelled():
+                self.release(weight)
+            raise
+        finally:
+            if entry in self._waiters and waiter.done():
+                self._waiters.remove(entry)
+            # 앞에서 기다리던 요청이 빠졌으면 뒤의 요청이 들어갈 수 있는지 다시 확인
+            self._wake()
+        self.admitted += 1
+        return None
+
+    def release(self, weight: int = 1) -> None:
+        """
+        슬롯 weight개 반환
+        """
+        self.in_flight -= weight
+        self._wake()
+
+    def on_overload(self) -> None:
+        """
+        하위 단계 과부하 신호 (추론 대기열 가득 참 등) → 한도 감소
+        """
+        self._decrease()
+
+    def observe(self, latency: float) -> None:
+        """
+        추론 호출 시간 표본 (초) → 한도 조정 (InferencePool.latency_listeners로 등록)
+        """
+        self.latency = latency if self.latency is None else (
+            LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * self.latency
+        )
+        if latency > self.target_latency:
+            self._decrease()
+        elif self.in_flight >= int(self.limit):
+            # 한도를 다 쓰고 있을 때만 증가 (한가할 때 한도가 계속 커지지 않도록)
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _decrease(self) -> None:
+        # 한 번의 과부하에 여러 요청이 동시에 반응하지 않도록 목표 시간당 최대 1번
+        now = time.monotonic()
+        if now - self._last_decrease < self.target_latency:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        self.decreases += 1
+
+    def _wake(self) -> None:
+        # 들어온 순서대로 (앞 요청의 슬롯이 모자라면 뒤 요청도 기다림)
+        while self._waiters:
+            waiter, weight = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            if self.in_flight + weight > int(self.limit):
+                return
+            self._waiters.popleft()
+            self.in_flight += weight
+            waiter.set_result(True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "decreases": self.decreases,
+        }
+
+
+class TokenBuckets:
+    """
+    클라이언트별 토큰 버킷 (최근 클라이언트 MAX_TRACKED_CLIENTS개만 유지)
+    """
+
+    def __init__(
+        self,
+        rate: float = ADMISSION_CLIENT_RATE,
+        burst: float = ADMISSION_CLIENT_BURST,
+        max_clients: int = MAX_TRACKED_CLIENTS,
+    ):
+        """
+        Args:
+            rate: 초당 충전 토큰 수 (0이면 비활성화)
+            burst: 버킷 크기 (연속 요청 허용 수)
+            max_clients: 추적할 최대 클라이언트 수 (넘으면 가장 오래 안 본 클라이언트부터 제거)
+        """
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.limited = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def take(self, client: str, cost: float = 1.0) -> float:
+        """
+        토큰 cost개 사용 (버킷 크기보다 크면 버킷 크기만큼)
+
+        Returns:
+            0이면 허용, 아니면 필요한 토큰이 찰 때까지 남은 시간 (초)
+        """
+        if not self.enabled:
+            return 0.0
+
+        cost = min(cost, self.burst)
+        now = time.monotonic()
+        tokens, last = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / self.rate
+            self.limited += 1
+
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "clients": len(self._buckets),
+            "rate_limited": self.limited,
+        }
+
+
+class AdmissionRejected(Exception):
+    """
+    본문을 읽은 뒤의 추가 과금이 거절된 경우 (main.py에서 429/503 + Retry-After로 변환)
+    """
+
+    def __init__(self, status: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionMiddleware:
+    """
+    수락 제어 ASGI 미들웨어
+    - 토큰 버킷 → 동시 처리 한도 순서로 검사, 거절은 본문을 읽기 전에 바로 응답
+    - 요청마다 1단위만 과금, 일괄 요청의 나머지는 엔드포인트가 admission_charge로 추가 과금
+      (scope["admission"]에 미들웨어를 넣어 둠)
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: AdaptiveLimiter,
+        buckets: TokenBuckets,
+        limited_paths: Iterable[str],
+        rate_limited_paths: Iterable[str] = (),
+        client_header: str = ADMISSION_CLIENT_HEADER,
+        trusted_proxies: int = ADMISSION_TRUSTED_PROXIES,
+    ):
+        """
+        Args:
+            limited_paths: 동시 처리 한도 + 토큰 버킷 적용 경로
+            rate_limited_paths: 토큰 버킷만 적용할 경로 (작업 등록처럼 바로 끝나는 요청)
+            client_header: 클라이언트 식별 헤더 (비우면 소켓 주소)
+            trusted_proxies: 헤더에 주소를 덧붙이는 신뢰하는 프록시 수 (1 이상)
+        """
+        if trusted_proxies < 1:
+            raise ValueError("trusted_proxies는 1 이상이어야 합니다.")
+
+        self.app = app
+        self.limiter = limiter
+        self.buckets = buckets
+        self.limited_paths = frozenset(limited_paths)
+        self.rate_limited_paths = frozenset(rate_limited_paths) | self.limited_paths
+        self.client_header = client_header.encode("latin-1")
+        self.trusted_proxies = trusted_proxies
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or scope.get("method") != "POST" or path not in self.rate_limited_paths:
+            await self.app(scope, receive, send)
+            return
+
+        wait = self.buckets.take(self._client(scope))
+        if wait > 0:
+            record_error("rate_limited")
+            await _send_rejection(send, 429, "요청이 너무 많습니다. 잠시 후 다시 시도해주세요.", wait)
+            return
+
+        if path not in self.limited_paths:
+            await self.app(scope, receive, send)
+            return
+
+        wait = await self.limiter.acquire()
+        if wait is not None:
+            record_error("shed")
+            await _send_rejection(send, 503, "서버가 혼잡합니다. 잠시 후 다시 시도해주세요.", wait)
+            return
+
+        # 한도 조정은 추론 풀이 보고하는 추론 시간으로만 (AdaptiveLimiter.observe)
+        scope["admission"] = self
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+    @asynccontextmanager
+    async def charge(self, scope, units: int) -> AsyncIterator[None]:
+        """
+        units단위 추가 과금 (토큰 units개 + 슬롯 units개, 블록이 끝나면 슬롯 반환)
+        - 슬롯은 한도 - 1개까지만 (미들웨어가 이미 1개를 잡고 있으므로, 혼자 들어오면 항상 수락 가능)
+
+        Raises:
+            AdmissionRejected: 토큰 부족(429) 또는 대기 시간 초과(503)
+        """
+        wait = self.buckets.take(self._client(scope), units)
+        if wait > 0:
+            record_error("rate_limited")
+            raise AdmissionRejected(429, "요청이 너무 많습니다. 잠시 후 다시 시도해주세요.", wait)
+
+        weight = min(units, max(int(self.limiter.limit) - 1, 0))
+        if weight == 0:
+            yield
+            return
+
+        wait = await self.limiter.acquire(weight)
+        if wait is not None:
+            record_error("shed")
+            raise AdmissionRejected(503, "서버가 혼잡합니다. 잠시 후 다시 시도해주세요.", wait)
+        try:
+            yield
+        finally:
+            self.limiter.release(weight)
+
+    def _client(self, scope) -> str:
+        """
+        클라이언트 식별 주소
+        - x-forwarded-for: "(클라이언트가 보낸 값...), 클라이언트, 프록시1" → 프록시마다 오른쪽에 덧붙이므로
+          신뢰하는 프록시 N개 뒤라면 오른쪽에서 N번째 (fly-client-ip 같은 단일 값 헤더는 N=1)
+        - 헤더가 없거나 항목이 N개보다 적으면(프록시를 거치지 않은 요청) 소켓 주소
+        """
+        if self.client_header:
+            # 같은 헤더가 여러 줄이면 순서대로 이어 붙인 것과 같음 (RFC 9110)
+            hops = [
+                hop.strip()
+                for key, value in scope.get("headers", ())
+                if key.lower() == self.client_header
+                for hop in value.decode("latin-1").split(",")
+            ]
+            hops = [hop for hop in hops if hop]
+            if len(hops) >= self.trusted_proxies:
+                return hops[-self.trusted_proxies]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+
+@asynccontextmanager
+async def admission_charge(scope, units: int) -> AsyncIterator[None]:
+    """
+    요청 하나가 여러 단위의 일을 하는 경우(일괄 매칭 등) 본문을 읽은 뒤 나머지를 추가 과금
+    - 미들웨어가 이미 1단위를 과금했으므로 units - 1만큼, 수락 제어가 꺼져 있으면 아무것도 안 함
+
+    Raises:
+        AdmissionRejected: 추가 과금이 거절된 경우
+    """
+    middleware: Optional[AdmissionMiddleware] = scope.get("admission")
+    if middleware is None or units <= 1:
+        yield
+        return
+    async with middleware.charge(scope, units - 1):
+        yield
+
+
+async def _send_rejection(send, status: int, detail: str, retry_after: float) -> None:
+    body = ('{"detail":"%s"}' % detail).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# 전역 인스턴스 생성 (ADMISSION_ENABLED=1이면 main.py에서 미들웨어로 등록)
+admission_limiter = AdaptiveLimiter()
+client_buckets = TokenBuckets()
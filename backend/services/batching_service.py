@@ -0,0 +1,173 @@
+"""
+동적 마이크로 배칭 서비스
+- 동시에 들어온 임베딩 요청을 짧은 시간 창 동안 모음
+- 한 번의 배치 encode_image로 처리 후 각 호출자에게 결과 전달
+- 디코딩에 실패한 이미지는 그 요청만 실패, 나머지는 그대로 한 번의 forward로 처리
+"""
+
+import asyncio
+import os
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from services.face_crop import FaceBox
+from services.inference_pool import inference_pool
+
+
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", 8))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", 10))
+
+
+# (바이트 리스트, 얼굴 박스 리스트) → (성공한 이미지의 임베딩 (B', D), 이미지별 예외 목록 (성공은 None))
+BatchRunner = Callable[
+    [List[bytes], List[Optional[FaceBox]]],
+    Awaitable[Tuple[np.ndarray, List[Optional[BaseException]]]],
+]
+BatchItem = Tuple[bytes, Optional[FaceBox], asyncio.Future]
+
+
+class MicroBatcher:
+    """
+    asyncio 기반 마이크로 배처
+    - 첫 요청이 도착하면 max_wait_ms 동안 (또는 max_batch_size가 찰 때까지) 요청을 모음
+    - 모인 요청을 하나의 배치로 추론
+    - 배치 실행은 백그라운드 태스크로 띄워서 다음 배치 수집을 막지 않음
+    """
+
+    def __init__(
+        self,
+        runner: Optional[BatchRunner] = None,
+        max_batch_size: int = BATCH_MAX_SIZE,
+        max_wait_ms: float = BATCH_MAX_WAIT_MS,
+    ):
+        """
+        Args:
+            runner: 배치 추론 코루틴 함수 (BatchRunner, 기본값: inference_pool.run_each)
+            max_batch_size: 배치 최대 크기
+            max_wait_ms: 첫 요청 이후 배치를 모으는 최대 대기 시간 (ms)
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size는 1 이상이어야 합니다.")
+
+        self.runner: BatchRunner = runner or inference_pool.run_each
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+
+    async def start(self) -> None:
+        """
+        배치 수집 루프 시작 (이벤트 루프 안에서 호출)
+        """
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._collect_loop())
+
+    async def stop(self) -> None:
+        """
+        배치 수집 루프 종료 및 진행 중인 배치 대기
+        """
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        # 아직 처리되지 않은 요청은 취소
+        while self._queue is not None and not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.cancel()
+
+    async def submit(self, image_data: bytes, face_box: Optional[FaceBox] = None) -> np.ndarray:
+        """
+        이미지 하나를 배치 큐에 넣고 임베딩 결과를 기다림
+
+        Args:
+            image_data: 이미지 바이트
+            face_box: 얼굴 박스 (x, y, w, h), 주어지면 얼굴 영역만 임베딩
+
+        Returns:
+            numpy.ndarray: (D,) L2 정규화된 임베딩
+        """
+        if self._worker is None:
+            await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image_data, face_box, future))
+        return await future
+
+    async def _collect_loop(self) -> None:
+        """
+        큐에서 요청을 모아 배치 단위로 실행
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[BatchItem] = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: List[BatchItem]) -> None:
+        """
+        배치 추론 후 각 Future에 결과 분배
+        - 이미지별 실패(손상된 업로드 등)는 runner가 격리 → 해당 요청만 실패, 재실행 없음
+        - runner 자체가 실패하면(대기열 포화, forward 오류) 배치 전체 실패
+        """
+        # 이미 취소된 요청(클라이언트 연결 끊김 등)은 제외
+        batch = [item for item in batch if not item[2].done()]
+        if not batch:
+            return
+
+        try:
+            embeddings, errors = await self.runner([data for data, _, _ in batch], [box for _, box, _ in batch])
+        except Exception as e:
+            # InferenceQueueFullError 포함: 특정 이미지 문제가 아니므로 재시도 없이 배치 전체 실패
+            for _, _, fut in batch:
+                self._resolve(fut, error=e)
+            return
+
+        rows = iter(embeddings)
+        for (_, _, fut), error in zip(batch, errors):
+            if error is not None:
+                self._resolve(fut, error=error)
+            else:
+                self._resolve(fut, result=next(rows))
+
+    @staticmethod
+    def _resolve(
+        future: asyncio.Future,
+        result: Optional[np.ndarray] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+# 전역 인스턴스 생성 (루프는 앱 시작 시 기동)
+embedding_batcher = MicroBatcher()
@@ -0,0 +1,181 @@
+"""
+카탈로그 정리 도구 (scripts/maintain_catalog.py, scripts/remove_real_people.py 공용)
+- 실제 인물 이름 필터: 모든 패턴을 하나의 정규식(alternation)으로 컴파일 → 이름당 검색 1번
+- 중복에 가까운 프로토타입 탐지: 블록 단위 N×N 코사인 자기 유사도 (상삼각만, 메모리 상한)
+  - 같은 캐릭터 안의 거의 같은 행: 중복 행 제거 → 캐릭터당 행 수와 검색 비용 감소
+  - 서로 다른 캐릭터 쌍: 같은 초상화가 다른 id로 들어간 경우 (보고, 선택적으로 뒤쪽 캐릭터 제거)
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+import numpy as np
+
+
+# 실제 사람 이름 패턴 (게스트 출연자들)
+REAL_PEOPLE_PATTERNS = [
+    # 정치인
+    'Barack Obama', 'Michelle Obama', 'Donald Trump', 'Bill Clinton', 'Hillary Clinton',
+    'George Bush', 'Gerald Ford', 'Jimmy Carter', 'Tony Blair', 'Arnold Schwarzenegger',
+
+    # 배우/여배우
+    'Meryl Streep', 'Tom Hanks', 'Anne Hathaway', 'Mark Hamill', 'Leonard Nimoy',
+    'James Earl Jones', 'Patrick Stewart', 'Johnny Depp', 'Natalie Portman',
+    'Scarlett Johansson', 'Jennifer Aniston', 'Brad Pitt', 'George Clooney',
+
+    # 가수/음악가
+    'Lady Gaga', 'Michael Jackson', 'Paul McCartney', 'Ringo Starr', 'Mick Jagger',
+    'Elvis Presley', 'Johnny Cash', 'Bob Dylan', 'Elton John', 'Madonna',
+    'Britney Spears', 'Justin Timberlake', 'Beyonce', 'Jay-Z', 'Kanye West',
+
+    # 코미디언
+    'John Mulaney', 'Jerry Seinfeld', 'Jon Stewart', 'Stephen Colbert', 'Conan O\'Brien',
+    'Jimmy Fallon', 'Ellen DeGeneres', 'Dave Chappelle', 'Chris Rock',
+
+    # 스포츠 선수
+    'Tony Hawk', 'LeBron James', 'Tom Brady', 'David Beckham', 'Lionel Messi',
+    'Mike Tyson', 'Muhammad Ali', 'Serena Williams', 'Tiger Woods',
+
+    # 비즈니스/기술
+    'Elon Musk', 'Mark Zuckerberg', 'Bill Gates', 'Steve Jobs', 'Jeff Bezos',
+    'Warren Buffett', 'Richard Branson',
+
+    # 작가/감독
+    'Stephen King', 'J.K. Rowling', 'Stan Lee', 'George Lucas', 'Steven Spielberg',
+    'Quentin Tarantino', 'Martin Scorsese', 'James Cameron',
+
+    # 과학자/우주인
+    'Stephen Hawking', 'Neil deGrasse Tyson', 'Bill Nye', 'Buzz Aldrin',
+    'Neil Armstrong', 'Elon Musk',
+
+    # 기타 유명인
+    'Oprah Winfrey', 'Kim Kardashian', 'Paris Hilton', 'Simon Cowell',
+]
+
+# 실제 사람 이름이 포함된 패턴 (정규식)
+REAL_NAME_INDICATORS = [
+    r'\(himself\)',
+    r'\(herself\)',
+    r'\(as himself\)',
+    r'\(as herself\)',
+    r'\(voice\)',
+    r'\(cameo\)',
+]
+
+# 블록 하나의 유사도 행렬 크기 = BLOCK_ROWS² × 4바이트 (2048 → 16MB)
+BLOCK_ROWS = 2048
+
+# (행 i (P,), 행 j (P,), 코사인 (P,)), 항상 i < j
+PairBlock = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def compile_name_pattern(
+    names: Iterable[str] = REAL_PEOPLE_PATTERNS,
+    indicators: Iterable[str] = REAL_NAME_INDICATORS,
+) -> Pattern:
+    """
+    이름 목록(부분 문자열) + 정규식 패턴 → 대소문자 무시 정규식 하나
+    - 긴 이름을 앞에 두어 공통 접두사가 있어도 결과가 같도록 함
+    """
+    literals = sorted(dict.fromkeys(names), key=len, reverse=True)
+    alternatives = [re.escape(name) for name in literals] + list(indicators)
+    return re.compile("|".join(alternatives), re.IGNORECASE)
+
+
+REAL_PERSON_PATTERN = compile_name_pattern()
+
+
+def is_real_person(character_name: str) -> bool:
+    """
+    캐릭터 이름이 실제 사람인지 확인
+    """
+    return REAL_PERSON_PATTERN.search(character_name) is not None
+
+
+def near_duplicate_pairs(
+    matrix: np.ndarray,
+    threshold: float,
+    block_rows: int = BLOCK_ROWS,
+    rows: Optional[np.ndarray] = None,
+) -> Iterator[PairBlock]:
+    """
+    코사인 유사도가 threshold 이상인 행 쌍 (i < j)을 블록 단위로 생성
+    - 행렬 곱은 (block_rows, block_rows) 블록씩 → 메모리 사용량이 N과 무관
+    - 대칭이므로 상삼각 블록만 계산 (대각 블록은 i < j 부분만)
+    - matrix는 L2 정규화 전제 (memmap이면 블록 단위로만 읽음)
+    - rows를 주면 그 행들만 대상 (반환하는 번호도 rows 안의 위치)
+    """
+    if block_rows < 1:
+        raise ValueError("block_rows는 1 이상이어야 합니다.")
+
+    def block(start: int) -> np.ndarray:
+        index = slice(start, start + block_rows) if rows is None else rows[start:start + block_rows]
+        return np.asarray(matrix[index], dtype=np.float32)
+
+    n = matrix.shape[0] if rows is None else len(rows)
+    for i0 in range(0, n, block_rows):
+        left = block(i0)
+        for j0 in range(i0, n, block_rows):
+            right = left if j0 == i0 else block(j0)
+            sims = left @ right.T
+            hits = sims >= threshold
+            if j0 == i0:
+                hits = np.triu(hits, k=1)
+            ii, jj = np.nonzero(hits)
+            if ii.shape[0]:
+                yield ii + i0, jj + j0, sims[ii, jj]
+
+
+def find_near_duplicates(
+    matrix: np.ndarray,
+    offsets: np.ndarray,
+    threshold: float,
+    block_rows: int = BLOCK_ROWS,
+    rows: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, Dict[Tuple[int, int], float]]:
+    """
+    중복에 가까운 프로토타입 탐지
+
+    Args:
+        matrix: (N, D) L2 정규화 행렬
+        offsets: 캐릭터별 행 범위 (rows를 주면 rows 기준)
+        threshold: 이 코사인 이상이면 중복으로 판단
+        rows: (선택) 대상 행 번호 (제거할 캐릭터를 뺀 나머지)
+
+    Returns:
+        (같은 캐릭터 안의 중복 행 마스크 (N,), {(캐릭터 a, 캐릭터 b): 최대 코사인} (a < b))
+        - 중복 행: 같은 캐릭터의 앞쪽(남아 있는) 행과 threshold 이상인 행 → 캐릭터마다 첫 행은 항상 유지
+    """
+    row_chars = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    same: List[Tuple[np.ndarray, np.ndarray]] = []
+    cross: Dict[Tuple[int, int], float] = {}
+
+    for rows_i, rows_j, sims in near_duplicate_pairs(matrix, threshold, block_rows, rows):
+        chars_i, chars_j = row_chars[rows_i], row_chars[rows_j]
+        within = chars_i == chars_j
+        if within.any():
+            same.append((rows_i[within], rows_j[within]))
+        for a, b, sim in zip(chars_i[~within].tolist(), chars_j[~within].tolist(), sims[~within].tolist()):
+            key = (a, b) if a < b else (b, a)
+            cross[key] = max(cross.get(key, -1.0), sim)
+
+    redundant = np.zeros(len(row_chars), dtype=bool)
+    if same:
+        rows_i = np.concatenate([pair[0] for pair in same])
+        rows_j = np.concatenate([pair[1] for pair in same])
+        # 뒤쪽 행 순서대로 결정: 남아 있는 앞쪽 행과 겹치면 제거
+        for j, i in sorted(zip(rows_j.tolist(), rows_i.tolist())):
+            if not redundant[i]:
+                redundant[j] = True
+    return redundant, cross
+
+
+def duplicate_characters(pairs: Dict[Tuple[int, int], float]) -> List[int]:
+    """
+    중복 캐릭터 쌍 중 제거할 캐릭터 (남아 있는 앞쪽 캐릭터와 겹치는 뒤쪽 캐릭터)
+    """
+    dropped: set = set()
+    for a, b in sorted(pairs, key=lambda pair: (pair[1], pair[0])):
+        if a not in dropped:
+            dropped.add(b)
+    return sorted(dropped)
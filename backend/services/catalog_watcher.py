@@ -0,0 +1,90 @@
+"""
+카탈로그 파일 감시 서비스
+- 주기적으로 프로토타입 파일의 mtime/크기만 확인 (stat, 추가 의존성 없음)
+- 변경이 두 번 연속 같은 상태로 관측되면 (쓰기 완료) 백그라운드 스레드에서 리로드
+- 리로드 실패 시 기존 스냅샷을 유지하고, 파일이 다시 바뀌면 재시도
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from services.matching_service import MatchingService, ReloadInProgressError, matching_service
+from services.prototype_store import store_signature
+
+
+logger = logging.getLogger(__name__)
+
+
+CATALOG_WATCH_INTERVAL = float(os.getenv("CATALOG_WATCH_INTERVAL", 5))  # 초, 0이면 비활성화
+
+
+class CatalogWatcher:
+    """
+    MatchingService 카탈로그 변경 감시
+    """
+
+    def __init__(self, service: MatchingService, interval: float = CATALOG_WATCH_INTERVAL):
+        """
+        Args:
+            service: 감시할 매칭 서비스
+            interval: 확인 주기 (초, 0 이하이면 감시하지 않음)
+        """
+        self.service = service
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """
+        감시 루프 시작 (이벤트 루프 안에서 호출)
+        """
+        if self._task is not None or self.interval <= 0:
+            return
+        self._task = asyncio.create_task(self._watch_loop())
+
+    async def stop(self) -> None:
+        """
+        감시 루프 종료
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _watch_loop(self) -> None:
+        pending = None
+        failed = None
+        while True:
+            await asyncio.sleep(self.interval)
+
+            snapshot = self.service.snapshot
+            if snapshot is None:
+                continue
+
+            signature = store_signature(snapshot.path)
+            if signature == snapshot.signature or signature == failed:
+                pending = None
+                continue
+
+            # 파일을 쓰는 중일 수 있으므로 같은 서명이 한 번 더 관측될 때까지 대기
+            if signature != pending:
+                pending = signature
+                continue
+
+            try:
+                await asyncio.to_thread(self.service.reload)
+                pending = None
+            except ReloadInProgressError:
+                continue
+            except Exception as e:
+                failed = signature
+                logger.warning(f"⚠️ 카탈로그 리로드 실패, 기존 카탈로그 유지: {str(e)}")
+
+
+# 전역 인스턴스 생성
+catalog_watcher = CatalogWatcher(matching_service)
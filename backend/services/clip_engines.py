@@ -0,0 +1,175 @@
+"""
+CLIP 이미지 인코더 추론 백엔드
+- torch: fp32 PyTorch (기본값)
+- int8: visual tower Linear 레이어 동적 int8 양자화 (CPU 전용)
+- onnx: ONNX Runtime으로 export된 visual tower 실행 (onnxruntime 필요)
+
+모든 백엔드는 이미지 인코더(visual tower)만 메모리에 유지하고 텍스트 타워는 로딩 직후 해제
+encode()는 정규화 전 (B, D) float32 numpy 배열을 반환
+share_memory()는 fork 전에 가중치를 공유 메모리로 옮김 (멀티 워커 preload 모드, torch 백엔드만)
+"""
+
+import os
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+import torch
+import open_clip
+
+
+CLIP_BACKENDS = ("torch", "int8", "onnx")
+# fork 전에 로딩해서 워커들이 공유할 수 있는 백엔드
+FORK_SAFE_BACKENDS = ("torch",)
+DEFAULT_ONNX_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'clip_visual.onnx')
+
+
+def load_visual_tower(
+    model_name: str,
+    pretrained: str,
+    cache_dir: Optional[str] = None,
+) -> Tuple[torch.nn.Module, Callable]:
+    """
+    open_clip 모델에서 이미지 인코더만 분리
+    - 텍스트 타워(transformer, token_embedding 등)는 참조를 끊어 메모리 해제
+
+    Args:
+        pretrained: pretrained 태그 (예: "openai") 또는 로컬 체크포인트 파일 경로
+        cache_dir: 가중치 캐시 디렉토리 (이미지 빌드 시 미리 받아두면 다운로드 없이 로딩)
+    """
+    model, _, preprocess = open_clip.create_model_and_transforms(
+        model_name, pretrained=pretrained, cache_dir=cache_dir
+    )
+    visual = model.visual
+    del model
+    visual.eval()
+    return visual, preprocess
+
+
+def build_preprocess(model_name: str) -> Callable:
+    """
+    가중치 없이 전처리 함수만 생성 (ONNX 백엔드용)
+    """
+    image_size = open_clip.get_model_config(model_name)['vision_cfg']['image_size']
+    return open_clip.image_transform(
+        image_size,
+        is_train=False,
+        mean=open_clip.OPENAI_DATASET_MEAN,
+        std=open_clip.OPENAI_DATASET_STD,
+    )
+
+
+class TorchEngine:
+    """
+    fp32 PyTorch visual tower
+    """
+
+    name = "torch"
+
+    def __init__(
+        self,
+        model_name: str,
+        pretrained: str,
+        device: torch.device,
+        cache_dir: Optional[str] = None,
+    ):
+        self.device = device
+        self.visual, self.preprocess = load_visual_tower(model_name, pretrained, cache_dir=cache_dir)
+        self.visual = self.visual.to(device)
+
+    def share_memory(self) -> None:
+        """
+        가중치/버퍼를 공유 메모리로 이동
+        - fork된 워커들이 같은 물리 페이지를 사용 (워커 수만큼 가중치가 복제되지 않음)
+        """
+        self.visual.share_memory()
+
+    def encode(self, image_tensor: torch.Tensor) -> np.ndarray:
+        with torch.no_grad():
+            features = self.visual(image_tensor.to(self.device))
+        return features.float().cpu().numpy()
+
+
+class Int8Engine(TorchEngine):
+    """
+    동적 int8 양자화 visual tower
+    - Linear 가중치를 int8로 저장, 활성값은 실행 시 양자화
+    - 메모리 약 1/4, CPU에서 forward 가속
+    - fork 전 공유 미지원: 양자화 Linear의 가중치는 _packed_params(C++ 객체)에 있어
+      Module.share_memory()로 옮겨지지 않음 → 멀티 워커에서는 워커마다 로딩 (대신 fp32의 1/4 크기)
+    """
+
+    name = "int8"
+
+    def __init__(
+        self,
+        model_name: str,
+        pretrained: str,
+        device: torch.device,
+        cache_dir: Optional[str] = None,
+    ):
+        # 동적 양자화 커널은 CPU 전용
+        super().__init__(model_name, pretrained, torch.device('cpu'), cache_dir=cache_dir)
+        self.visual = torch.ao.quantization.quantize_dynamic(
+            self.visual, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    def share_memory(self) -> None:
+        raise RuntimeError("int8 백엔드는 양자화 가중치(_packed_params)를 공유 메모리로 옮길 수 없습니다.")
+
+
+class OnnxEngine:
+    """
+    ONNX Runtime visual tower
+    - scripts/export_onnx.py로 생성한 모델 사용
+    - PyTorch 가중치를 로딩하지 않음
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, onnx_path: str, threads: int = 0):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("CLIP_BACKEND=onnx 사용 시 onnxruntime 설치가 필요합니다.") from e
+
+        if not os.path.exists(onnx_path):
+            raise FileNotFoundError(
+                f"ONNX 모델이 없습니다: {onnx_path} (scripts/export_onnx.py로 먼저 생성하세요)"
+            )
+
+        options = ort.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+
+        self.preprocess = build_preprocess(model_name)
+        self.session = ort.InferenceSession(onnx_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def share_memory(self) -> None:
+        # InferenceSession의 스레드풀은 fork 후 자식 프로세스에서 동작하지 않음 → 워커마다 로딩
+        raise RuntimeError("ONNX 백엔드는 fork 전 공유를 지원하지 않습니다.")
+
+    def encode(self, image_tensor: Any) -> np.ndarray:
+        batch = image_tensor.numpy() if isinstance(image_tensor, torch.Tensor) else image_tensor
+        features = self.session.run(None, {self.input_name: batch.astype(np.float32, copy=False)})[0]
+        return features.astype(np.float32, copy=False)
+
+
+def create_engine(
+    backend: str,
+    model_name: str,
+    pretrained: str,
+    device: torch.device,
+    onnx_path: str = DEFAULT_ONNX_PATH,
+    cache_dir: Optional[str] = None,
+):
+    """
+    백엔드 이름으로 추론 엔진 생성
+    """
+    if backend == "torch":
+        return TorchEngine(model_name, pretrained, device, cache_dir=cache_dir)
+    if backend == "int8":
+        return Int8Engine(model_name, pretrained, device, cache_dir=cache_dir)
+    if backend == "onnx":
+        return OnnxEngine(model_name, onnx_path, threads=torch.get_num_threads())
+    raise ValueError(f"지원하지 않는 CLIP 백엔드: {backend} (가능: {', '.join(CLIP_BACKENDS)})")
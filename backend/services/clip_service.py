@@ -1,27 +1,57 @@
 """
 CLIP 임베딩 추출 서비스
-- OpenCLIP 모델 로딩
+- OpenCLIP 모델 로딩 (추론 백엔드 선택: torch / int8 / onnx)
 - 이미지 임베딩 추출
 - L2 정규화
 """
 
 
 import torch
-import open_clip
 from PIL import Image
 import numpy as np
-from typing import Optional
+from typing import Dict, List, Optional
 import io
+import logging
+import os
+import threading
+import time
+
+from services.clip_engines import CLIP_BACKENDS, DEFAULT_ONNX_PATH, FORK_SAFE_BACKENDS, create_engine
+from services.face_crop import FaceBox, expand_face_box, face_detector
+from services.image_ingest import decode_image
+
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up_image(size: int = 224) -> bytes:
+    """
+    워밍업용 단색 JPEG 이미지
+    """
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), (255, 217, 15)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
 
 class CLIPService:
     """
     CLIP 모델을 사용한 이미지 임베딩 추출
     - 싱글톤 패턴으로 모델을 한 번만 로딩
     """
+    MODEL_NAME = 'ViT-B-32'
+    PRETRAINED = 'openai'
+    IMAGE_SIZE = 224
+    BACKEND = os.getenv("CLIP_BACKEND", "torch")  # "torch", "int8", "onnx"
+    ONNX_PATH = os.getenv("CLIP_ONNX_PATH", DEFAULT_ONNX_PATH)
+    # 이미지에 미리 받아둔 가중치 (다운로드 없이 로딩)
+    PRETRAINED_PATH = os.getenv("CLIP_PRETRAINED_PATH")  # 로컬 체크포인트 파일
+    CACHE_DIR = os.getenv("CLIP_CACHE_DIR")  # open_clip 가중치 캐시 디렉토리
+
     _instance: Optional['CLIPService'] = None
-    _model = None
+    _engine = None
     _preprocess = None
     _device = None
+    _load_lock = threading.Lock()
 
     def __new__(cls):
         """
@@ -34,33 +64,82 @@ class CLIPService:
 
     def __init__(self):
         """
-        CLIP 모델 초기화
-        - 최초 1번만 실행
+        CLIP 서비스 생성
+        - 모델은 생성 시점이 아니라 load() 또는 첫 추론 시점에 로딩 (지연 로딩)
         """
-        if self._model is None:
-            self._load_model()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._engine is not None
+
+    def load(self) -> None:
+        """
+        CLIP 모델 로딩 (최초 1번만 실행, 스레드 안전)
+        """
+        if self._engine is not None:
+            return
+        with self._load_lock:
+            if self._engine is None:
+                self._load_model()
+
+    @property
+    def fork_safe(self) -> bool:
+        """
+        fork 전에 로딩해서 워커들과 공유할 수 있는 백엔드인지 여부
+        """
+        return self.BACKEND in FORK_SAFE_BACKENDS
+
+    def share_memory(self) -> None:
+        """
+        모델 로딩 후 가중치를 공유 메모리로 이동 (preload 부모 프로세스에서 fork 전에 호출)
+        """
+        self.load()
+        self._engine.share_memory()
+
+    def warm_up(self) -> None:
+        """
+        더미 이미지로 forward 1회 실행
+        - 첫 요청이 커널 초기화/메모리 할당 비용을 떠안지 않도록 함
+        """
+        self.extract_embeddings([warm_up_image()])
 
     def _load_model(self):
         """
         CLIP 모델 로딩
-        - 모델: Vit-B-32 (OpenAI pretrained)
+        - 모델: Vit-B-32 (OpenAI pretrained), 이미지 인코더만 로딩
         - 디바이스: GPU or CPU
+        - 백엔드: CLIP_BACKEND 환경 변수 (torch / int8 / onnx)
         """
-        print("모델 로딩 중")
+        if self.BACKEND not in CLIP_BACKENDS:
+            raise ValueError(f"지원하지 않는 CLIP 백엔드: {self.BACKEND}")
+
+        logger.info(f"모델 로딩 중 (백엔드: {self.BACKEND})")
         
         # 디바이스 설정
         self._device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        print(f" 디바이스: {self._device}")
+        logger.info(f"디바이스: {self._device}")
 
-        # CLIP 모델 및 전처리 함수 로딩
-        self._model, _, self._preprocess =open_clip.create_model_and_transforms('ViT-B-32', pretrained='openai')
+        # 이미지 인코더 및 전처리 함수 로딩 (텍스트 타워는 로딩 직후 해제)
+        self._engine = create_engine(
+            self.BACKEND,
+            self.MODEL_NAME,
+            self.PRETRAINED_PATH or self.PRETRAINED,
+            self._device,
+            onnx_path=self.ONNX_PATH,
+            cache_dir=self.CACHE_DIR,
+        )
+        self._preprocess = self._engine.preprocess
 
-        # 모델을 디바이스로 이동 및 평가 모드 설정
-        self._model = self._model.to(self._device)
-        self._model.eval() # 추론 모드
-
-        print("CLIP 모델 로딩 완료")
+        logger.info("CLIP 모델 로딩 완료")
     
+    @property
+    def model_id(self) -> str:
+        """
+        모델 식별자 (임베딩 캐시 키 등에 사용)
+        - 양자화 백엔드는 임베딩이 미세하게 다르므로 백엔드까지 포함
+        """
+        return f"{self.MODEL_NAME}/{self.PRETRAINED}/{self.BACKEND}"
+
     def extract_embedding(self, image_data: bytes) -> np.ndarray:
         """
         이미지 파일에서 CLIP 임베딩 추출
@@ -71,24 +150,102 @@ class CLIPService:
         Returns:
             numpy.ndarray: L2 정규화된 512차원 임베딩 벡터
         """
+        return self.extract_embeddings([image_data])[0]
+
+    def extract_embeddings(
+        self,
+        images_data: List[bytes],
+        timings: Optional[Dict[str, float]] = None,
+        face_boxes: Optional[List[Optional[FaceBox]]] = None,
+        detect_faces: bool = False,
+        errors: Optional[List[Optional[Exception]]] = None,
+    ) -> np.ndarray:
+        """
+        여러 이미지의 CLIP 임베딩을 한 번의 forward pass로 추출 (배치 추론)
+
+        Args:
+            images_data: 이미지 바이트 데이터 리스트
+            timings: 전달 시 단계별 소요 시간(초)을 기록 (decode, preprocess, forward)
+            face_boxes: 이미지별 얼굴 박스 (원본 좌표, None이면 전체 이미지)
+            detect_faces: 박스가 없는 이미지에 서버측 얼굴 감지 적용 (FACE_DETECTOR)
+            errors: 전달 시 이미지별 디코딩/전처리 실패를 여기에 기록하고 (성공은 None)
+                나머지 이미지만 forward (없으면 하나라도 실패할 때 예외)
+                → 손상된 이미지 하나가 같은 배치의 다른 요청을 실패시키지 않음
+
+        Returns:
+            numpy.ndarray: (B, 512) L2 정규화된 임베딩 행렬
+                (errors를 전달한 경우 실패하지 않은 이미지만 순서대로 (B', 512))
+        """
+        self.load()
+
+        if errors is not None:
+            errors[:] = [None] * len(images_data)
+
+        def guarded(index: int, step):
+            try:
+                return step()
+            except Exception as e:
+                if errors is None:
+                    raise
+                errors[index] = e
+                return None
+
         try:
-            # 바이트 데이터를 PIL Image로 변환
-            image = Image.open(io.BytesIO(image_data)).convert("RGB")
+            t0 = time.perf_counter()
 
-            # CLIP 전처리
-            image_tensor = self._preprocess(image).unsqueeze(0).to(self._device)
+            # 바이트 데이터를 PIL Image로 변환 (모델 입력 크기 근처까지만 축소 디코딩)
+            # - 얼굴 박스가 있으면 얼굴 영역만 디코딩/축소
+            boxes = face_boxes or [None] * len(images_data)
+            images = [
+                guarded(i, lambda: decode_image(data, target_size=self.IMAGE_SIZE, face_box=box))
+                for i, (data, box) in enumerate(zip(images_data, boxes))
+            ]
+            if detect_faces:
+                images = [
+                    guarded(i, lambda: self._crop_detected_face(img)) if img is not None and box is None else img
+                    for i, (img, box) in enumerate(zip(images, boxes))
+                ]
+            t1 = time.perf_counter()
 
-            # 임베딩 추출(기울기 계산 비활성화 => 메모리 절약)
-            with torch.no_grad():
-                image_features = self._model.encode_image(image_tensor)
+            # CLIP 전처리 (실패한 이미지 제외)
+            tensors = [
+                guarded(i, lambda: self._preprocess(img)) if img is not None else None
+                for i, img in enumerate(images)
+            ]
+            tensors = [tensor for tensor in tensors if tensor is not None]
+            t2 = time.perf_counter()
+
+            if tensors:
+                # 임베딩 추출 (백엔드별 forward, 기울기 계산 비활성화)
+                image_features = self._engine.encode(torch.stack(tensors, dim=0))
 
                 # L2 정규화 (코사인 유사도 계산)
-                image_features = image_features / image_features.norm(dim=-1, keepdim=True)
-            
-            # numpy 배열로 변환 후 반환
-            return image_features.cpu().numpy()[0]
+                embeddings = image_features / np.linalg.norm(image_features, axis=-1, keepdims=True)
+            else:
+                # errors를 전달했고 모든 이미지가 실패한 경우
+                embeddings = np.zeros((0, 0), dtype=np.float32)
+            t3 = time.perf_counter()
+
+            if timings is not None:
+                timings["decode"] = t1 - t0
+                timings["preprocess"] = t2 - t1
+                timings["forward"] = t3 - t2
+
+            return embeddings
         except Exception as e:
-            print(f"임베딩 추출 실패: {str(e)}")
+            logger.warning(f"임베딩 추출 실패: {str(e)}")
             raise
-# 전역 인스턴스 생성
+
+    @staticmethod
+    def _crop_detected_face(image: Image.Image) -> Image.Image:
+        """
+        축소 디코딩된 이미지에서 얼굴을 감지해 크롭 (감지 실패 시 전체 이미지)
+        """
+        box = face_detector.detect(image)
+        if box is None:
+            return image
+        return image.crop(expand_face_box(box, *image.size))
+
+
+# 전역 인스턴스 생성 (모델은 지연 로딩)
 clip_service = CLIPService()
\ No newline at end of file
@@ -0,0 +1,288 @@
+"""
+이미지 임베딩 캐시
+- 키: 원본 이미지 바이트 + 모델 식별자의 SHA-256 해시 (content-addressed)
+- 메모리 계층: LRU + TTL + 바이트 상한
+- 디스크 계층 (선택): 임베딩을 .npy로 보관, 바이트 상한을 넘으면 오래 안 쓴 파일부터 삭제
+  - 파일 읽기/쓰기는 전용 스레드에서 실행 (이벤트 루프를 막지 않음)
+- 같은 이미지가 다시 올라오면 디코딩/전처리/모델 추론을 건너뜀
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 1024))  # 0이면 비활성화
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+EMBEDDING_CACHE_TTL = float(os.getenv("EMBEDDING_CACHE_TTL", 24 * 60 * 60))  # 초
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR")  # 설정 시 디스크 계층 사용
+EMBEDDING_CACHE_DISK_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_DISK_MAX_BYTES", 256 * 1024 * 1024))
+DISK_IO_THREADS = 2  # 디스크 계층 읽기/쓰기 스레드 수
+
+
+def content_digest(image_data: bytes, model_id: str) -> str:
+    """
+    이미지 바이트 + 모델 식별자 해시
+    - 모델이 바뀌면 키도 바뀌어 이전 임베딩을 재사용하지 않음
+    """
+    h = hashlib.sha256()
+    h.update(model_id.encode("utf-8"))
+    h.update(b"\0")
+    h.update(image_data)
+    return h.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    LRU/TTL 임베딩 캐시 (스레드 안전)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = EMBEDDING_CACHE_SIZE,
+        max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+        ttl_seconds: float = EMBEDDING_CACHE_TTL,
+        disk_dir: Optional[str] = EMBEDDING_CACHE_DIR,
+        disk_max_bytes: int = EMBEDDING_CACHE_DISK_MAX_BYTES,
+    ):
+        """
+        Args:
+            max_entries: 메모리 계층 최대 항목 수 (0이면 캐시 비활성화)
+            max_bytes: 메모리 계층 최대 바이트
+            ttl_seconds: 항목 유효 시간 (0 이하면 만료 없음)
+            disk_dir: 디스크 계층 디렉토리 (None이면 사용 안 함)
+            disk_max_bytes: 디스크 계층 최대 바이트 (넘으면 오래 안 쓴 파일부터 삭제)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # 디스크 계층 색인 (키 → 파일 크기, LRU 순서)
+        self._disk_entries: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._disk_executor: Optional[ThreadPoolExecutor] = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_executor = ThreadPoolExecutor(
+                max_workers=DISK_IO_THREADS,
+                thread_name_prefix="embedding-cache-disk",
+            )
+            self._scan_disk()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    async def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        캐시 조회 (메모리 → 디스크 순서, 디스크는 스레드에서 읽음)
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                embedding, expires_at = entry
+                if self.ttl <= 0 or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return embedding
+                self._remove(key)
+
+        embedding = None
+        if self._disk_executor is not None:
+            loop = asyncio.get_running_loop()
+            embedding = await loop.run_in_executor(self._disk_executor, self._disk_get, key, now)
+
+        with self._lock:
+            if embedding is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._insert(key, embedding, now)
+        return embedding
+
+    def put(self, key: str, embedding: np.ndarray) -> None:
+        """
+        캐시 저장 (메모리는 바로, 디스크는 스레드에서 기록 - 완료를 기다리지 않음)
+        """
+        if not self.enabled:
+            return
+
+        # 호출자가 결과를 수정해도 캐시가 오염되지 않도록 읽기 전용 복사본 저장
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+
+        with self._lock:
+            self._insert(key, embedding, time.time())
+        if self._disk_executor is not None:
+            self._disk_executor.submit(self._disk_put, key, embedding)
+
+    def _insert(self, key: str, embedding: np.ndarray, now: float) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (embedding, now + self.ttl)
+        self._bytes += embedding.nbytes
+
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        embedding, _ = self._entries.pop(key)
+        self._bytes -= embedding.nbytes
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.npy")
+
+    def _scan_disk(self) -> None:
+        """
+        시작 시 기존 디스크 캐시 파일로 색인 구성 (접근 시각 순서 = LRU 순서)
+        - 접근 시각은 적중할 때 _disk_get이 직접 갱신 (noatime 마운트와 무관), TTL은 수정 시각(기록 시각) 기준
+        - 재시작해도 상한이 유지되도록 기존 파일까지 포함해서 바로 정리
+        """
+        files = []
+        for directory, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if not name.endswith(".npy"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(directory, name))
+                except OSError:
+                    continue
+                files.append((stat.st_atime, name[:-len(".npy")], stat.st_size))
+
+        with self._lock:
+            for _, key, size in sorted(files):
+                self._disk_entries[key] = size
+                self._disk_bytes += size
+            evicted = self._disk_evict()
+        self._disk_remove_files(evicted)
+
+    def _disk_evict(self) -> List[str]:
+        """
+        디스크 계층이 상한을 넘으면 오래 안 쓴 키부터 색인에서 제거 (lock 안에서 호출)
+
+        Returns:
+            삭제할 키 목록 (파일 삭제는 lock 밖에서)
+        """
+        evicted = []
+        while self._disk_entries and self._disk_bytes > self.disk_max_bytes:
+            key, size = self._disk_entries.popitem(last=False)
+            self._disk_bytes -= size
+            self.disk_evictions += 1
+            evicted.append(key)
+        return evicted
+
+    def _disk_remove_files(self, keys: List[str]) -> None:
+        for key in keys:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def _disk_forget(self, key: str) -> None:
+        with self._lock:
+            size = self._disk_entries.pop(key, None)
+            if size is not None:
+                self._disk_bytes -= size
+
+    def _disk_get(self, key: str, now: float) -> Optional[np.ndarray]:
+        path = self._disk_path(key)
+        try:
+            if self.ttl > 0 and os.path.getmtime(path) + self.ttl <= now:
+                os.remove(path)
+                self._disk_forget(key)
+                return None
+            embedding = np.load(path)
+            # 적중 기록: 접근 시각만 갱신 (재시작 후 LRU 순서 복원용, 수정 시각은 TTL용으로 유지)
+            os.utime(path, (now, os.path.getmtime(path)))
+        except (OSError, ValueError):
+            return None
+
+        with self._lock:
+            if key in self._disk_entries:
+                self._disk_entries.move_to_end(key)
+        embedding.setflags(write=False)
+        return embedding
+
+    def _disk_put(self, key: str, embedding: np.ndarray) -> None:
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, embedding)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ 임베딩 디스크 캐시 저장 실패: {str(e)}")
+            return
+
+        with self._lock:
+            previous = self._disk_entries.pop(key, None)
+            if previous is not None:
+                self._disk_bytes -= previous
+            self._disk_entries[key] = size
+            self._disk_bytes += size
+            evicted = self._disk_evict()
+        self._disk_remove_files(evicted)
+
+    def close(self) -> None:
+        """
+        디스크 기록 스레드 종료 (대기 중인 기록은 마침)
+        """
+        if self._disk_executor is not None:
+            self._disk_executor.shutdown(wait=True)
+            self._disk_executor = None
+
+    def stats(self) -> Dict[str, float]:
+        """
+        캐시 적중/미스 통계
+        """
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_entries": len(self._disk_entries),
+            "disk_bytes": self._disk_bytes,
+            "disk_evictions": self.disk_evictions,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# 전역 인스턴스 생성
+embedding_cache = EmbeddingCache()
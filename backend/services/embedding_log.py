@@ -0,0 +1,278 @@
+"""
+임베딩 로그 (선택, EMBEDDING_LOG_DIR 설정 시)
+- 업로드 임베딩과 매칭 결과(+ 매칭 필터)를 고정 크기 바이너리 레코드로 추가 기록 (append-only)
+- 요청 경로에서는 레코드를 큐에 넣기만 하고, 파일 기록은 전용 스레드가 모아서 처리
+- 읽기는 memmap (파일 전체를 메모리에 올리지 않음)
+- 파일 크기 상한 초과 시 새 파일로 교체 (rotation), 워커 프로세스마다 별도 파일
+- 프로토타입을 다시 만든 뒤 scripts/rematch_log.py로 매칭 변화 측정
+"""
+
+import functools
+import glob
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+EMBEDDING_LOG_DIR = os.getenv("EMBEDDING_LOG_DIR")  # 미설정 시 비활성화
+EMBEDDING_LOG_MAX_BYTES = int(os.getenv("EMBEDDING_LOG_MAX_BYTES", 64 * 1024 * 1024))
+EMBEDDING_LOG_QUEUE = int(os.getenv("EMBEDDING_LOG_QUEUE", 4096))  # 기록 대기 레코드 최대 수
+
+LOG_MAGIC = b"SFEMBLOG"
+LOG_VERSION = 2  # 2: 매칭 필터 필드 추가 (1은 읽기만 지원, 필터 없음으로 취급)
+FILTER_BYTES = 128
+# 헤더: 매직(8) + 버전(u32) + 임베딩 차원(u32)
+HEADER = struct.Struct("<8sII")
+
+
+@functools.lru_cache(maxsize=None)
+def record_dtype(dim: int, version: int = LOG_VERSION) -> np.dtype:
+    """
+    로그 레코드 구조 (고정 크기)
+    """
+    fields = [
+        ("timestamp", "<f8"),
+        ("digest", "S32"),  # 이미지 콘텐츠 해시 (SHA-256 raw)
+        ("catalog_version", "<i4"),
+        ("character_id", "<i8"),  # 매칭된 캐릭터 id (없으면 -1)
+        ("cosine", "<f4"),
+    ]
+    if version >= 2:
+        fields.append(("filter", f"S{FILTER_BYTES}"))  # MatchFilter.to_dict() compact JSON (필터 없으면 빈 값)
+    fields.append(("embedding", "<f4", (dim,)))
+    return np.dtype(fields)
+
+
+def encode_filter(filters: Optional[Dict[str, Any]]) -> bytes:
+    """
+    필터 조건 → 레코드 필드 값 (조건이 없으면 b"")
+
+    Raises:
+        ValueError: FILTER_BYTES보다 긴 경우 (잘라서 저장하면 다른 필터가 되므로 기록하지 않음)
+    """
+    if not filters:
+        return b""
+    encoded = json.dumps(filters, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    if len(encoded) > FILTER_BYTES:
+        raise ValueError(f"필터가 너무 깁니다 ({len(encoded)}바이트, 최대 {FILTER_BYTES})")
+    return encoded
+
+
+def decode_filter(value: bytes) -> Dict[str, Any]:
+    return json.loads(value.decode("utf-8")) if value else {}
+
+
+def read_log(path: str) -> np.ndarray:
+    """
+    로그 파일을 memmap 레코드 배열로 열기
+    - 기록 도중 종료되어 잘린 마지막 레코드는 무시
+
+    Raises:
+        ValueError: 임베딩 로그 파일이 아닌 경우
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"임베딩 로그 헤더가 잘렸습니다: {path}")
+
+    magic, version, dim = HEADER.unpack(header)
+    if magic != LOG_MAGIC or version not in (1, LOG_VERSION):
+        raise ValueError(f"임베딩 로그 파일이 아닙니다: {path}")
+
+    dtype = record_dtype(dim, version)
+    count = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(count,))
+
+
+def log_files(log_dir: str) -> List[str]:
+    """
+    로그 디렉토리의 파일 목록 (기록 순서)
+    """
+    return sorted(glob.glob(os.path.join(log_dir, "embeddings-*.bin")))
+
+
+class EmbeddingLog:
+    """
+    append-only 임베딩 로그 작성기
+    - append는 레코드를 만들어 큐에 넣기만 함 (요청 경로에서 파일 I/O 없음)
+    - 기록 스레드가 쌓인 레코드를 모아서 기록하고 flush는 묶음당 1번
+    - 큐가 가득 차면(디스크가 느린 경우) 레코드를 버리고 dropped 증가
+    - 기록 실패는 경고만 남기고 요청에는 영향 없음
+    """
+
+    def __init__(
+        self,
+        log_dir: Optional[str] = EMBEDDING_LOG_DIR,
+        max_bytes: int = EMBEDDING_LOG_MAX_BYTES,
+        max_queue: int = EMBEDDING_LOG_QUEUE,
+    ):
+        """
+        Args:
+            log_dir: 로그 디렉토리 (None이면 비활성화)
+            max_bytes: 파일 하나의 최대 크기 (넘으면 새 파일)
+            max_queue: 기록 대기 레코드 최대 수
+        """
+        self.log_dir = log_dir
+        self.max_bytes = max_bytes
+
+        self._file = None
+        self._dim: Optional[int] = None
+        self._size = 0
+        self._sequence = 0
+        self._queue: "queue.Queue[Optional[np.ndarray]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.records = 0
+        self.rotations = 0
+        self.errors = 0
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.log_dir)
+
+    def append(
+        self,
+        digest: str,
+        embedding: np.ndarray,
+        character: Optional[Dict[str, Any]],
+        cosine: float,
+        catalog_version: int,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        레코드 하나 추가 (기록은 백그라운드 스레드)
+
+        Args:
+            digest: 이미지 콘텐츠 해시 (hex)
+            embedding: (D,) 사용자 임베딩
+            character: 매칭된 캐릭터 (None이면 id -1)
+            cosine: 매칭 코사인 유사도
+            catalog_version: 매칭에 사용한 카탈로그 스냅샷 버전
+            filters: 매칭에 적용한 필터 조건 (MatchFilter.to_dict(), 없으면 None)
+        """
+        if not self.enabled:
+            return
+
+        character_id = character.get("id") if character is not None else None
+        try:
+            record = np.zeros(1, dtype=record_dtype(embedding.shape[-1]))
+            record["timestamp"] = time.time()
+            record["digest"] = bytes.fromhex(digest)
+            record["catalog_version"] = catalog_version
+            record["character_id"] = int(character_id) if isinstance(character_id, (int, np.integer)) else -1
+            record["cosine"] = cosine
+            record["filter"] = encode_filter(filters)
+            record["embedding"] = embedding
+        except ValueError as e:
+            self.errors += 1
+            logger.warning(f"⚠️ 임베딩 로그 기록 실패: {str(e)}")
+            return
+
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_writer(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name="embedding-log", daemon=True)
+                self._thread.start()
+
+    def _write_loop(self) -> None:
+        """
+        기록 스레드: 큐에 쌓인 레코드를 모아서 기록 (None을 받으면 남은 레코드를 기록하고 종료)
+        """
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(record is None for record in batch)
+            records = [record for record in batch if record is not None]
+            if records:
+                self._write(records)
+            if stop:
+                return
+
+    def _write(self, records: List[np.ndarray]) -> None:
+        try:
+            for record in records:
+                itemsize = record.dtype.itemsize
+                dim = record.dtype["embedding"].shape[0]
+                if self._file is None or dim != self._dim or self._size + itemsize > self.max_bytes:
+                    self._rotate(dim)
+                self._file.write(record.tobytes())
+                self._size += itemsize
+                self.records += 1
+            self._file.flush()
+        except (OSError, ValueError) as e:
+            self.errors += 1
+            logger.warning(f"⚠️ 임베딩 로그 기록 실패: {str(e)}")
+
+    def _rotate(self, dim: int) -> None:
+        """
+        현재 파일을 닫고 새 파일 시작 (파일명: 시작 시각 ms + pid + 일련번호)
+        """
+        if self._file is not None:
+            self._file.close()
+            self.rotations += 1
+
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._sequence += 1
+        path = os.path.join(
+            self.log_dir,
+            f"embeddings-{int(time.time() * 1000):013d}-{os.getpid()}-{self._sequence:06d}.bin",
+        )
+        self._file = open(path, "xb")
+        self._dim = dim
+        self._file.write(HEADER.pack(LOG_MAGIC, LOG_VERSION, dim))
+        self._size = HEADER.size
+        logger.info(f"📝 임베딩 로그 파일 시작: {path}")
+
+    def close(self) -> None:
+        """
+        대기 중인 레코드를 모두 기록한 뒤 파일 닫기
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "records": self.records,
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+            "errors": self.errors,
+        }
+
+
+# 전역 인스턴스 생성 (파일은 첫 기록 시 생성)
+embedding_log = EmbeddingLog()
@@ -0,0 +1,136 @@
+"""
+얼굴 영역 크롭
+- 클라이언트가 보낸 얼굴 박스(x,y,w,h) 파싱 및 여백/정사각형 보정
+- 선택: 서버측 CPU 얼굴 감지 (OpenCV Haar cascade, FACE_DETECTOR=haar)
+  → 배경 대신 얼굴 영역만 CLIP 전처리에 넣어서 매칭이 얼굴에 집중되도록 함
+"""
+
+import logging
+import os
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2
+except ImportError:  # 선택 의존성 (opencv-python-headless)
+    cv2 = None
+
+
+logger = logging.getLogger(__name__)
+
+
+FACE_DETECTOR = os.getenv("FACE_DETECTOR", "none")  # "none" or "haar"
+FACE_CROP_MARGIN = float(os.getenv("FACE_CROP_MARGIN", 0.4))  # 박스 한 변 대비 여백 비율
+# 감지 최소 얼굴 크기 (이미지 짧은 변 대비 비율)
+FACE_MIN_SIZE_RATIO = float(os.getenv("FACE_MIN_SIZE_RATIO", 0.1))
+
+FACE_DETECTORS = ("none", "haar")
+
+FaceBox = Tuple[int, int, int, int]  # (x, y, w, h)
+
+
+def parse_face_box(value: Optional[str]) -> Optional[FaceBox]:
+    """
+    "x,y,w,h" 문자열 파싱 (원본 이미지 픽셀 좌표)
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 크기가 0 이하인 경우
+    """
+    if value is None or not value.strip():
+        return None
+
+    parts = value.split(",")
+    if len(parts) != 4:
+        raise ValueError("얼굴 박스는 'x,y,w,h' 형식이어야 합니다.")
+    try:
+        x, y, w, h = (int(round(float(part))) for part in parts)
+    except ValueError as e:
+        raise ValueError("얼굴 박스 값은 숫자여야 합니다.") from e
+    if w <= 0 or h <= 0:
+        raise ValueError("얼굴 박스 크기는 0보다 커야 합니다.")
+    return x, y, w, h
+
+
+def expand_face_box(
+    box: FaceBox,
+    width: int,
+    height: int,
+    margin: float = FACE_CROP_MARGIN,
+) -> Tuple[int, int, int, int]:
+    """
+    얼굴 박스에 여백을 더하고 정사각형으로 맞춘 크롭 영역
+    - CLIP 전처리는 중앙 정사각형 크롭이므로 정사각형이어야 얼굴이 잘리지 않음
+    - 이미지 밖으로 나가면 안쪽으로 밀어 넣고, 그래도 크면 이미지 크기로 제한
+
+    Returns:
+        (left, top, right, bottom) 크롭 영역
+    """
+    x, y, w, h = box
+    side = int(round(max(w, h) * (1 + 2 * margin)))
+    side = max(1, min(side, width, height))
+
+    cx = x + w / 2
+    cy = y + h / 2
+    left = int(round(cx - side / 2))
+    top = int(round(cy - side / 2))
+    left = min(max(left, 0), width - side)
+    top = min(max(top, 0), height - side)
+    return left, top, left + side, top + side
+
+
+class FaceDetector:
+    """
+    OpenCV Haar cascade 얼굴 감지 (CPU, 수 ms)
+    - cascade 객체는 스레드마다 따로 생성 (추론 워커 스레드 간 공유하지 않음)
+    - OpenCV가 없으면 경고 후 비활성화
+    """
+
+    def __init__(self, kind: str = FACE_DETECTOR, min_size_ratio: float = FACE_MIN_SIZE_RATIO):
+        if kind not in FACE_DETECTORS:
+            raise ValueError(f"지원하지 않는 얼굴 감지기: {kind}")
+        if kind != "none" and cv2 is None:
+            logger.warning("⚠️ opencv-python-headless가 설치되지 않아 얼굴 감지를 사용하지 않습니다.")
+            kind = "none"
+
+        self.kind = kind
+        self.min_size_ratio = min_size_ratio
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        return self.kind != "none"
+
+    def _cascade(self):
+        cascade = getattr(self._local, "cascade", None)
+        if cascade is None:
+            path = os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+            cascade = cv2.CascadeClassifier(path)
+            self._local.cascade = cascade
+        return cascade
+
+    def detect(self, image: Image.Image) -> Optional[FaceBox]:
+        """
+        가장 큰 얼굴 박스 반환 (없으면 None)
+        """
+        if not self.enabled:
+            return None
+
+        gray = np.asarray(image.convert("L"))
+        min_side = max(int(min(gray.shape) * self.min_size_ratio), 24)
+        faces = self._cascade().detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(min_side, min_side),
+        )
+        if len(faces) == 0:
+            return None
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        return int(x), int(y), int(w), int(h)
+
+
+# 전역 인스턴스 생성
+face_detector = FaceDetector()
@@ -0,0 +1,93 @@
+"""
+빠른 JSON 응답
+- 캐릭터 공개 페이로드를 카탈로그 로딩 시 한 번만 만들고 JSON 조각(bytes)으로 미리 인코딩
+- 응답은 미리 인코딩된 조각을 이어 붙이고 나머지 값만 orjson으로 인코딩
+- orjson이 없으면 표준 json으로 대체 (결과는 동일)
+"""
+
+import json
+from typing import Any, Dict
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+
+# 응답에 노출하는 캐릭터 필드 (순서 유지, 값이 없으면 null)
+PUBLIC_CHARACTER_FIELDS = ("id", "name", "age", "gender", "occupation", "portrait_path")
+# 값이 있을 때만 붙이는 필드 (기존 응답 형태를 바꾸지 않도록 null로 내보내지 않음)
+OPTIONAL_CHARACTER_FIELDS = ("portraits",)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    값 하나를 JSON bytes로 인코딩 (numpy 스칼라/배열 지원)
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"JSON으로 변환할 수 없는 타입: {type(value).__name__}")
+
+
+class CharacterPayload(dict):
+    """
+    캐릭터 공개 페이로드 (dict + 미리 인코딩된 JSON 조각)
+    - 스냅샷마다 캐릭터당 하나만 만들어 모든 응답이 공유 → 수정 금지
+    """
+
+    __slots__ = ("json",)
+
+    def __init__(self, fields: Dict[str, Any]):
+        super().__init__(fields)
+        self.json: bytes = dumps(fields)
+
+    @classmethod
+    def from_meta(cls, meta: Dict[str, Any]) -> "CharacterPayload":
+        fields = {field: meta.get(field) for field in PUBLIC_CHARACTER_FIELDS}
+        fields.update((field, meta[field]) for field in OPTIONAL_CHARACTER_FIELDS if meta.get(field) is not None)
+        return cls(fields)
+
+
+def encode_response(content: Any) -> bytes:
+    """
+    응답 인코딩
+    - CharacterPayload는 미리 인코딩된 조각을 그대로 사용
+    - dict/list는 구조만 이어 붙이고 스칼라 값만 인코딩
+    """
+    if isinstance(content, CharacterPayload):
+        return content.json
+    if isinstance(content, dict):
+        return b"{" + b",".join(
+            dumps(str(key)) + b":" + encode_response(value) for key, value in content.items()
+        ) + b"}"
+    if isinstance(content, (list, tuple)):
+        return b"[" + b",".join(encode_response(value) for value in content) + b"]"
+    return dumps(content)
+
+
+class FragmentJSONResponse(Response):
+    """
+    미리 인코딩된 캐릭터 조각을 이어 붙이는 응답 (매칭 엔드포인트용)
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return encode_response(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjson 기반 기본 응답 클래스 (orjson이 없으면 표준 json)
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,258 @@
+"""
+업로드 이미지 수집/디코딩 파이프라인
+- 요청 본문을 스트리밍으로 세면서 크기 초과 시 버퍼링 전에 413 거절
+- 업로드 파일을 청크 단위로 읽으며 상한 검사
+- 헤더만 읽어 픽셀 수 제한 검사 (디코딩 전)
+- JPEG는 draft()로 DCT 단계에서 축소 디코딩, 그 외 포맷은 thumbnail() 후 RGB 변환
+  → 10MB 휴대폰 사진도 모델 입력 크기(224px) 근처까지만 디코딩
+- 얼굴 박스가 주어지면 얼굴 영역만 잘라서 그 영역 기준으로 축소
+- EXIF 방향(휴대폰 사진 회전) 적용: 박스는 회전된 이미지 좌표 기준 (브라우저와 동일)
+  → 박스를 원본 좌표로 바꿔 자르고, 회전은 축소된 결과에만 적용
+"""
+
+import io
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+
+from services.face_crop import FaceBox, expand_face_box
+
+
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", 40_000_000))  # 약 40MP
+# 모델 입력 크기 대비 디코딩 해상도 배수 (최종 리사이즈 품질 유지용 여유)
+DECODE_OVERSAMPLE = float(os.getenv("DECODE_OVERSAMPLE", 2.0))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# multipart 경계/헤더 여유분
+MULTIPART_OVERHEAD = 64 * 1024
+
+EXIF_ORIENTATION = 0x0112
+# EXIF 방향 → 저장된 픽셀을 보이는 방향으로 돌리는 변환 (ImageOps.exif_transpose와 동일)
+ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+class ImageTooLargeError(Exception):
+    """
+    이미지 파일 크기 또는 픽셀 수 초과 (HTTP 413)
+    """
+
+
+class InvalidImageError(Exception):
+    """
+    디코딩할 수 없는 이미지 (HTTP 400)
+    """
+
+
+async def read_upload(file: UploadFile, max_bytes: int) -> bytes:
+    """
+    업로드 파일을 청크 단위로 읽으며 크기 제한 검사
+    - 상한을 넘는 순간 중단 (전체를 메모리에 올리지 않음)
+    """
+    size = getattr(file, "size", None)
+    if size is not None and size > max_bytes:
+        raise ImageTooLargeError("파일이 너무 큽니다.")
+
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise ImageTooLargeError("파일이 너무 큽니다.")
+    return bytes(buffer)
+
+
+def image_orientation(image: Image.Image) -> int:
+    """
+    EXIF 방향 값 (없거나 읽을 수 없으면 1 = 회전 없음)
+    """
+    try:
+        orientation = image.getexif().get(EXIF_ORIENTATION, 1)
+    except Exception:
+        return 1
+    return orientation if orientation in ORIENTATION_TRANSPOSE else 1
+
+
+def to_stored_box(
+    region: Tuple[int, int, int, int],
+    orientation: int,
+    width: int,
+    height: int,
+) -> Tuple[int, int, int, int]:
+    """
+    보이는 방향 좌표의 영역 (x0, y0, x1, y1) → 저장된 픽셀 좌표의 영역
+
+    Args:
+        width, height: 저장된 픽셀 크기 (회전 전)
+    """
+    x0, y0, x1, y1 = region
+    if orientation == 2:
+        return width - x1, y0, width - x0, y1
+    if orientation == 3:
+        return width - x1, height - y1, width - x0, height - y0
+    if orientation == 4:
+        return x0, height - y1, x1, height - y0
+    if orientation == 5:
+        return y0, x0, y1, x1
+    if orientation == 6:
+        return y0, height - x1, y1, height - x0
+    if orientation == 7:
+        return width - y1, height - x1, width - y0, height - x0
+    if orientation == 8:
+        return width - y1, x0, width - y0, x1
+    return region
+
+
+def decode_image(
+    image_data: bytes,
+    target_size: int = 224,
+    max_pixels: int = MAX_IMAGE_PIXELS,
+    oversample: float = DECODE_OVERSAMPLE,
+    face_box: Optional[FaceBox] = None,
+) -> Image.Image:
+    """
+    크기 인지형 이미지 디코딩
+
+    Args:
+        image_data: 이미지 바이트
+        target_size: 모델 입력 크기 (짧은 변 기준)
+        max_pixels: 허용 최대 픽셀 수 (가로 x 세로)
+        oversample: 짧은 변을 target_size * oversample 까지만 유지
+        face_box: 얼굴 박스 (x, y, w, h), EXIF 방향을 적용한 이미지 좌표 기준,
+            주어지면 여백을 더한 정사각형 영역만 사용
+
+    Returns:
+        EXIF 방향을 적용하고 짧은 변이 약 target_size * oversample 이하로 축소된 RGB 이미지
+    """
+    try:
+        # 헤더만 파싱 (픽셀 데이터는 아직 디코딩하지 않음)
+        image = Image.open(io.BytesIO(image_data))
+        width, height = image.size
+        orientation = image_orientation(image)
+    except Exception as e:
+        raise InvalidImageError(f"이미지를 읽을 수 없습니다: {str(e)}") from e
+
+    if width * height > max_pixels:
+        raise ImageTooLargeError(f"이미지 해상도가 너무 큽니다 ({width}x{height})")
+
+    # 박스는 보이는 방향 기준 → 90도 회전이면 가로/세로가 바뀐 크기로 계산 후 원본 좌표로 변환
+    rotated = orientation in (5, 6, 7, 8)
+    shown_width, shown_height = (height, width) if rotated else (width, height)
+    region = (0, 0, width, height)
+    if face_box is not None:
+        region = to_stored_box(expand_face_box(face_box, shown_width, shown_height), orientation, width, height)
+    region_width = region[2] - region[0]
+    region_height = region[3] - region[1]
+    short_side = min(region_width, region_height)
+    keep_side = max(int(target_size * oversample), target_size)
+
+    try:
+        scale = min(keep_side / short_side, 1.0)
+
+        # JPEG: 1/2, 1/4, 1/8 스케일 디코딩 (요청 크기 이상으로 유지)
+        if scale < 1.0 and image.format == "JPEG":
+            image.draft("RGB", (max(int(width * scale), 1), max(int(height * scale), 1)))
+
+        # 얼굴 영역 크롭 (draft로 줄어든 크기에 맞춰 좌표 변환)
+        if face_box is not None:
+            fx = image.size[0] / width
+            fy = image.size[1] / height
+            image = image.crop((
+                int(region[0] * fx),
+                int(region[1] * fy),
+                max(int(region[2] * fx), int(region[0] * fx) + 1),
+                max(int(region[3] * fy), int(region[1] * fy) + 1),
+            ))
+
+        if scale < 1.0:
+            box = (max(int(region_width * scale), 1), max(int(region_height * scale), 1))
+
+            # 팔레트/1비트 이미지는 리사이즈 품질을 위해 먼저 변환
+            if image.mode in ("P", "PA", "1"):
+                image = image.convert("RGBA" if "transparency" in image.info or image.mode == "PA" else "RGB")
+
+            image.thumbnail(box, Image.Resampling.BICUBIC)
+
+        # 회전은 축소된 이미지에만 적용 (원본 해상도 회전 비용 없음)
+        if orientation != 1:
+            image = image.transpose(ORIENTATION_TRANSPOSE[orientation])
+
+        return image.convert("RGB")
+    except Exception as e:
+        raise InvalidImageError(f"이미지 디코딩 실패: {str(e)}") from e
+
+
+class UploadSizeLimitMiddleware:
+    """
+    요청 본문 크기 제한 ASGI 미들웨어
+    - Content-Length가 상한을 넘으면 본문을 받기 전에 413
+    - 청크 전송 등 길이를 모르는 경우 수신 바이트를 세다가 상한 초과 시 413
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        """
+        Args:
+            limits: {경로: 최대 본문 바이트}
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limits.get(scope.get("path", ""))
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = _header(scope["headers"], b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await _send_413(send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # FastAPI 본문 파싱 단계에서 HTTPException은 그대로 전파되어 413 응답
+                    raise HTTPException(status_code=413, detail="요청이 너무 큽니다.")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _header(headers: Iterable, name: bytes):
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _send_413(send) -> None:
+    body = '{"detail":"요청이 너무 큽니다."}'.encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"connection", b"close"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
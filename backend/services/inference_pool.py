@@ -0,0 +1,260 @@
+"""
+CLIP 추론 워커 풀
+- 블로킹 추론(PIL 디코딩 + torch forward)을 이벤트 루프 밖에서 실행
+- 스레드 / 프로세스 실행기 선택 가능
+- 대기열 상한 초과 시 즉시 거절 (503 backpressure)
+- 단계별 소요 시간 집계, 추론 호출 시간은 latency_listeners에 전달 (수락 제어 한도 조정)
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.face_crop import FaceBox, face_detector
+from services.metrics import observe_stage
+
+
+logger = logging.getLogger(__name__)
+
+
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")  # "thread" or "process"
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 1))
+INFERENCE_TORCH_THREADS = int(os.getenv("INFERENCE_TORCH_THREADS", 0))  # 0이면 torch 기본값 유지
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", 32))
+
+STAGES = ("queue", "decode", "preprocess", "forward")
+
+
+class InferenceQueueFullError(Exception):
+    """
+    추론 대기열이 가득 찬 경우 (HTTP 503으로 변환)
+    """
+
+
+def _init_worker(torch_threads: int) -> None:
+    """
+    워커 초기화
+    - torch intra-op 스레드 수 설정
+    - 프로세스 워커는 여기서 모델을 로딩
+    """
+    import torch
+
+    if torch_threads > 0:
+        torch.set_num_threads(torch_threads)
+
+    from services.clip_service import clip_service
+
+    clip_service.load()
+
+
+def _extract(
+    images_data: List[bytes],
+    face_boxes: Optional[List[Optional[FaceBox]]] = None,
+    isolate_errors: bool = False,
+) -> Tuple[np.ndarray, Dict[str, float], Optional[List[Optional[Exception]]]]:
+    """
+    워커에서 실행되는 추론 함수 (프로세스 실행기에서 pickle 가능하도록 모듈 함수로 정의)
+    - 얼굴 감지 시간은 decode 단계에 포함
+    - isolate_errors면 이미지별 실패를 목록으로 반환하고 나머지만 forward
+    """
+    from services.clip_service import clip_service
+
+    timings: Dict[str, float] = {}
+    errors: Optional[List[Optional[Exception]]] = [] if isolate_errors else None
+    embeddings = clip_service.extract_embeddings(
+        images_data,
+        timings=timings,
+        face_boxes=face_boxes,
+        detect_faces=face_detector.enabled,
+        errors=errors,
+    )
+    return embeddings, timings, errors
+
+
+class InferencePool:
+    """
+    바운디드 추론 워커 풀
+    - 대기 + 실행 중인 이미지 수가 max_queue를 넘으면 InferenceQueueFullError
+    - 스레드 모드: torch 스레드 수는 프로세스 전역 설정 (워커 전체가 공유)
+    - 프로세스 모드: 워커마다 모델을 로딩하고 torch 스레드 수를 개별 설정
+    """
+
+    def __init__(
+        self,
+        executor: str = INFERENCE_EXECUTOR,
+        workers: int = INFERENCE_WORKERS,
+        torch_threads: int = INFERENCE_TORCH_THREADS,
+        max_queue: int = INFERENCE_MAX_QUEUE,
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError("executor는 'thread' 또는 'process' 여야 합니다.")
+        if workers < 1:
+            raise ValueError("workers는 1 이상이어야 합니다.")
+
+        self.executor_type = executor
+        self.workers = workers
+        self.torch_threads = torch_threads
+        self.max_queue = max_queue
+
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        # 성공한 추론 호출마다 (대기열 + 디코딩 + 전처리 + forward) 시간(초)을 받는 콜백
+        self.latency_listeners: List[Callable[[float], None]] = []
+
+        # 단계별 누적 통계: {stage: {"count", "total", "max"}}
+        self.stage_stats: Dict[str, Dict[str, float]] = {
+            stage: {"count": 0, "total": 0.0, "max": 0.0} for stage in STAGES
+        }
+
+    @property
+    def pending(self) -> int:
+        """
+        대기 + 실행 중인 이미지 수
+        """
+        return self._pending
+
+    def start(self) -> None:
+        """
+        실행기 생성
+        """
+        if self._executor is not None:
+            return
+
+        if self.executor_type == "process":
+            # fork 후 torch 스레드풀 교착을 피하기 위해 spawn 사용
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.torch_threads,),
+            )
+        else:
+            _init_worker(self.torch_threads)
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="clip-inference",
+            )
+
+        logger.info(f"✅ 추론 워커 풀 시작 ({self.executor_type} x {self.workers}, 대기열 {self.max_queue})")
+
+    async def warm_up(self) -> None:
+        """
+        워커마다 더미 이미지로 forward 1회 실행
+        - 프로세스 모드에서는 이 시점에 워커 프로세스가 생성되어 모델을 로딩
+        """
+        from services.clip_service import warm_up_image
+
+        image = warm_up_image()
+        await asyncio.gather(*[self.run([image]) for _ in range(self.workers)])
+
+    def shutdown(self) -> None:
+        """
+        실행기 종료
+        """
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+
+    async def run(
+        self,
+        images_data: List[bytes],
+        face_boxes: Optional[List[Optional[FaceBox]]] = None,
+    ) -> np.ndarray:
+        """
+        이미지 배치를 워커에서 추론
+
+        Args:
+            images_data: 이미지 바이트 리스트
+            face_boxes: 이미지별 얼굴 박스 (None이면 전체 이미지)
+
+        Raises:
+            InferenceQueueFullError: 대기열 상한 초과
+
+        Returns:
+            numpy.ndarray: (B, D) L2 정규화된 임베딩 행렬
+        """
+        embeddings, _ = await self._run(images_data, face_boxes, isolate_errors=False)
+        return embeddings
+
+    async def run_each(
+        self,
+        images_data: List[bytes],
+        face_boxes: Optional[List[Optional[FaceBox]]] = None,
+    ) -> Tuple[np.ndarray, List[Optional[Exception]]]:
+        """
+        run과 같지만 이미지별 디코딩/전처리 실패를 격리 (마이크로 배처용)
+        - 실패한 이미지만 빼고 나머지는 한 번의 forward로 처리
+
+        Raises:
+            InferenceQueueFullError: 대기열 상한 초과
+
+        Returns:
+            (성공한 이미지의 임베딩 (B', D) 순서대로, 이미지별 예외 목록 (성공은 None))
+        """
+        return await self._run(images_data, face_boxes, isolate_errors=True)
+
+    async def _run(
+        self,
+        images_data: List[bytes],
+        face_boxes: Optional[List[Optional[FaceBox]]],
+        isolate_errors: bool,
+    ) -> Tuple[np.ndarray, Optional[List[Optional[Exception]]]]:
+        if self._executor is None:
+            self.start()
+
+        size = len(images_data)
+        if self._pending + size > self.max_queue:
+            raise InferenceQueueFullError("추론 대기열이 가득 찼습니다.")
+
+        self._pending += size
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            embeddings, timings, errors = await loop.run_in_executor(
+                self._executor, _extract, images_data, face_boxes, isolate_errors
+            )
+        finally:
+            self._pending -= size
+
+        # 워커 내부 단계를 제외한 나머지 = 대기열 + 전송 시간
+        total = time.perf_counter() - start
+        timings["queue"] = max(total - sum(timings.values()), 0.0)
+        self._record(timings)
+        for listener in self.latency_listeners:
+            listener(total)
+
+        return embeddings, errors
+
+    def _record(self, timings: Dict[str, float]) -> None:
+        for stage, seconds in timings.items():
+            observe_stage(stage, seconds)
+            stat = self.stage_stats.get(stage)
+            if stat is None:
+                continue
+            stat["count"] += 1
+            stat["total"] += seconds
+            stat["max"] = max(stat["max"], seconds)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        단계별 평균/최대 소요 시간 (ms)
+        """
+        return {
+            stage: {
+                "count": int(stat["count"]),
+                "avg_ms": round(stat["total"] / stat["count"] * 1000, 2) if stat["count"] else 0.0,
+                "max_ms": round(stat["max"] * 1000, 2),
+            }
+            for stage, stat in self.stage_stats.items()
+        }
+
+
+# 전역 인스턴스 생성 (실행기는 앱 시작 시 기동)
+inference_pool = InferencePool()
@@ -0,0 +1,316 @@
+"""
+비동기 매칭 작업 큐
+- POST로 작업을 맡기고 바로 작업 id를 받은 뒤, 폴링 또는 SSE로 결과 수신
+  → 트래픽이 몰려도 HTTP 연결을 추론 시간 동안 붙잡지 않음
+- 프로세스 내 우선순위 큐 (priority가 클수록 먼저, 같으면 먼저 들어온 순서)
+- 고정 개수 워커가 꺼내 처리 → 추론 대기열이 가득 차면 실패 대신 잠시 뒤 재시도
+  (JOB_RETRY_TIMEOUT초 동안 계속 가득 차 있으면 503으로 실패 처리)
+- 결과는 크기 제한 + TTL 저장소에 보관 (조회 시 정리)
+- 작업은 워커 프로세스 메모리에만 있음 → 워커가 여럿이면 조회가 다른 워커로 갈 수 있으므로
+  enabled를 끄고 작업 API를 비활성화 (main.py / gunicorn.conf.py)
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+
+logger = logging.getLogger(__name__)
+
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", os.getenv("BATCH_MAX_SIZE", 8)))
+JOB_MAX_QUEUE = int(os.getenv("JOB_MAX_QUEUE", 64))
+JOB_MAX_RESULTS = int(os.getenv("JOB_MAX_RESULTS", 1024))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", 600))
+JOB_RETRY_DELAY = 0.2  # 추론 대기열이 가득 찼을 때 재시도 간격 (초)
+JOB_RETRY_TIMEOUT = float(os.getenv("JOB_RETRY_TIMEOUT", 30))  # 재시도를 포기하기까지의 시간 (초)
+
+JobHandler = Callable[[Any], Awaitable[Dict[str, Any]]]
+
+
+class JobQueueFullError(Exception):
+    """
+    대기 중인 작업이 JOB_MAX_QUEUE개에 도달
+    """
+    pass
+
+
+class Job:
+    """
+    작업 하나 (상태 + 결과)
+    - payload는 처리 후 바로 해제 (업로드 이미지를 결과 보관 기간 동안 들고 있지 않음)
+    """
+
+    __slots__ = (
+        "id", "priority", "sequence", "payload", "status", "result", "error",
+        "created_at", "started_at", "finished_at", "changed",
+    )
+
+    def __init__(self, job_id: str, priority: int, sequence: int, payload: Any):
+        self.id = job_id
+        self.priority = priority
+        self.sequence = sequence
+        self.payload = payload
+        self.status = "queued"
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Dict[str, Any]] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # 상태가 바뀔 때마다 set 후 새 이벤트로 교체 (SSE 대기용)
+        self.changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def notify(self) -> None:
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    def sort_key(self) -> Tuple[int, int]:
+        return -self.priority, self.sequence
+
+
+class JobQueue:
+    """
+    asyncio 기반 우선순위 작업 큐 + TTL 결과 저장소
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_queue: int = JOB_MAX_QUEUE,
+        max_results: int = JOB_MAX_RESULTS,
+        result_ttl: float = JOB_RESULT_TTL,
+        retry_timeout: float = JOB_RETRY_TIMEOUT,
+    ):
+        """
+        Args:
+            workers: 동시에 처리할 작업 수 (마이크로 배치가 찰 수 있도록 배치 크기 정도)
+            max_queue: 대기 중인 작업 최대 수 (넘으면 JobQueueFullError)
+            max_results: 보관할 작업 최대 수 (넘으면 오래된 완료 작업부터 제거)
+            result_ttl: 완료된 작업 보관 시간 (초)
+            retry_timeout: 실행 시작 후 재시도를 계속할 최대 시간 (초, 넘으면 503으로 실패)
+        """
+        if workers < 1:
+            raise ValueError("workers는 1 이상이어야 합니다.")
+
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_results = max_results
+        self.result_ttl = result_ttl
+        self.retry_timeout = retry_timeout
+        # False면 작업 API 비활성화 (워커 프로세스가 여럿인 경우, start 전에 설정)
+        self.enabled = True
+
+        self._handler: Optional[JobHandler] = None
+        self._retryable: Tuple[Type[BaseException], ...] = ()
+        self._heap: List[Tuple[Tuple[int, int], Job]] = []
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.expired = 0
+
+    async def start(self, handler: JobHandler, retryable: Tuple[Type[BaseException], ...] = ()) -> None:
+        """
+        작업 워커 시작 (이벤트 루프 안에서 호출)
+
+        Args:
+            handler: payload를 받아 결과 dict를 반환하는 코루틴 함수
+            retryable: 이 예외로 실패하면 실패 처리 대신 잠시 뒤 다시 실행
+        """
+        if self._tasks:
+            return
+        self._handler = handler
+        self._retryable = retryable
+        self._wakeup = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._worker_loop()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """
+        워커 종료 (대기 중인 작업은 실패 처리)
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        while self._heap:
+            _, job = heapq.heappop(self._heap)
+            self._finish(job, error={"status": 503, "detail": "서버가 종료되어 작업이 취소되었습니다."})
+
+    @property
+    def queued(self) -> int:
+        return len(self._heap)
+
+    async def submit(self, payload: Any, priority: int = 0) -> Job:
+        """
+        작업 등록
+
+        Raises:
+            JobQueueFullError: 대기 중인 작업이 max_queue개 이상인 경우
+        """
+        self._expire()
+        if len(self._heap) >= self.max_queue:
+            raise JobQueueFullError(f"대기 중인 작업이 너무 많습니다 (최대 {self.max_queue}개)")
+
+        job = Job(secrets.token_urlsafe(16), priority, next(self._sequence), payload)
+        self._jobs[job.id] = job
+        heapq.heappush(self._heap, (job.sort_key(), job))
+        self.submitted += 1
+        self._evict()
+
+        if self._wakeup is not None:
+            async with self._wakeup:
+                self._wakeup.notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        작업 조회 (만료되었거나 없으면 None)
+        """
+        self._expire()
+        return self._jobs.get(job_id)
+
+    def position(self, job: Job) -> Optional[int]:
+        """
+        대기 순번 (0이면 다음 차례, 대기 중이 아니면 None)
+        - 대기열은 JOB_MAX_QUEUE개 이하라 매번 세어도 충분히 빠름
+        """
+        if job.status != "queued":
+            return None
+        key = job.sort_key()
+        return sum(1 for other_key, _ in self._heap if other_key < key)
+
+    def to_dict(self, job: Job) -> Dict[str, Any]:
+        """
+        작업 상태 응답 (result는 매칭 응답 그대로)
+        """
+        content: Dict[str, Any] = {"id": job.id, "status": job.status, "created_at": job.created_at}
+        if job.status == "queued":
+            content["position"] = self.position(job)
+        if job.started_at is not None:
+            content["started_at"] = job.started_at
+        if job.finished_at is not None:
+            content["finished_at"] = job.finished_at
+        if job.result is not None:
+            content["result"] = job.result
+        if job.error is not None:
+            content["error"] = job.error
+        return content
+
+    async def _worker_loop(self) -> None:
+        while True:
+            async with self._wakeup:
+                await self._wakeup.wait_for(lambda: bool(self._heap))
+                _, job = heapq.heappop(self._heap)
+
+            job.status = "running"
+            job.started_at = time.time()
+            job.notify()
+            await self._run(job)
+
+    async def _run(self, job: Job) -> None:
+        deadline = time.monotonic() + self.retry_timeout
+        while True:
+            try:
+                result = await self._handler(job.payload)
+            except self._retryable:
+                # 추론 대기열이 가득 참 → 실패시키지 않고 잠시 뒤 다시 시도 (deadline까지만)
+                if time.monotonic() >= deadline:
+                    self._finish(job, error={
+                        "status": 503,
+                        "detail": f"추론 대기열이 {self.retry_timeout:g}초 동안 가득 차 있어 작업을 처리하지 못했습니다.",
+                    })
+                    return
+                self.retries += 1
+                await asyncio.sleep(JOB_RETRY_DELAY)
+                continue
+            except asyncio.CancelledError:
+                self._finish(job, error={"status": 503, "detail": "서버가 종료되어 작업이 취소되었습니다."})
+                raise
+            except Exception as e:
+                # HTTPException 등 status_code/detail이 있는 예외는 그대로 전달
+                status = getattr(e, "status_code", None)
+                if status is None:
+                    status = 500
+                    logger.exception(f"❌ 작업 {job.id} 실패: {str(e)}")
+                self._finish(job, error={"status": status, "detail": getattr(e, "detail", str(e))})
+                return
+            self._finish(job, result=result)
+            return
+
+    def _finish(
+        self,
+        job: Job,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        job.status = "failed" if error is not None else "done"
+        job.result = result
+        job.error = error
+        job.payload = None
+        job.finished_at = time.time()
+        if error is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+        job.notify()
+
+    def _expire(self) -> None:
+        """
+        보관 시간이 지난 완료 작업 제거
+        """
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self.expired += len(expired)
+
+    def _evict(self) -> None:
+        """
+        보관 작업 수가 max_results를 넘으면 가장 오래된 완료 작업부터 제거
+        (대기/실행 중인 작업은 제거하지 않음)
+        """
+        excess = len(self._jobs) - self.max_results
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+            del self._jobs[job_id]
+            self.expired += 1
+
+    def stats(self) -> Dict[str, Any]:
+        running = sum(1 for job in self._jobs.values() if job.status == "running")
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            "queued": len(self._heap),
+            "running": running,
+            "stored": len(self._jobs),
+            "max_queue": self.max_queue,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "expired": self.expired,
+        }
+
+
+# 전역 인스턴스 생성 (워커는 lifespan에서 시작)
+job_queue = JobQueue()
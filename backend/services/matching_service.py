@@ -2,23 +2,103 @@
 캐릭터 매칭 서비스
 - 코사인 유사도 계산
 - Top-K 닮은 캐릭터 찾기 + Unknown 처리
+- 캐릭터당 여러 임베딩: 행 유사도를 캐릭터 단위로 집계 (max / mean / topn)
+- 카탈로그 핫 리로드: 새 스냅샷을 만든 뒤 참조만 교체 (읽기 측 락 없음)
+- 메타데이터 필터 (gender / age / occupation): 필터에 맞는 부분 행렬만 검색
 """
 
-import json
+import logging
 import os
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
 
 import numpy as np
 
+from services.fast_json import CharacterPayload
+from services.metadata_index import MatchFilter, MetadataIndex
+from services.prototype_store import (
+    collapse_prototypes,
+    l2_normalize,
+    load_prototype_store,
+    load_prototypes_json,
+    store_signature,
+)
+from services.vector_index import (
+    AGGREGATE_MODES,
+    INDEX_TYPES,
+    PRECISIONS,
+    BruteForceIndex,
+    CharacterIndex,
+    CompressedIndex,
+    IVFIndex,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+MATCH_INDEX = os.getenv("MATCH_INDEX", "brute")  # "brute" or "ivf"
+MATCH_INDEX_PATH = os.getenv("MATCH_INDEX_PATH")  # 기본값: <프로토타입 경로>.ivf.npz
+MATCH_IVF_NLIST = int(os.getenv("MATCH_IVF_NLIST", 0))  # 0이면 sqrt(N)
+MATCH_IVF_NPROBE = int(os.getenv("MATCH_IVF_NPROBE", 8))
+MATCH_AGGREGATE = os.getenv("MATCH_AGGREGATE", "max")  # "max", "mean" or "topn"
+MATCH_AGGREGATE_TOP_N = int(os.getenv("MATCH_AGGREGATE_TOP_N", 3))
+MATCH_MAX_PER_CHARACTER = int(os.getenv("MATCH_MAX_PER_CHARACTER", 0))  # 0이면 축약 안 함
+MATCH_PRECISION = os.getenv("MATCH_PRECISION", "fp32")  # "fp32", "fp16" or "int8"
+MATCH_PCA_DIM = int(os.getenv("MATCH_PCA_DIM", 0))  # 0이면 투영 안 함 (예: 128, 256)
+MATCH_RERANK = int(os.getenv("MATCH_RERANK", 32))  # fp32로 재정렬할 압축 검색 후보 수
+# 값별 부분 행렬을 미리 만들 필터 필드 (쉼표 구분, 기본값: 분할 안 함)
+# - 카탈로그가 그 필드 순서로 저장되어 있지 않으면 부분 행렬이 카탈로그 한 벌 크기의 복사본이 됨
+MATCH_FILTER_PARTITIONS = tuple(f for f in os.getenv("MATCH_FILTER_PARTITIONS", "").split(",") if f)
+
+
+class ReloadInProgressError(Exception):
+    """
+    이미 카탈로그 리로드가 진행 중인 경우 (HTTP 409)
+    """
 
-def l2_normalize(x: np.ndarray, eps: float = 1e-12) -> np.ndarray:
+
+class CatalogSnapshot:
     """
-    L2 정규화 (벡터 크기를 1로 만듦)
-    - 코사인 유사도 계산을 내적만으로 가능하게 함
+    불변 카탈로그 스냅샷
+    - 메타데이터, 행렬, offsets, 검색 인덱스를 한 객체로 묶어 한 번에 교체
+    - 요청은 시작 시점의 스냅샷 하나만 참조하므로 리로드 중에도 일관된 결과
+    - 캐릭터 공개 페이로드(+ JSON 조각)를 로딩 시 한 번만 생성
+    - 필터 검색용 메타데이터 열 배열/부분 행렬 포함
     """
-    n = np.linalg.norm(x, ord=2, axis=-1, keepdims=True)
-    n = np.maximum(n, eps)
-    return x / n
+
+    def __init__(
+        self,
+        version: int,
+        path: str,
+        signature: Tuple[Tuple[int, int], ...],
+        metas: List[Dict[str, Any]],
+        matrix: np.ndarray,
+        offsets: np.ndarray,
+        index,
+        attributes: MetadataIndex,
+    ):
+        self.version = version
+        self.path = path
+        self.signature = signature
+        self.metas = metas
+        self.matrix = matrix
+        self.offsets = offsets
+        self.index = index
+        self.attributes = attributes
+        self.characters = [CharacterPayload.from_meta(meta) for meta in metas]
+        self.loaded_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "characters": len(self.metas),
+            "vectors": int(self.matrix.shape[0]),
+            "index": self.index.kind,
+            "loaded_at": self.loaded_at,
+        }
 
 
 class MatchingService:
@@ -28,68 +108,247 @@ class MatchingService:
     - 프로토타입을 행렬로 캐싱하여 배치 연산 (성능 최적화)
     """
 
-    def __init__(self, prototypes_path: Optional[str] = None, expected_dim: int = 512):
+    def __init__(
+        self,
+        prototypes_path: Optional[str] = None,
+        expected_dim: int = 512,
+        index_type: str = MATCH_INDEX,
+        index_path: Optional[str] = MATCH_INDEX_PATH,
+        nprobe: int = MATCH_IVF_NPROBE,
+        aggregate: str = MATCH_AGGREGATE,
+        aggregate_top_n: int = MATCH_AGGREGATE_TOP_N,
+        max_per_character: int = MATCH_MAX_PER_CHARACTER,
+        precision: str = MATCH_PRECISION,
+        pca_dim: int = MATCH_PCA_DIM,
+        rerank: int = MATCH_RERANK,
+        autoload: bool = True,
+    ):
         """
         매칭 서비스 초기화
         Args:
-            prototypes_path: prototypes.json 경로 (기본값: data/prototypes.json)
+            prototypes_path: prototypes.npy 또는 prototypes.json 경로
+                (기본값: PROTOTYPES_PATH 환경 변수, 없으면 data/prototypes.npy → data/prototypes.json 순서로 탐색)
             expected_dim: 임베딩 차원 (기본값: 512)
+            index_type: 검색 인덱스 ("brute": 정확한 전체 검색, "ivf": 근사 검색)
+            index_path: 저장된 IVF 인덱스 경로 (기본값: <프로토타입 경로>.ivf.npz)
+            nprobe: IVF 탐색 클러스터 수 (recall/latency 조절)
+            aggregate: 캐릭터당 여러 임베딩일 때 집계 방식 ("max", "mean", "topn")
+            aggregate_top_n: topn 집계에서 평균낼 임베딩 수
+            max_per_character: 0보다 크면 로딩 시 캐릭터별 임베딩을 k-means 중심 N개로 축약
+            precision: 전체 검색 행렬 저장 정밀도 ("fp32", "fp16", "int8"), fp32가 아니면 압축 검색 후 fp32 재정렬
+            pca_dim: 0보다 크면 카탈로그로 학습한 PCA로 투영한 공간에서 후보 검색
+            rerank: 압축 검색에서 fp32로 재정렬할 후보 수
+            autoload: False면 생성 시 로딩하지 않고 load() 호출 시점에 로딩
         """
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"지원하지 않는 인덱스 타입: {index_type}")
+        if aggregate not in AGGREGATE_MODES:
+            raise ValueError(f"지원하지 않는 집계 방식: {aggregate}")
+        if precision not in PRECISIONS:
+            raise ValueError(f"지원하지 않는 정밀도: {precision}")
+
         self.expected_dim = expected_dim
 
-        if prototypes_path is None:
-            prototypes_path = os.path.join(
-                os.path.dirname(__file__), '..', 'data', 'prototypes.json'
-            )
+        self.prototypes_path = prototypes_path
+        self.index_type = index_type
+        self.index_path = index_path
+        self.nprobe = nprobe
+        self.aggregate = aggregate
+        self.aggregate_top_n = aggregate_top_n
+        self.max_per_character = max_per_character
+        self.precision = precision
+        self.pca_dim = pca_dim
+        self.rerank = rerank
+
+        # 읽기 측은 self._snapshot 참조 한 번만 읽음 (교체는 참조 대입 한 번 → 원자적)
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._reload_lock = threading.Lock()
+
+        if autoload:
+            self.load()
+
+    @property
+    def snapshot(self) -> Optional[CatalogSnapshot]:
+        return self._snapshot
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def prototypes_meta(self) -> List[Dict[str, Any]]:
+        """
+        캐릭터 메타데이터 (캐릭터당 1개)
+        """
+        return self._snapshot.metas if self._snapshot is not None else []
 
-        self.prototypes_meta: List[Dict[str, Any]] = []
-        self.prototypes_matrix: Optional[np.ndarray] = None  # shape: (N, D), float32
-        self._load_and_prepare(prototypes_path)
+    @property
+    def prototypes_matrix(self) -> Optional[np.ndarray]:
+        """
+        (N, D) float32 프로토타입 행렬
+        """
+        return self._snapshot.matrix if self._snapshot is not None else None
 
-    def _load_and_prepare(self, path: str) -> None:
+    @property
+    def prototypes_offsets(self) -> Optional[np.ndarray]:
         """
-        프로토타입 로딩 및 행렬 준비
-        - JSON에서 임베딩을 읽어 numpy 행렬로 변환
-        - L2 정규화 적용
+        (C + 1,) 캐릭터별 행 범위
         """
-        if not os.path.exists(path):
-            raise FileNotFoundError("prototypes.json 파일이 없습니다. 먼저 캐릭터 임베딩을 생성하세요.")
+        return self._snapshot.offsets if self._snapshot is not None else None
 
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    @property
+    def index(self):
+        return self._snapshot.index if self._snapshot is not None else None
 
-        if not isinstance(data, list) or len(data) == 0:
-            raise ValueError("프로토타입 데이터가 비어있거나 형식이 올바르지 않습니다.")
+    def has_candidates(self, filters: Optional[MatchFilter]) -> bool:
+        """
+        필터 조건에 맞는 캐릭터가 하나라도 있는지 (추론 전에 빈 필터 거절용)
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return False
+        if filters is None or filters.is_empty:
+            return len(snapshot.metas) > 0
+        return bool(snapshot.attributes.mask(filters).any())
+
+    def load(self) -> None:
+        """
+        프로토타입 로딩 및 검색 인덱스 준비
+        """
+        if self.prototypes_path is None:
+            self.prototypes_path = os.getenv("PROTOTYPES_PATH") or self._default_path()
 
-        # 메타와 임베딩 분리, 차원 검증 및 정규화
-        embeddings: List[np.ndarray] = []
-        metas: List[Dict[str, Any]] = []
+        self._snapshot = self._build_snapshot(self.prototypes_path)
 
-        for i, proto in enumerate(data):
-            if 'embedding' not in proto or not isinstance(proto['embedding'], list):
-                raise KeyError(f"index {i} 프로토타입에 embedding 키가 없거나 형식이 잘못되었습니다.")
+    def reload(self) -> CatalogSnapshot:
+        """
+        카탈로그 핫 리로드
+        - 새 스냅샷을 완전히 만든 뒤 참조만 교체
+        - 진행 중인 요청은 이전 스냅샷으로 끝까지 처리됨
+        - 로딩 실패 시 기존 스냅샷 유지
 
-            vec = np.asarray(proto['embedding'], dtype=np.float32)
+        Raises:
+            ReloadInProgressError: 다른 리로드가 진행 중인 경우
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            raise ReloadInProgressError("카탈로그 리로드가 이미 진행 중입니다.")
+        try:
+            if self.prototypes_path is None:
+                self.prototypes_path = os.getenv("PROTOTYPES_PATH") or self._default_path()
+
+            start = time.perf_counter()
+            snapshot = self._build_snapshot(self.prototypes_path)
+            self._snapshot = snapshot
+
+            logger.info(f"🔄 카탈로그 리로드 완료 (v{snapshot.version}, {time.perf_counter() - start:.2f}s)")
+            return snapshot
+        finally:
+            self._reload_lock.release()
+
+    def _build_snapshot(self, path: str) -> CatalogSnapshot:
+        """
+        프로토타입 로딩 + 인덱스 준비 → 새 스냅샷
+        - 서명은 로딩 전에 기록 (로딩 중 파일이 바뀌면 다음 감시 주기에 다시 리로드)
+        """
+        signature = store_signature(path)
+        metas, matrix, offsets = self._load_and_prepare(path)
+
+        index_path = self.index_path or os.path.splitext(path)[0] + ".ivf.npz"
+        index = self._build_index(matrix, self.index_type, index_path, self.nprobe)
+
+        # 캐릭터당 1행이면 행 인덱스가 곧 캐릭터 인덱스
+        if matrix.shape[0] != len(metas):
+            index = CharacterIndex(
+                index,
+                matrix,
+                offsets,
+                aggregate=self.aggregate,
+                top_n=self.aggregate_top_n,
+            )
 
-            if vec.ndim != 1:
-                raise ValueError(f"index {i} embedding 차원이 1D가 아닙니다.")
-            if self.expected_dim is not None and vec.shape[0] != self.expected_dim:
-                raise ValueError(f"index {i} embedding 차원 불일치: {vec.shape[0]} != {self.expected_dim}")
+        attributes = MetadataIndex(metas, matrix, offsets, partition_fields=MATCH_FILTER_PARTITIONS)
+        if attributes.nbytes:
+            logger.warning(
+                f"⚠️ 필터 부분 행렬 복사본 {attributes.nbytes / 1024 / 1024:.1f}MB "
+                f"(maintain_catalog.py --sort-by로 값 순서로 저장하면 복사하지 않음)"
+            )
 
-            embeddings.append(vec)
+        previous = self._snapshot
+        version = previous.version + 1 if previous is not None else 1
+        return CatalogSnapshot(version, path, signature, metas, matrix, offsets, index, attributes)
 
-            # 메타 정보에서 embedding은 제거하여 경량화
-            meta = {k: v for k, v in proto.items() if k != 'embedding'}
-            metas.append(meta)
+    @staticmethod
+    def _default_path() -> str:
+        """
+        기본 프로토타입 경로
+        - 바이너리 저장소(.npy)가 있으면 우선 사용, 없으면 JSON
+        """
+        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        npy_path = os.path.join(data_dir, 'prototypes.npy')
+        if os.path.exists(npy_path):
+            return npy_path
+        return os.path.join(data_dir, 'prototypes.json')
 
-        # 행렬로 변환 및 정규화
-        emb_mat = np.stack(embeddings, axis=0)  # (N, D)
-        emb_mat = l2_normalize(emb_mat).astype(np.float32)
+    def _load_and_prepare(self, path: str) -> Tuple[List[Dict[str, Any]], np.ndarray, np.ndarray]:
+        """
+        프로토타입 로딩 및 행렬 준비
+        - .npy: 정규화된 행렬을 memmap으로 zero-copy 로딩
+        - .json: 임베딩을 읽어 numpy 행렬로 변환 후 L2 정규화
+        - max_per_character 설정 시 캐릭터별 임베딩을 k-means 중심으로 축약
+        """
+        if path.endswith('.npy'):
+            emb_mat, metas, offsets = load_prototype_store(path, expected_dim=self.expected_dim)
+        else:
+            emb_mat, metas, offsets = load_prototypes_json(path, expected_dim=self.expected_dim)
+
+        if self.max_per_character > 0 and np.diff(offsets).max() > self.max_per_character:
+            emb_mat, offsets = collapse_prototypes(emb_mat, offsets, self.max_per_character)
+
+        logger.info(f"✅ {len(metas)}개 캐릭터 임베딩 로딩 완료 ({emb_mat.shape[0]}개 벡터)")
+        return metas, emb_mat, offsets
+
+    def _build_index(self, matrix: np.ndarray, index_type: str, index_path: str, nprobe: int):
+        """
+        검색 인덱스 준비
+        - brute: precision/pca_dim 설정 시 압축 행렬 검색 + fp32 재정렬
+        - ivf: 저장된 인덱스가 현재 프로토타입과 일치하면 로딩, 아니면 메모리에서 생성
+        """
+        compressed = self.precision != "fp32" or 0 < self.pca_dim < matrix.shape[1]
 
-        self.prototypes_meta = metas
-        self.prototypes_matrix = emb_mat
+        if index_type == "brute" and not compressed:
+            return BruteForceIndex(matrix)
 
-        print(f"✅ {len(self.prototypes_meta)}개 캐릭터 임베딩 로딩 완료")
+        if index_type == "brute":
+            index = CompressedIndex.build(
+                matrix,
+                precision="fp16" if self.precision == "fp32" else self.precision,
+                pca_dim=self.pca_dim,
+                rerank=self.rerank,
+            )
+            logger.info(
+                f"✅ 압축 인덱스 생성 완료 ({index.precision}, {index.codes.shape[1]}차원, "
+                f"{index.nbytes / 1024:.0f}KB / fp32 {matrix.nbytes / 1024:.0f}KB, 재정렬 {self.rerank})"
+            )
+            return index
+
+        if compressed:
+            logger.warning("⚠️ 압축 검색(MATCH_PRECISION/MATCH_PCA_DIM)은 brute 인덱스에서만 사용됩니다.")
+
+        if os.path.exists(index_path):
+            try:
+                index = IVFIndex.load(index_path, matrix, nprobe=nprobe)
+                logger.info(f"✅ IVF 인덱스 로딩 완료 (nlist={index.nlist}, nprobe={nprobe})")
+                return index
+            except (ValueError, KeyError, OSError) as e:
+                logger.warning(f"⚠️ IVF 인덱스 로딩 실패, 새로 생성합니다: {str(e)}")
+
+        index = IVFIndex.build(
+            matrix,
+            nlist=MATCH_IVF_NLIST or None,
+            nprobe=nprobe,
+        )
+        logger.info(f"✅ IVF 인덱스 생성 완료 (nlist={index.nlist}, nprobe={nprobe})")
+        return index
 
     @staticmethod
     def cosine_similarity_matrix(user_vec: np.ndarray, proto_mat: np.ndarray) -> np.ndarray:
@@ -108,7 +367,7 @@ class MatchingService:
         else:
             raise ValueError("user_vec는 (D,) 또는 (B, D) 여야 합니다.")
 
-    def _prepare_user(self, user_embedding: np.ndarray) -> np.ndarray:
+    def _prepare_user(self, user_embedding: np.ndarray, dim: int) -> np.ndarray:
         """
         사용자 임베딩 준비 (타입 변환 및 정규화)
         """
@@ -118,10 +377,10 @@ class MatchingService:
             user_embedding = user_embedding.astype(np.float32, copy=False)
 
         if user_embedding.ndim == 1:
-            if user_embedding.shape[0] != self.prototypes_matrix.shape[1]:
+            if user_embedding.shape[0] != dim:
                 raise ValueError("사용자 임베딩 차원이 프로토타입과 다릅니다.")
         elif user_embedding.ndim == 2:
-            if user_embedding.shape[1] != self.prototypes_matrix.shape[1]:
+            if user_embedding.shape[1] != dim:
                 raise ValueError("사용자 임베딩 차원이 프로토타입과 다릅니다.")
         else:
             raise ValueError("user_embedding은 (D,) 또는 (B, D) 여야 합니다.")
@@ -134,6 +393,7 @@ class MatchingService:
         top_k: int = 3,
         threshold: Optional[float] = None,
         score_mode: str = "percent",  # "cosine" or "percent"
+        filters: Optional[MatchFilter] = None,
     ) -> Dict[str, Any]:
         """
         가장 닮은 캐릭터 찾기 (Top-K 지원)
@@ -143,67 +403,100 @@ class MatchingService:
             top_k: 상위 K개 반환 (기본값: 3)
             threshold: 코사인 임계값. 예: 0.35 미만이면 Unknown 처리
             score_mode: "cosine" 원점수 또는 "percent" 0~100 변환
+            filters: 메타데이터 필터 (조건에 맞는 캐릭터가 없으면 candidates가 비어 있음)
 
         Returns:
             {
               "candidates": [
-                {"character": {...}, "cosine": 0.73, "score": 86},
+                {"character": {...}, "cosine": 0.73, "score": 86},  # character는 공유 객체 (수정 금지)
                 ...
               ],
               "top": {...} | None,
               "unknown": bool
             }
         """
-        if self.prototypes_matrix is None or len(self.prototypes_meta) == 0:
-            raise ValueError("캐릭터 임베딩 데이터가 없습니다.")
+        u = np.asarray(user_embedding)
+        if u.ndim == 2 and u.shape[0] != 1:
+            raise ValueError("단일 사용자 임베딩만 지원합니다. 여러 개는 find_best_matches를 사용하세요.")
+
+        return self.find_best_matches(
+            u.reshape(1, -1),
+            top_k=top_k,
+            threshold=threshold,
+            score_mode=score_mode,
+            filters=filters,
+        )[0]
+
+    def find_best_matches(
+        self,
+        user_embeddings: np.ndarray,
+        top_k: int = 3,
+        threshold: Optional[float] = None,
+        score_mode: str = "percent",  # "cosine" or "percent"
+        filters: Optional[MatchFilter] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        여러 사용자 임베딩을 한 번에 매칭 (배치 Top-K)
+        - (B, D) @ (D, N) 행렬곱 한 번 + 행 단위 argpartition
+        - 필터가 있으면 조건에 맞는 부분 행렬만 정확히 검색 (N 대신 N' 행)
 
-        u = self._prepare_user(user_embedding)  # (D,) 또는 (1, D)
-        sims = self.cosine_similarity_matrix(u, self.prototypes_matrix)  # (N,)
+        Args:
+            user_embeddings: (B, D), float32 권장
+            top_k, threshold, score_mode, filters: find_best_match와 동일
 
-        if sims.ndim > 1:
-            raise ValueError("단일 사용자 임베딩만 지원합니다.")
+        Returns:
+            B개의 find_best_match 결과 리스트 (입력 순서 유지)
+        """
+        # 요청 처리 동안 같은 스냅샷 사용 (중간에 리로드되어도 일관성 유지)
+        snapshot = self._snapshot
+        if snapshot is None or len(snapshot.metas) == 0:
+            raise ValueError("캐릭터 임베딩 데이터가 없습니다.")
 
-        # 상위 K개 인덱스
-        k = min(top_k, sims.shape[0])
-        top_idx = np.argpartition(-sims, kth=k-1)[:k]
-        # 내림차순 정렬
-        top_idx = top_idx[np.argsort(-sims[top_idx])]
+        u = self._prepare_user(user_embeddings, snapshot.matrix.shape[1])
+        if u.ndim != 2:
+            raise ValueError("user_embeddings는 (B, D) 여야 합니다.")
+
+        # 인덱스에서 상위 K개 검색 (행 단위 내림차순)
+        if filters is not None and not filters.is_empty:
+            subset = snapshot.attributes.subset(filters)
+            top_idx, top_sims = MetadataIndex.search(subset, u, top_k, self.aggregate, self.aggregate_top_n)
+        else:
+            top_idx, top_sims = snapshot.index.search(u, top_k)
 
         def to_percent(cos_val: float) -> int:
             # 코사인 유사도 -1~1 → 0~100 변환
             return int(((float(cos_val) + 1.0) / 2.0) * 100)
 
-        candidates = []
-        for idx in top_idx.tolist():
-            meta = self.prototypes_meta[idx]
-            cos_v = float(sims[idx])
-            score = to_percent(cos_v) if score_mode == "percent" else cos_v
-
-            candidates.append({
-                "character": {
-                    "id": meta.get("id"),
-                    "name": meta.get("name"),
-                    "age": meta.get("age"),
-                    "gender": meta.get("gender"),
-                    "occupation": meta.get("occupation"),
-                    "portrait_path": meta.get("portrait_path")
-                },
-                "cosine": cos_v,
-                "score": score
+        results = []
+        for row_idx, row_sims in zip(top_idx.tolist(), top_sims.tolist()):
+            candidates = []
+            for idx, cos_v in zip(row_idx, row_sims):
+                if idx < 0:
+                    # 근사 인덱스가 k개를 다 채우지 못한 자리
+                    break
+                cos_v = float(cos_v)
+                score = to_percent(cos_v) if score_mode == "percent" else cos_v
+
+                candidates.append({
+                    "character": snapshot.characters[idx],
+                    "cosine": cos_v,
+                    "score": score
+                })
+
+            top = candidates[0] if candidates else None
+            unknown = False
+
+            if threshold is not None and top is not None:
+                unknown = top["cosine"] < float(threshold)
+
+            results.append({
+                "candidates": candidates,
+                "top": None if unknown else top,
+                "unknown": unknown
             })
 
-        top = candidates[0] if candidates else None
-        unknown = False
-
-        if threshold is not None and top is not None:
-            unknown = top["cosine"] < float(threshold)
-
-        return {
-            "candidates": candidates,
-            "top": None if unknown else top,
-            "unknown": unknown
-        }
+        return results
 
 
-# 전역 인스턴스 생성
-matching_service = MatchingService()
\ No newline at end of file
+# 전역 인스턴스 생성 (앱 시작 시 load() 호출)
+matching_service = MatchingService(autoload=False)
\ No newline at end of file
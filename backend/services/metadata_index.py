@@ -0,0 +1,244 @@
+"""
+메타데이터 필터 검색
+- 로딩 시 캐릭터 메타데이터(gender / age / occupation)를 열 단위 배열로 변환
+  - 범주형: 코드 배열 + 값 사전, 나이: float 배열 (없으면 NaN)
+- 필터 → 캐릭터 불리언 마스크 (벡터 연산, 딕셔너리 순회 없음)
+- 선택한 필드(MATCH_FILTER_PARTITIONS, 기본값: 없음)는 값별 부분 행렬을 미리 만들어 둠
+  → "여성 캐릭터만" 같은 필터는 요청마다 행을 모으지 않고 부분 행렬 하나와만 행렬곱
+  - 값별 행이 이미 연속이면(카탈로그가 그 필드 순서로 저장된 경우) memmap 슬라이스 (복사 없음)
+  - 아니면 부분 행렬을 복사 → 프로세스/스냅샷마다 카탈로그 한 벌 크기의 메모리 사용
+- 나머지 조건은 남는 캐릭터가 적으면 행을 모아 더 작은 행렬을 만들고,
+  많으면 복사 없이 부분 행렬 점수에 마스크만 적용
+- 필터 검색은 항상 부분 행렬 전체 검색 (정확, 전체 검색보다 적은 행)
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from services.vector_index import aggregate_segments, top_k_rows
+
+
+CATEGORICAL_FIELDS = ("gender", "occupation")
+# 값이 정확히 일치해야 하는 필드만 값별 부분 행렬로 분할 가능
+PARTITION_FIELDS = ("gender",)
+# 남는 캐릭터 비율이 이보다 크면 행을 복사하지 않고 점수 마스크 사용
+GATHER_MAX_FRACTION = 0.25
+
+# (캐릭터 번호 (C',), 부분 행렬 (N', D), 캐릭터별 행 범위 (C' + 1,), 캐릭터 마스크 (C',) 또는 None)
+Subset = Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]
+
+
+class MatchFilter:
+    """
+    매칭 필터 조건 (모두 AND)
+    - gender: 대소문자 무시 일치
+    - min_age / max_age: 나이 범위 (나이 정보가 없는 캐릭터는 제외)
+    - occupation: 대소문자 무시 부분 문자열
+    """
+
+    def __init__(
+        self,
+        gender: Optional[str] = None,
+        min_age: Optional[float] = None,
+        max_age: Optional[float] = None,
+        occupation: Optional[str] = None,
+    ):
+        self.gender = _normalize(gender) or None
+        self.min_age = min_age
+        self.max_age = max_age
+        self.occupation = _normalize(occupation) or None
+
+    @property
+    def is_empty(self) -> bool:
+        return self.gender is None and self.min_age is None and self.max_age is None and self.occupation is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            key: value
+            for key, value in (
+                ("gender", self.gender),
+                ("min_age", self.min_age),
+                ("max_age", self.max_age),
+                ("occupation", self.occupation),
+            )
+            if value is not None
+        }
+
+
+def _normalize(value: Any) -> str:
+    return str(value).strip().lower() if value is not None else ""
+
+
+def _parse_age(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class MetadataIndex:
+    """
+    캐릭터 메타데이터 열 배열 + 필터별 부분 행렬
+    - 스냅샷마다 하나 (스냅샷과 함께 교체되므로 수정 금지)
+    """
+
+    def __init__(
+        self,
+        metas: List[Dict[str, Any]],
+        matrix: np.ndarray,
+        offsets: np.ndarray,
+        partition_fields: Iterable[str] = (),
+    ):
+        """
+        Args:
+            metas: 캐릭터 메타데이터 (캐릭터당 1개)
+            matrix: (N, D) 프로토타입 행렬
+            offsets: (C + 1,) 캐릭터별 행 범위
+            partition_fields: 값별 부분 행렬을 미리 만들 필드 (PARTITION_FIELDS 중에서)
+        """
+        self.count = len(metas)
+
+        # 범주형 필드: 값 사전 + 코드 배열
+        self.vocab: Dict[str, np.ndarray] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        for field in CATEGORICAL_FIELDS:
+            values = np.array([_normalize(meta.get(field)) for meta in metas], dtype=object)
+            vocab, codes = np.unique(values.astype(str), return_inverse=True)
+            self.vocab[field] = vocab
+            self.codes[field] = codes.astype(np.int32)
+
+        self.age = np.array([_parse_age(meta.get("age")) for meta in metas], dtype=np.float64)
+
+        self._everything: Subset = (np.arange(self.count), matrix, offsets, None)
+
+        # 값별 연속 부분 행렬: {field: {value: Subset}}
+        self.partitions: Dict[str, Dict[str, Subset]] = {}
+        for field in partition_fields:
+            if field not in PARTITION_FIELDS:
+                raise ValueError(f"분할할 수 없는 필드: {field}")
+            self.partitions[field] = {
+                str(value): self._take(self._everything, np.flatnonzero(self.codes[field] == code))
+                for code, value in enumerate(self.vocab[field])
+            }
+
+    @property
+    def nbytes(self) -> int:
+        """
+        미리 만든 부분 행렬 중 복사본의 메모리 사용량 (원본 행렬 슬라이스는 제외)
+        """
+        return sum(
+            sub[1].nbytes
+            for parts in self.partitions.values()
+            for sub in parts.values()
+            if not np.may_share_memory(sub[1], self._everything[1])
+        )
+
+    def mask(self, filters: MatchFilter) -> np.ndarray:
+        """
+        필터 조건을 만족하는 캐릭터 마스크 (C,)
+        """
+        mask = np.ones(self.count, dtype=bool)
+        if filters.gender is not None:
+            mask &= self._equals("gender", filters.gender)
+        if filters.occupation is not None:
+            mask &= self._contains("occupation", filters.occupation)
+        # NaN 비교는 False → 나이 정보가 없는 캐릭터는 나이 필터에서 제외
+        if filters.min_age is not None:
+            mask &= self.age >= filters.min_age
+        if filters.max_age is not None:
+            mask &= self.age <= filters.max_age
+        return mask
+
+    def _equals(self, field: str, value: str) -> np.ndarray:
+        vocab = self.vocab[field]
+        pos = int(np.searchsorted(vocab, value))
+        if pos >= len(vocab) or vocab[pos] != value:
+            return np.zeros(self.count, dtype=bool)
+        return self.codes[field] == pos
+
+    def _contains(self, field: str, needle: str) -> np.ndarray:
+        # 부분 문자열 검사는 캐릭터 수가 아니라 고유 값 수만큼만
+        matched = np.array([needle in value for value in self.vocab[field]], dtype=bool)
+        if not matched.any():
+            return np.zeros(self.count, dtype=bool)
+        return matched[self.codes[field]]
+
+    def subset(self, filters: MatchFilter) -> Subset:
+        """
+        필터에 해당하는 (캐릭터 번호, 부분 행렬, 행 범위, 마스크)
+        - 분할 필드 값 하나로만 거르면 미리 만든 부분 행렬을 그대로 사용
+        - 나머지 조건은 그 부분 행렬 안에서만 추가로 선택
+        """
+        base = self._everything
+        remaining = filters
+        for field, parts in self.partitions.items():
+            value = getattr(filters, field)
+            if value is None:
+                continue
+            base = parts.get(value)
+            if base is None:
+                return self._take(self._everything, np.zeros(0, dtype=np.int64))
+            remaining = MatchFilter(**{**filters.to_dict(), field: None})
+            break
+
+        if remaining.is_empty:
+            return base
+        valid = self.mask(remaining)[base[0]]
+        keep = np.flatnonzero(valid)
+        if keep.shape[0] == base[0].shape[0]:
+            return base
+        if keep.shape[0] > base[0].shape[0] * GATHER_MAX_FRACTION:
+            return base[0], base[1], base[2], valid
+        return self._take(base, keep)
+
+    @staticmethod
+    def _take(base: Subset, keep: np.ndarray) -> Subset:
+        """
+        base에서 keep 위치의 캐릭터만 골라 연속 부분 행렬 생성
+        - 고른 행이 base 안에서 연속이고 float32면 슬라이스 (memmap이면 복사 없음)
+        """
+        chars, matrix, offsets, _ = base
+        if matrix.shape[0] == chars.shape[0]:
+            # 캐릭터당 1행: 행 번호 = 캐릭터 위치
+            rows = keep
+            sub_offsets = np.arange(keep.shape[0] + 1)
+        else:
+            starts, ends = offsets[keep], offsets[keep + 1]
+            rows = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)]) if keep.shape[0] else keep
+            sub_offsets = np.concatenate([[0], np.cumsum(ends - starts)])
+
+        contiguous = rows.shape[0] > 0 and rows[-1] - rows[0] + 1 == rows.shape[0]
+        if contiguous and matrix.dtype == np.float32:
+            sub_matrix = matrix[rows[0]:rows[-1] + 1]
+        else:
+            sub_matrix = np.ascontiguousarray(matrix[rows], dtype=np.float32)
+        return chars[keep], sub_matrix, sub_offsets, None
+
+    @staticmethod
+    def search(
+        subset: Subset,
+        queries: np.ndarray,
+        k: int,
+        aggregate: str = "max",
+        top_n: int = 3,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        부분 행렬 정확 검색
+
+        Returns:
+            (캐릭터 번호 (B, k'), 유사도 (B, k')) 내림차순, k' = min(k, 후보 캐릭터 수)
+        """
+        chars, matrix, offsets, valid = subset
+        if chars.shape[0] == 0 or valid is not None and not valid.any():
+            empty = np.zeros((queries.shape[0], 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        sims = queries @ matrix.T
+        if matrix.shape[0] != chars.shape[0]:
+            sims = aggregate_segments(sims, offsets, aggregate, top_n)
+        if valid is not None:
+            sims[:, ~valid] = -np.inf
+            k = min(k, int(valid.sum()))
+        idx, top = top_k_rows(sims, k)
+        return chars[idx], top
@@ -0,0 +1,216 @@
+"""
+Prometheus 메트릭
+- 단계별 소요 시간 히스토그램 (업로드 읽기 → 디코딩 → 전처리 → forward → 매칭 → 직렬화)
+- 엔드포인트별 요청 시간, 진행 중 요청 수, 오류 유형별 카운터
+- 캐시/추론 대기열 수치는 스크레이프 시점에 읽어옴 (요청 경로에 비용 없음)
+- 멀티 워커 모드: PROMETHEUS_MULTIPROC_DIR가 설정되면 워커별 값을 합쳐서 노출
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+
+STAGES = ("upload_read", "queue", "decode", "preprocess", "forward", "matching", "serialization")
+
+# 1ms ~ 10s (CPU 추론 기준 p99 구간을 촘촘하게)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_stage_seconds = Histogram(
+    "simpson_stage_seconds",
+    "파이프라인 단계별 소요 시간",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+_request_seconds = Histogram(
+    "simpson_request_seconds",
+    "엔드포인트별 요청 처리 시간",
+    ["endpoint", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+_errors = Counter(
+    "simpson_errors_total",
+    "오류 유형별 발생 횟수",
+    ["type"],
+)
+_in_flight = Gauge(
+    "simpson_in_flight_requests",
+    "처리 중인 요청 수",
+    multiprocess_mode="livesum",
+)
+
+# 라벨 조회 비용을 줄이기 위해 단계별 자식 메트릭을 미리 바인딩
+_stage_children = {stage: _stage_seconds.labels(stage) for stage in STAGES}
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """
+    단계 소요 시간 기록 (알 수 없는 단계는 무시)
+    """
+    child = _stage_children.get(stage)
+    if child is not None:
+        child.observe(seconds)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """
+    with 블록 소요 시간을 단계 히스토그램에 기록
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def record_error(error_type: str) -> None:
+    """
+    오류 유형별 카운터 증가
+    """
+    _errors.labels(error_type).inc()
+
+
+def render_metrics():
+    """
+    Prometheus 텍스트 포맷 (본문, Content-Type)
+    - 멀티 워커 모드: 모든 워커의 히스토그램/카운터를 합산
+      (캐시/대기열 수치는 스크레이프를 처리한 워커 기준)
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    if _runtime_collector is not None:
+        registry.register(_runtime_collector)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class RuntimeCollector:
+    """
+    스크레이프 시점에 캐시/추론 풀 상태를 읽어 노출하는 커스텀 컬렉터
+    """
+
+    def __init__(self, cache, pool, flight=None, jobs=None, admission=None):
+        self.cache = cache
+        self.pool = pool
+        self.flight = flight
+        self.jobs = jobs
+        self.admission = admission
+
+    def collect(self):
+        stats = self.cache.stats()
+
+        lookups = CounterMetricFamily(
+            "simpson_embedding_cache_lookups",
+            "임베딩 캐시 조회 결과별 횟수",
+            labels=["result"],
+        )
+        lookups.add_metric(["hit"], stats["hits"])
+        lookups.add_metric(["disk_hit"], stats["disk_hits"])
+        lookups.add_metric(["miss"], stats["misses"])
+        yield lookups
+
+        yield CounterMetricFamily(
+            "simpson_embedding_cache_evictions",
+            "임베딩 캐시 제거 횟수",
+            value=stats["evictions"],
+        )
+        yield GaugeMetricFamily(
+            "simpson_embedding_cache_entries",
+            "임베딩 캐시 항목 수",
+            value=stats["entries"],
+        )
+        yield GaugeMetricFamily(
+            "simpson_embedding_cache_bytes",
+            "임베딩 캐시 메모리 사용량",
+            value=stats["bytes"],
+        )
+        yield GaugeMetricFamily(
+            "simpson_inference_pending",
+            "추론 대기 + 실행 중인 이미지 수",
+            value=self.pool.pending,
+        )
+        if self.flight is not None:
+            yield CounterMetricFamily(
+                "simpson_coalesced_requests",
+                "진행 중인 동일 이미지 추론에 합류한 요청 수",
+                value=self.flight.coalesced,
+            )
+        if self.jobs is not None:
+            yield GaugeMetricFamily(
+                "simpson_jobs_queued",
+                "대기 중인 비동기 매칭 작업 수",
+                value=self.jobs.queued,
+            )
+        if self.admission is not None:
+            yield GaugeMetricFamily(
+                "simpson_admission_limit",
+                "적응형 동시 처리 한도",
+                value=self.admission.limit,
+            )
+            yield GaugeMetricFamily(
+                "simpson_admission_queued",
+                "동시 처리 한도가 차서 대기 중인 요청 수",
+                value=self.admission.queued,
+            )
+
+
+_runtime_collector = None
+
+
+def register_runtime_collector(cache, pool, flight=None, jobs=None, admission=None) -> None:
+    """
+    런타임 컬렉터 등록 (중복 등록 방지)
+    """
+    global _runtime_collector
+    if _runtime_collector is not None:
+        return
+    _runtime_collector = RuntimeCollector(cache, pool, flight, jobs, admission)
+    REGISTRY.register(_runtime_collector)
+
+
+class RequestMetricsMiddleware:
+    """
+    요청 시간/진행 중 요청 수 ASGI 미들웨어
+    - 지정한 경로만 기록 (라벨 카디널리티 제한)
+    """
+
+    def __init__(self, app, paths: Iterable[str]):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        status: Dict[str, int] = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        _in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _in_flight.dec()
+            _request_seconds.labels(path, str(status["code"])).observe(time.perf_counter() - start)
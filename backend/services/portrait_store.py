@@ -0,0 +1,85 @@
+"""
+캐릭터 초상화 저장소
+- 프로토타입 생성 시 원본 초상화를 크기별 WebP로 미리 줄여서 저장
+  (thumb: 목록용, card: 결과 카드용)
+- 파일 이름에 내용 해시 포함 → URL이 내용과 1:1이라 immutable 캐시 + 강한 ETag
+- 서버는 디스크 파일을 그대로 전송 (FileResponse, 서버가 지원하면 pathsend로 zero-copy)
+"""
+
+import hashlib
+import io
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+
+PORTRAIT_DIR = os.getenv("PORTRAIT_DIR", str(Path(__file__).parent.parent / "data" / "portraits"))
+PORTRAIT_URL_PREFIX = "/portraits"
+
+# 변형 이름 → 긴 변 최대 픽셀 (카드는 200px 원형 이미지의 2배)
+PORTRAIT_SIZES: Dict[str, int] = {"thumb": 160, "card": 400}
+PORTRAIT_QUALITY = 85
+
+PORTRAIT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_FILENAME = re.compile(r"^(?P<variant>[a-z]+)-(?P<digest>[0-9a-f]{16})\.webp$")
+
+
+def render_variants(data: bytes) -> Dict[str, bytes]:
+    """
+    원본 초상화 → 크기별 WebP bytes
+    - 투명 배경은 유지 (WebP 알파)
+    """
+    image = Image.open(io.BytesIO(data))
+    image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P", "PA") else "RGB")
+
+    variants = {}
+    for variant, size in PORTRAIT_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        resized.save(buffer, format="WEBP", quality=PORTRAIT_QUALITY, method=6)
+        variants[variant] = buffer.getvalue()
+    return variants
+
+
+def save_portraits(character_id: int, data: bytes, root: str = PORTRAIT_DIR) -> Dict[str, str]:
+    """
+    초상화 변형 생성 및 저장
+
+    Returns:
+        {변형 이름: URL 경로} (예: {"card": "/portraits/100/card-1a2b3c4d5e6f7a8b.webp"})
+    """
+    directory = os.path.join(root, str(character_id))
+    os.makedirs(directory, exist_ok=True)
+
+    urls = {}
+    for variant, content in render_variants(data).items():
+        filename = f"{variant}-{hashlib.sha256(content).hexdigest()[:16]}.webp"
+        path = os.path.join(directory, filename)
+        # 같은 이름이면 내용도 같으므로 다시 쓰지 않음
+        if not os.path.exists(path):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        urls[variant] = f"{PORTRAIT_URL_PREFIX}/{character_id}/{filename}"
+    return urls
+
+
+def resolve_portrait(character_id: int, filename: str, root: str = PORTRAIT_DIR) -> Optional[Tuple[str, str]]:
+    """
+    요청 경로 → (파일 경로, ETag)
+    - 파일 이름 형식이 아니면 None (경로 조작 방지)
+    - ETag는 파일 이름의 내용 해시 (stat 없이 결정)
+    """
+    match = _FILENAME.match(filename)
+    if match is None or match["variant"] not in PORTRAIT_SIZES:
+        return None
+    path = os.path.join(root, str(character_id), filename)
+    if not os.path.isfile(path):
+        return None
+    return path, f'"{match["digest"]}"'
@@ -0,0 +1,302 @@
+"""
+바이너리 프로토타입 저장소
+- 임베딩 행렬: .npy (float32 또는 float16, L2 정규화 완료 상태로 저장)
+- 메타데이터: 작은 JSON 파일 (.meta.json)
+- 로딩 시 np.load(mmap_mode='r')로 행렬을 복사 없이 매핑
+  → 워커 프로세스들이 OS 페이지 캐시를 공유하여 RSS가 카탈로그 크기에 비례해 늘지 않음
+
+캐릭터 중심 구조 (캐릭터당 여러 임베딩)
+- 메타데이터는 캐릭터당 1개, 행렬은 캐릭터 순서대로 이어 붙인 행
+- offsets (C + 1,): 캐릭터 c의 행 = matrix[offsets[c]:offsets[c + 1]] (CSR)
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+STORE_VERSION = 2
+# version 1: 캐릭터당 1행 (offsets 없음)
+READABLE_VERSIONS = (1, 2)
+SUPPORTED_DTYPES = ("float32", "float16")
+# 행 선택 저장 시 한 번에 복사하는 행 수 (전체 행렬을 복사해 두지 않음)
+WRITE_CHUNK_ROWS = 8192
+
+
+def l2_normalize(x: np.ndarray, eps: float = 1e-12) -> np.ndarray:
+    """
+    L2 정규화 (벡터 크기를 1로 만듦)
+    - 코사인 유사도 계산을 내적만으로 가능하게 함
+    """
+    n = np.linalg.norm(x, ord=2, axis=-1, keepdims=True)
+    n = np.maximum(n, eps)
+    return x / n
+
+
+def single_row_offsets(count: int) -> np.ndarray:
+    """
+    캐릭터당 1행인 경우의 offsets (0, 1, ..., count)
+    """
+    return np.arange(count + 1, dtype=np.int64)
+
+
+def validate_offsets(offsets: np.ndarray, rows: int, characters: int) -> np.ndarray:
+    """
+    offsets 검증 (모든 캐릭터가 1행 이상, 마지막 값 = 전체 행 수)
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if offsets.ndim != 1 or offsets.shape[0] != characters + 1:
+        raise ValueError("offsets 길이가 캐릭터 수 + 1과 다릅니다.")
+    if offsets[0] != 0 or offsets[-1] != rows:
+        raise ValueError("offsets 범위가 행렬 행 수와 일치하지 않습니다.")
+    if np.any(np.diff(offsets) < 1):
+        raise ValueError("임베딩이 없는 캐릭터가 있습니다.")
+    return offsets
+
+
+def load_prototypes_json(
+    path: str,
+    expected_dim: Optional[int] = None,
+) -> Tuple[np.ndarray, List[Dict[str, Any]], np.ndarray]:
+    """
+    기존 prototypes.json 로딩
+    - 메타와 임베딩 분리, 차원 검증 후 L2 정규화된 (N, D) float32 행렬 반환
+    - 항목마다 "embedding" (D,) 또는 "embeddings" (M, D) 지원 (캐릭터당 여러 임베딩)
+
+    Returns:
+        (행렬 (N, D), 캐릭터 메타데이터 (C개), offsets (C + 1,))
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError("prototypes.json 파일이 없습니다. 먼저 캐릭터 임베딩을 생성하세요.")
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if not isinstance(data, list) or len(data) == 0:
+        raise ValueError("프로토타입 데이터가 비어있거나 형식이 올바르지 않습니다.")
+
+    embeddings: List[List[float]] = []
+    metas: List[Dict[str, Any]] = []
+    counts: List[int] = []
+
+    for i, proto in enumerate(data):
+        if isinstance(proto.get('embeddings'), list) and proto['embeddings']:
+            rows = proto['embeddings']
+        elif isinstance(proto.get('embedding'), list):
+            rows = [proto['embedding']]
+        else:
+            raise KeyError(f"index {i} 프로토타입에 embedding 키가 없거나 형식이 잘못되었습니다.")
+
+        for row in rows:
+            if expected_dim is not None and len(row) != expected_dim:
+                raise ValueError(f"index {i} embedding 차원 불일치: {len(row)} != {expected_dim}")
+
+        embeddings.extend(rows)
+        counts.append(len(rows))
+
+        # 메타 정보에서 embedding은 제거하여 경량화
+        metas.append({k: v for k, v in proto.items() if k not in ('embedding', 'embeddings')})
+
+    # 행 단위 변환 대신 한 번에 행렬로 변환
+    emb_mat = np.array(embeddings, dtype=np.float32)  # (N, D)
+    if emb_mat.ndim != 2:
+        raise ValueError("embedding 차원이 1D가 아닙니다.")
+
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return l2_normalize(emb_mat).astype(np.float32, copy=False), metas, offsets
+
+
+def collapse_prototypes(
+    matrix: np.ndarray,
+    offsets: np.ndarray,
+    max_per_character: int,
+    iters: int = 20,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    캐릭터별 임베딩을 최대 max_per_character개의 k-means 중심으로 축약
+    - 이미지가 많은 캐릭터 때문에 검색 비용이 늘지 않도록 상한 설정
+    - 상한 이하인 캐릭터는 그대로 유지
+
+    Returns:
+        (축약된 행렬, 새 offsets)
+    """
+    from services.vector_index import spherical_kmeans
+
+    if max_per_character < 1:
+        raise ValueError("max_per_character는 1 이상이어야 합니다.")
+
+    blocks: List[np.ndarray] = []
+    counts: List[int] = []
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        rows = np.asarray(matrix[start:end], dtype=np.float32)
+        if rows.shape[0] > max_per_character:
+            rows, _ = spherical_kmeans(rows, max_per_character, iters=iters, seed=seed)
+        blocks.append(rows)
+        counts.append(rows.shape[0])
+
+    new_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return np.concatenate(blocks, axis=0), new_offsets
+
+
+def meta_path_for(matrix_path: str) -> str:
+    """
+    행렬 파일 경로에 대응하는 메타데이터 경로
+    - data/prototypes.npy → data/prototypes.meta.json
+    """
+    base, _ = os.path.splitext(matrix_path)
+    return base + ".meta.json"
+
+
+def store_signature(path: str) -> Tuple[Tuple[int, int], ...]:
+    """
+    프로토타입 파일 변경 감지용 서명 ((mtime_ns, size), ...)
+    - .npy 저장소는 행렬과 메타데이터 파일을 모두 포함
+    - 파일이 없으면 (0, 0)
+    """
+    paths = [path, meta_path_for(path)] if path.endswith(".npy") else [path]
+    signature = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((0, 0))
+    return tuple(signature)
+
+
+def save_prototype_store(
+    matrix_path: str,
+    matrix: np.ndarray,
+    metas: List[Dict[str, Any]],
+    dtype: str = "float32",
+    offsets: Optional[np.ndarray] = None,
+    rows: Optional[np.ndarray] = None,
+) -> Tuple[str, str]:
+    """
+    임베딩 행렬과 메타데이터를 바이너리 저장소로 저장
+
+    Args:
+        matrix_path: .npy 저장 경로
+        matrix: (N, D) 임베딩 행렬 (L2 정규화 전제, memmap 가능)
+        metas: C개의 캐릭터 메타데이터 (embedding 키 제외)
+        dtype: 저장 dtype ("float32" 또는 "float16")
+        offsets: (C + 1,) 캐릭터별 행 범위 (None이면 캐릭터당 1행), rows를 주면 선택한 행 기준
+        rows: (선택) 저장할 행 번호 (저장 순서, 오름차순이면 순차 읽기), 주어지면 WRITE_CHUNK_ROWS 단위로 출력 파일에 바로 복사
+
+    Returns:
+        (행렬 경로, 메타데이터 경로)
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"지원하지 않는 dtype: {dtype}")
+    if matrix.ndim != 2:
+        raise ValueError("행렬은 (N, D) 여야 합니다.")
+    count = matrix.shape[0] if rows is None else len(rows)
+    if offsets is None:
+        offsets = single_row_offsets(len(metas))
+    offsets = validate_offsets(offsets, count, len(metas))
+
+    meta_path = meta_path_for(matrix_path)
+
+    # 임시 파일에 쓴 뒤 교체 (부분적으로 쓰인 파일을 로딩하지 않도록)
+    tmp_matrix = matrix_path + ".tmp.npy"
+    if rows is None:
+        np.save(tmp_matrix, np.ascontiguousarray(matrix, dtype=dtype))
+    else:
+        out = np.lib.format.open_memmap(tmp_matrix, mode="w+", dtype=dtype, shape=(count, matrix.shape[1]))
+        for start in range(0, count, WRITE_CHUNK_ROWS):
+            out[start:start + WRITE_CHUNK_ROWS] = matrix[rows[start:start + WRITE_CHUNK_ROWS]]
+        out.flush()
+        del out
+
+    header = {
+        "version": STORE_VERSION,
+        "count": int(count),
+        "dim": int(matrix.shape[1]),
+        "dtype": dtype,
+        "offsets": offsets.tolist(),
+        "prototypes": metas,
+    }
+    tmp_meta = meta_path + ".tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(header, f, ensure_ascii=False, separators=(",", ":"))
+
+    os.replace(tmp_matrix, matrix_path)
+    os.replace(tmp_meta, meta_path)
+    return matrix_path, meta_path
+
+
+def save_prototypes_json(
+    path: str,
+    matrix: np.ndarray,
+    metas: List[Dict[str, Any]],
+    offsets: np.ndarray,
+    rows: Optional[np.ndarray] = None,
+) -> str:
+    """
+    prototypes.json 형식으로 저장 (공백 없는 compact JSON)
+    - 캐릭터 하나씩 인코딩해서 바로 기록 → 전체 리스트를 메모리에 만들지 않음
+    - rows를 주면 그 행만 저장 (offsets는 선택한 행 기준)
+    - 임시 파일에 쓴 뒤 교체
+    """
+    offsets = validate_offsets(offsets, matrix.shape[0] if rows is None else len(rows), len(metas))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for c, meta in enumerate(metas):
+            index = slice(offsets[c], offsets[c + 1]) if rows is None else rows[offsets[c]:offsets[c + 1]]
+            embeddings = np.asarray(matrix[index], dtype=np.float32).tolist()
+            proto = dict(meta)
+            if len(embeddings) == 1:
+                proto["embedding"] = embeddings[0]
+            else:
+                proto["embeddings"] = embeddings
+            if c:
+                f.write(",")
+            f.write(json.dumps(proto, ensure_ascii=False, separators=(",", ":")))
+        f.write("]")
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_prototype_store(
+    matrix_path: str,
+    expected_dim: Optional[int] = None,
+) -> Tuple[np.ndarray, List[Dict[str, Any]], np.ndarray]:
+    """
+    바이너리 저장소 로딩
+
+    - float32: 읽기 전용 memmap을 그대로 반환 (zero-copy)
+    - float16: 연산을 위해 float32로 변환 (복사 발생)
+
+    Returns:
+        (행렬 (N, D), 캐릭터 메타데이터 (C개), offsets (C + 1,))
+    """
+    meta_path = meta_path_for(matrix_path)
+    if not os.path.exists(matrix_path) or not os.path.exists(meta_path):
+        raise FileNotFoundError(f"프로토타입 저장소가 없습니다: {matrix_path}")
+
+    with open(meta_path, "r", encoding="utf-8") as f:
+        header = json.load(f)
+
+    if header.get("version") not in READABLE_VERSIONS:
+        raise ValueError(f"지원하지 않는 저장소 버전: {header.get('version')}")
+
+    matrix = np.load(matrix_path, mmap_mode="r")
+    metas = header["prototypes"]
+
+    if matrix.ndim != 2:
+        raise ValueError("행렬은 (N, D) 여야 합니다.")
+    offsets = header.get("offsets")
+    if offsets is None:
+        offsets = single_row_offsets(len(metas))
+    offsets = validate_offsets(offsets, matrix.shape[0], len(metas))
+    if expected_dim is not None and matrix.shape[1] != expected_dim:
+        raise ValueError(f"embedding 차원 불일치: {matrix.shape[1]} != {expected_dim}")
+
+    if matrix.dtype != np.float32:
+        matrix = np.asarray(matrix, dtype=np.float32)
+
+    return matrix, metas, offsets
@@ -0,0 +1,56 @@
+"""
+요청 병합 (single-flight)
+- 같은 키로 동시에 들어온 작업은 첫 요청만 실행하고 나머지는 같은 결과를 기다림
+- 같은 이미지가 한꺼번에 몰려도 (공유 링크 등) 추론은 1번만 실행
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    asyncio 기반 single-flight 그룹
+    - 실행 중인 키만 보관하고 완료되면 즉시 제거 (결과 재사용은 캐시의 역할)
+    - 한 호출자가 취소되어도 (클라이언트 연결 종료) 다른 호출자의 작업은 계속 진행
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        key로 작업 실행 (이미 실행 중이면 그 결과를 기다림)
+
+        Args:
+            key: 작업 식별자 (예: 이미지 콘텐츠 해시)
+            fn: 작업 코루틴을 만드는 함수 (첫 요청일 때만 호출)
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 모든 호출자가 취소된 경우에도 "exception was never retrieved" 경고가 남지 않도록 확인
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {"inflight": self.inflight, "coalesced": self.coalesced}
+
+
+# 전역 인스턴스 생성 (임베딩 추출 병합용)
+embedding_flight = SingleFlight()
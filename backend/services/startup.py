@@ -0,0 +1,119 @@
+"""
+앱 시작 서비스
+- 카탈로그 로딩 → 모델 로딩 → 워밍업 순서로 실행
+- 단계별 상태와 소요 시간 기록 (readiness 엔드포인트에서 노출)
+- 백그라운드 모드: 서버는 즉시 요청을 받고 (liveness OK), 로딩이 끝나면 ready
+- 멀티 워커 preload 모드: 부모 프로세스가 fork 전에 카탈로그/모델을 로딩 (preload_for_workers)
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from services.clip_service import clip_service
+from services.inference_pool import inference_pool
+from services.matching_service import matching_service
+
+
+logger = logging.getLogger(__name__)
+
+
+STARTUP_BACKGROUND = os.getenv("STARTUP_BACKGROUND", "0") == "1"
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1") == "1"
+
+
+class StartupState:
+    """
+    시작 단계 상태
+    - phase: pending → catalog → model → warmup → ready (실패 시 failed)
+    """
+
+    def __init__(self):
+        self.phase = "pending"
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.timings: Dict[str, float] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.phase == "ready"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "phase": self.phase,
+            "ready": self.ready,
+            "error": self.error,
+            "timings_ms": {k: round(v * 1000, 1) for k, v in self.timings.items()},
+        }
+
+
+async def _run_phase(state: StartupState, phase: str, coro) -> None:
+    state.phase = phase
+    start = time.perf_counter()
+    await coro
+    state.timings[phase] = time.perf_counter() - start
+    logger.info(f"✅ 시작 단계 완료: {phase} ({state.timings[phase]:.2f}s)")
+
+
+async def run_startup(
+    state: StartupState,
+    warm_up: bool = STARTUP_WARMUP,
+    raise_on_error: bool = True,
+) -> None:
+    """
+    시작 단계 실행
+    - 블로킹 로딩은 스레드에서 실행해 이벤트 루프(health 체크)가 막히지 않도록 함
+
+    Args:
+        warm_up: 모델 로딩 후 더미 forward 실행 여부
+        raise_on_error: 실패 시 예외 전파 (포그라운드 로딩이면 서버 시작 자체를 실패시킴)
+    """
+    state.started_at = time.time()
+    total_start = time.perf_counter()
+    try:
+        # preload 모드에서는 부모 프로세스가 이미 로딩한 카탈로그를 그대로 사용
+        if not matching_service.is_loaded:
+            await _run_phase(state, "catalog", asyncio.to_thread(matching_service.load))
+        await _run_phase(state, "model", asyncio.to_thread(inference_pool.start))
+        if warm_up:
+            await _run_phase(state, "warmup", inference_pool.warm_up())
+    except Exception as e:
+        state.phase = "failed"
+        state.error = str(e)
+        logger.exception(f"❌ 시작 실패: {str(e)}")
+        if raise_on_error:
+            raise
+        return
+
+    state.timings["total"] = time.perf_counter() - total_start
+    state.phase = "ready"
+    logger.info(f"✅ 서버 준비 완료 ({state.timings['total']:.2f}s)")
+
+
+def preload_for_workers(share_weights: bool = True) -> None:
+    """
+    fork 전 공유 자원 로딩 (gunicorn preload 부모 프로세스에서 호출)
+    - 카탈로그: .npy 저장소는 memmap이므로 워커들이 같은 페이지 캐시를 공유
+    - 모델: share_weights면 가중치를 torch 공유 메모리로 옮겨 워커 수와 무관하게 한 벌만 유지 (torch 백엔드만)
+      (/dev/shm에 모델 크기만큼 필요, 워커가 하나면 끄기)
+    - 워밍업(forward)은 하지 않음: fork 전에 torch 스레드풀이 만들어지면 자식에서 교착 가능
+    - gc.freeze(): 이후 GC가 부모 객체를 건드려 copy-on-write 복사가 일어나지 않도록 함
+    """
+    start = time.perf_counter()
+    matching_service.load()
+
+    if share_weights and clip_service.fork_safe:
+        clip_service.share_memory()
+    elif share_weights:
+        logger.warning(f"⚠️ {clip_service.BACKEND} 백엔드는 fork 전 공유를 지원하지 않아 워커마다 모델을 로딩합니다.")
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"✅ 워커 fork 전 로딩 완료 ({time.perf_counter() - start:.2f}s)")
+
+
+# 전역 인스턴스 생성
+startup_state = StartupState()
@@ -0,0 +1,460 @@
+"""
+프로토타입 검색 인덱스
+- BruteForceIndex: 전체 행렬 내적 (정확, 기본값)
+- IVFIndex: k-means coarse quantizer 기반 근사 검색 (순수 NumPy)
+  - nprobe로 recall/latency 조절
+  - .npz 파일로 저장/로딩
+- CompressedIndex: fp16 / int8(행별 스케일) 저장 + 선택적 PCA 차원 축소
+  - 압축 공간에서 후보를 찾고 fp32 원본 행으로 정확히 재정렬
+
+- CharacterIndex: 캐릭터당 여러 행인 경우 행 유사도를 캐릭터 단위로 집계 (max / mean / topn)
+
+모든 인덱스는 L2 정규화된 (N, D) 행렬을 전제로 하며
+search(queries (B, D), k) → (indices (B, k), sims (B, k)) 를 내림차순으로 반환
+(후보가 k개보다 적은 질의는 인덱스 -1, 유사도 -inf로 채움 → 호출자가 건너뜀)
+"""
+
+import hashlib
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+INDEX_TYPES = ("brute", "ivf")
+AGGREGATE_MODES = ("max", "mean", "topn")
+PRECISIONS = ("fp32", "fp16", "int8")
+
+
+def matrix_fingerprint(matrix: np.ndarray) -> str:
+    """
+    행렬 지문 (저장된 인덱스가 현재 프로토타입으로 만들어졌는지 확인)
+    """
+    h = hashlib.sha1()
+    h.update(str(matrix.shape).encode("utf-8"))
+    h.update(np.ascontiguousarray(matrix, dtype=np.float32).tobytes())
+    return h.hexdigest()
+
+
+def top_k_rows(sims: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    행 단위 Top-K (argpartition 후 부분 정렬)
+
+    Args:
+        sims: (B, N) 유사도 행렬
+        k: 상위 개수
+
+    Returns:
+        (indices (B, k), sims (B, k)) 내림차순
+    """
+    k = min(k, sims.shape[1])
+    if k < sims.shape[1]:
+        part = np.argpartition(-sims, kth=k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(sims.shape[1]), (sims.shape[0], sims.shape[1]))
+    part_sims = np.take_along_axis(sims, part, axis=1)
+    order = np.argsort(-part_sims, axis=1)
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_sims, order, axis=1)
+
+
+def spherical_kmeans(
+    x: np.ndarray,
+    k: int,
+    iters: int = 20,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    코사인 k-means (중심을 매 반복 L2 정규화)
+
+    Args:
+        x: (N, D) L2 정규화된 벡터
+        k: 클러스터 수 (N보다 크면 N으로 줄임)
+
+    Returns:
+        (centroids (k, D), assignments (N,))
+    """
+    n = x.shape[0]
+    k = max(1, min(k, n))
+    rng = np.random.default_rng(seed)
+    centroids = np.array(x[rng.choice(n, size=k, replace=False)], dtype=np.float32)
+
+    assign = np.zeros(n, dtype=np.int64)
+    for _ in range(iters):
+        assign = np.argmax(x @ centroids.T, axis=1)
+
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        counts = np.bincount(assign, minlength=k)
+
+        # 빈 클러스터는 무작위 점으로 재시작
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = x[rng.choice(n, size=int(empty.sum()), replace=False)]
+
+        norms = np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        new_centroids = (sums / norms).astype(np.float32)
+        if np.allclose(new_centroids, centroids, atol=1e-6):
+            centroids = new_centroids
+            break
+        centroids = new_centroids
+
+    assign = np.argmax(x @ centroids.T, axis=1)
+    return centroids, assign
+
+
+def aggregate_segments(
+    sims: np.ndarray,
+    offsets: np.ndarray,
+    mode: str = "max",
+    top_n: int = 3,
+) -> np.ndarray:
+    """
+    행 유사도를 캐릭터(세그먼트) 단위로 집계 (reduceat 기반, 파이썬 루프 없음)
+
+    Args:
+        sims: (B, N) 행 유사도
+        offsets: (C + 1,) 캐릭터별 행 범위 (모든 세그먼트 1행 이상)
+        mode: "max" 최고 유사도, "mean" 평균, "topn" 상위 top_n개 평균
+        top_n: topn 모드에서 평균낼 행 수
+
+    Returns:
+        (B, C) 캐릭터 유사도
+    """
+    starts = offsets[:-1]
+    counts = np.diff(offsets)
+
+    if mode == "max":
+        return np.maximum.reduceat(sims, starts, axis=1)
+    if mode == "mean":
+        return np.add.reduceat(sims, starts, axis=1) / counts
+    if mode != "topn":
+        raise ValueError(f"지원하지 않는 집계 방식: {mode}")
+
+    # 세그먼트 순서는 유지하고 세그먼트 안에서만 내림차순 정렬
+    # (유사도는 [-1, 1] 범위이므로 캐릭터 번호 * 4로 키를 분리)
+    row_char = np.repeat(np.arange(counts.shape[0]), counts)
+    order = np.argsort(row_char * 4.0 - sims, axis=1)
+    ranked = np.take_along_axis(sims, order, axis=1)
+
+    rank = np.arange(sims.shape[1]) - offsets[row_char]
+    ranked = np.where(rank < top_n, ranked, 0.0)
+    return np.add.reduceat(ranked, starts, axis=1) / np.minimum(counts, top_n)
+
+
+class BruteForceIndex:
+    """
+    정확한 전체 검색 (prototypes @ query)
+    """
+
+    kind = "brute"
+
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        sims = queries @ self.matrix.T  # (B, N)
+        return top_k_rows(sims, k)
+
+
+class IVFIndex:
+    """
+    Inverted File 인덱스
+    - 프로토타입을 nlist개 클러스터로 나누고 (k-means)
+    - 질의와 가장 가까운 nprobe개 클러스터의 행만 정확히 비교
+    - nprobe = nlist 이면 전체 검색과 동일한 결과
+    """
+
+    kind = "ivf"
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        centroids: np.ndarray,
+        order: np.ndarray,
+        offsets: np.ndarray,
+        nprobe: int = 8,
+    ):
+        """
+        Args:
+            matrix: (N, D) 프로토타입 행렬
+            centroids: (nlist, D) 클러스터 중심
+            order: (N,) 클러스터 순서로 정렬된 행 인덱스
+            offsets: (nlist + 1,) 클러스터별 order 시작 위치 (CSR)
+            nprobe: 탐색할 클러스터 수 (클수록 정확, 느림)
+        """
+        self.matrix = matrix
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    @property
+    def nlist(self) -> int:
+        return self.centroids.shape[0]
+
+    @classmethod
+    def build(
+        cls,
+        matrix: np.ndarray,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        iters: int = 20,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """
+        k-means로 인덱스 생성
+        - nlist 기본값: sqrt(N)
+        """
+        n = matrix.shape[0]
+        if nlist is None:
+            nlist = max(1, int(np.sqrt(n)))
+
+        centroids, assign = spherical_kmeans(np.asarray(matrix, dtype=np.float32), nlist, iters=iters, seed=seed)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=centroids.shape[0])
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        return cls(matrix, centroids, order, offsets, nprobe=nprobe)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        nprobe = max(1, min(self.nprobe, self.nlist))
+        coarse = queries @ self.centroids.T  # (B, nlist)
+        probes, _ = top_k_rows(coarse, nprobe)
+        counts = np.diff(self.offsets)
+
+        # 배치 안의 모든 질의가 같은 개수를 받도록 k는 전체 행 수로만 제한
+        k = min(k, self.order.shape[0])
+        out_idx = np.zeros((queries.shape[0], k), dtype=np.int64)
+        out_sims = np.zeros((queries.shape[0], k), dtype=np.float32)
+
+        for b in range(queries.shape[0]):
+            clusters = probes[b]
+            if counts[clusters].sum() < k:
+                # 탐색한 클러스터의 행이 k개보다 적으면 다음으로 가까운 클러스터까지 추가 탐색
+                ranked = np.argsort(-coarse[b])
+                clusters = ranked[:int(np.searchsorted(np.cumsum(counts[ranked]), k)) + 1]
+            rows = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in clusters])
+            sims = self.matrix[rows] @ queries[b]
+            idx, top = top_k_rows(sims[None, :], k)
+            out_idx[b] = rows[idx[0]]
+            out_sims[b] = top[0]
+
+        return out_idx, out_sims
+
+    def save(self, path: str) -> None:
+        """
+        인덱스 저장 (.npz)
+        - 행렬 자체는 저장하지 않고 지문만 기록
+        """
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            centroids=self.centroids,
+            order=self.order,
+            offsets=self.offsets,
+            fingerprint=np.array(matrix_fingerprint(self.matrix)),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, matrix: np.ndarray, nprobe: int = 8) -> "IVFIndex":
+        """
+        저장된 인덱스 로딩
+
+        Raises:
+            ValueError: 인덱스가 현재 프로토타입 행렬로 만들어지지 않은 경우
+        """
+        with np.load(path) as data:
+            if str(data["fingerprint"]) != matrix_fingerprint(matrix):
+                raise ValueError("인덱스 파일이 현재 프로토타입과 일치하지 않습니다.")
+            return cls(matrix, data["centroids"], data["order"], data["offsets"], nprobe=nprobe)
+
+
+def fit_pca(matrix: np.ndarray, dim: int) -> np.ndarray:
+    """
+    내적 보존용 PCA 투영 행렬 (중심화하지 않음)
+    - (D, D) 공분산의 고유벡터 상위 dim개 → N에 관계없이 D^2 메모리
+
+    Returns:
+        (D, dim) 투영 행렬 (q @ P) · (x @ P) ≈ q · x
+    """
+    x = np.asarray(matrix, dtype=np.float32)
+    gram = x.T @ x
+    eigvals, eigvecs = np.linalg.eigh(gram)  # 오름차순
+    return np.ascontiguousarray(eigvecs[:, ::-1][:, :dim], dtype=np.float32)
+
+
+class CompressedIndex:
+    """
+    압축 행렬 검색 + fp32 재정렬
+    - fp16: 행렬 크기 1/2, int8: 행별 스케일 양자화로 1/4 (PCA 투영 시 추가로 dim/D배)
+    - 압축 행렬을 블록 단위로 fp32로 풀어 행렬곱 (NumPy에는 fp16/int8 BLAS가 없음)
+      → 메모리에서 읽는 바이트는 압축 크기, 계산은 캐시에 올라간 블록에서만
+    - 상위 rerank개 후보만 fp32 원본 행과 정확한 내적으로 다시 정렬
+      → 후보 안에 정답이 있으면 Top-K 결과는 전체 검색과 동일
+    """
+
+    kind = "compressed"
+
+    BLOCK_ROWS = 4096
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        codes: np.ndarray,
+        scales: Optional[np.ndarray] = None,
+        projection: Optional[np.ndarray] = None,
+        rerank: int = 32,
+    ):
+        """
+        Args:
+            matrix: (N, D) fp32 원본 행렬 (재정렬용, memmap이면 후보 행만 읽음)
+            codes: (N, d) 압축 행렬 (float16 또는 int8)
+            scales: (N,) int8 행별 스케일 (fp16이면 None)
+            projection: (D, d) PCA 투영 행렬 (None이면 투영 없음)
+            rerank: fp32로 재정렬할 후보 수 (최소 k * 4)
+        """
+        self.matrix = matrix
+        self.codes = codes
+        self.scales = scales
+        self.projection = projection
+        self.rerank = rerank
+
+    @property
+    def precision(self) -> str:
+        return "int8" if self.codes.dtype == np.int8 else "fp16"
+
+    @property
+    def nbytes(self) -> int:
+        """
+        검색 시 매 질의마다 읽는 바이트 (압축 행렬 + 스케일)
+        """
+        return int(self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0))
+
+    @classmethod
+    def build(
+        cls,
+        matrix: np.ndarray,
+        precision: str = "fp16",
+        pca_dim: int = 0,
+        rerank: int = 32,
+    ) -> "CompressedIndex":
+        """
+        압축 인덱스 생성
+
+        Args:
+            precision: "fp16" 또는 "int8"
+            pca_dim: 0보다 크고 D보다 작으면 PCA로 투영 후 압축
+        """
+        if precision not in ("fp16", "int8"):
+            raise ValueError(f"지원하지 않는 압축 정밀도: {precision}")
+
+        x = np.asarray(matrix, dtype=np.float32)
+        projection = None
+        if 0 < pca_dim < x.shape[1]:
+            projection = fit_pca(x, pca_dim)
+            x = x @ projection
+
+        if precision == "fp16":
+            return cls(matrix, x.astype(np.float16), None, projection, rerank)
+
+        # 행별 대칭 양자화 (최대 절댓값 → 127)
+        scales = np.maximum(np.abs(x).max(axis=1), 1e-12) / 127.0
+        codes = np.clip(np.rint(x / scales[:, None]), -127, 127).astype(np.int8)
+        return cls(matrix, codes, scales.astype(np.float32), projection, rerank)
+
+    def approximate(self, queries: np.ndarray) -> np.ndarray:
+        """
+        압축 공간 유사도 (B, N)
+        """
+        q = queries @ self.projection if self.projection is not None else queries
+        n = self.codes.shape[0]
+        sims = np.empty((q.shape[0], n), dtype=np.float32)
+        for start in range(0, n, self.BLOCK_ROWS):
+            block = self.codes[start:start + self.BLOCK_ROWS].astype(np.float32)
+            sims[:, start:start + block.shape[0]] = q @ block.T
+        if self.scales is not None:
+            sims *= self.scales
+        return sims
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        candidates, _ = top_k_rows(self.approximate(queries), max(self.rerank, k * 4))
+
+        out_idx = np.zeros((queries.shape[0], min(k, candidates.shape[1])), dtype=np.int64)
+        out_sims = np.zeros(out_idx.shape, dtype=np.float32)
+        for b in range(queries.shape[0]):
+            rows = np.sort(candidates[b])  # memmap 순차 읽기
+            sims = np.asarray(self.matrix[rows], dtype=np.float32) @ queries[b]
+            idx, top = top_k_rows(sims[None, :], k)
+            out_idx[b] = rows[idx[0]]
+            out_sims[b] = top[0]
+        return out_idx, out_sims
+
+
+class CharacterIndex:
+    """
+    캐릭터 단위 검색 (캐릭터당 여러 임베딩)
+    - brute: 전체 행 유사도를 한 번에 계산 후 세그먼트 집계
+    - ivf 등 근사 인덱스: 행 단위로 k * overfetch개 후보를 찾고,
+      후보 캐릭터의 모든 행으로 정확한 집계 점수를 다시 계산
+    - search 결과 인덱스는 행이 아니라 캐릭터 번호
+    """
+
+    def __init__(
+        self,
+        row_index,
+        matrix: np.ndarray,
+        offsets: np.ndarray,
+        aggregate: str = "max",
+        top_n: int = 3,
+        overfetch: int = 4,
+    ):
+        """
+        Args:
+            row_index: 행 단위 인덱스 (BruteForceIndex / IVFIndex)
+            matrix: (N, D) 프로토타입 행렬
+            offsets: (C + 1,) 캐릭터별 행 범위
+            aggregate: 집계 방식 ("max", "mean", "topn")
+            top_n: topn 모드에서 평균낼 행 수
+            overfetch: 근사 인덱스에서 캐릭터 k개당 가져올 후보 행 배수
+        """
+        if aggregate not in AGGREGATE_MODES:
+            raise ValueError(f"지원하지 않는 집계 방식: {aggregate}")
+
+        self.row_index = row_index
+        self.matrix = matrix
+        self.offsets = offsets
+        self.aggregate = aggregate
+        self.top_n = top_n
+        self.overfetch = overfetch
+        self.row_char = np.repeat(np.arange(offsets.shape[0] - 1), np.diff(offsets))
+
+    @property
+    def kind(self) -> str:
+        return self.row_index.kind
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if self.row_index.kind == "brute":
+            sims = queries @ self.matrix.T  # (B, N)
+            return top_k_rows(aggregate_segments(sims, self.offsets, self.aggregate, self.top_n), k)
+
+        rows, _ = self.row_index.search(queries, k * self.overfetch)
+
+        # 후보 행이 k개보다 적은 캐릭터에 몰리면 그 질의만 -1 / -inf로 채움 (다른 질의는 k개 유지)
+        k = min(k, self.offsets.shape[0] - 1)
+        out_idx = np.full((queries.shape[0], k), -1, dtype=np.int64)
+        out_sims = np.full((queries.shape[0], k), -np.inf, dtype=np.float32)
+
+        for b in range(queries.shape[0]):
+            chars = np.unique(self.row_char[rows[b]])
+            starts, ends = self.offsets[chars], self.offsets[chars + 1]
+            sub_rows = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+            sub_offsets = np.concatenate([[0], np.cumsum(ends - starts)])
+
+            sims = self.matrix[sub_rows] @ queries[b]
+            scores = aggregate_segments(sims[None, :], sub_offsets, self.aggregate, self.top_n)
+            idx, top = top_k_rows(scores, k)
+            out_idx[b, :idx.shape[1]] = chars[idx[0]]
+            out_sims[b, :idx.shape[1]] = top[0]
+
+        return out_idx, out_sims
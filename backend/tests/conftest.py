@@ -0,0 +1,9 @@
+"""
+테스트 공통 설정
+- 프로젝트 루트(backend/)를 sys.path에 추가 (scripts/와 같은 방식, 어디서 실행해도 services 임포트 가능)
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
@@ -0,0 +1,164 @@
+"""
+수락 제어: AIMD 한도 증가/감소, 대기열 상한(shedding), 가중치 슬롯, 토큰 버킷, 클라이언트 식별
+"""
+
+import asyncio
+
+import pytest
+
+from services.admission import AdaptiveLimiter, AdmissionMiddleware, TokenBuckets
+
+
+def make_limiter(**kwargs) -> AdaptiveLimiter:
+    options = dict(initial_limit=4, min_limit=1, max_limit=8, target_latency_ms=100, max_queue_ms=50, backoff=0.5)
+    options.update(kwargs)
+    return AdaptiveLimiter(**options)
+
+
+def acquire(limiter: AdaptiveLimiter, weight: int = 1):
+    return asyncio.run(limiter.acquire(weight))
+
+
+def test_limit_grows_only_when_fully_used_and_fast():
+    limiter = make_limiter()
+    limiter.in_flight = 1
+    limiter.observe(0.01)
+    assert limiter.limit == 4  # 한도를 다 쓰지 않으면 늘리지 않음
+
+    limiter.in_flight = 4
+    limiter.observe(0.01)
+    assert limiter.limit == pytest.approx(4.25)
+
+
+def test_limit_shrinks_on_slow_inference_at_most_once_per_interval():
+    limiter = make_limiter()
+    limiter.observe(0.5)
+    assert limiter.limit == 2
+    limiter.observe(0.5)
+    assert limiter.limit == 2  # 목표 시간 안에 두 번째 감소는 무시
+    assert limiter.decreases == 1
+
+    limiter._last_decrease -= 1.0
+    limiter.on_overload()
+    assert limiter.limit == 1
+    limiter._last_decrease -= 1.0
+    limiter.on_overload()
+    assert limiter.limit == 1  # min_limit 아래로 내려가지 않음
+
+
+def test_sheds_when_estimated_wait_exceeds_queue_budget():
+    limiter = make_limiter(initial_limit=2)
+    assert acquire(limiter) is None
+    assert acquire(limiter) is None
+
+    limiter.latency = 1.0  # 예상 대기 (0 + 1) * 1.0 / 2 = 0.5s > 50ms
+    wait = acquire(limiter)
+    assert wait == pytest.approx(0.5)
+    assert limiter.shed == 1
+    assert limiter.in_flight == 2
+
+
+def test_waiter_gets_slot_released_within_budget():
+    async def scenario():
+        limiter = make_limiter(initial_limit=1, max_queue_ms=500)
+        limiter.latency = 0.1
+        assert await limiter.acquire() is None
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert limiter.queued == 1
+        limiter.release()
+        assert await waiter is None
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 1
+    assert limiter.queued == 0
+
+
+def test_weighted_acquire_waits_for_enough_slots_in_order():
+    async def scenario():
+        limiter = make_limiter(initial_limit=4, max_queue_ms=500)
+        limiter.latency = 0.01
+        assert await limiter.acquire(2) is None
+
+        heavy = asyncio.create_task(limiter.acquire(3))
+        await asyncio.sleep(0.01)
+        light = asyncio.create_task(limiter.acquire(1))
+        await asyncio.sleep(0.01)
+        # 슬롯 2개가 남았지만 먼저 온 3개짜리 요청이 앞에 있으므로 1개짜리도 기다림
+        assert not heavy.done() and not light.done()
+
+        limiter.release(2)
+        assert await heavy is None
+        assert await light is None
+        return limiter
+
+    assert asyncio.run(scenario()).in_flight == 4
+
+
+def test_token_bucket_limits_per_client_and_charges_cost():
+    buckets = TokenBuckets(rate=1, burst=3)
+    assert buckets.take("a", 2) == 0
+    assert buckets.take("a") == 0
+    assert buckets.take("a") > 0
+    assert buckets.take("b", 10) == 0  # 버킷 크기보다 큰 비용은 버킷 크기만큼
+    assert buckets.take("b") > 0
+    assert buckets.limited == 2
+
+
+def test_token_bucket_disabled_with_zero_rate():
+    buckets = TokenBuckets(rate=0, burst=1)
+    assert all(buckets.take("a") == 0 for _ in range(10))
+
+
+def scope_with(*forwarded: bytes):
+    return {"client": ("10.0.0.1", 1234), "headers": [(b"x-forwarded-for", value) for value in forwarded]}
+
+
+def make_middleware(header: str = "x-forwarded-for", trusted_proxies: int = 1) -> AdmissionMiddleware:
+    return AdmissionMiddleware(
+        None, make_limiter(), TokenBuckets(), (), client_header=header, trusted_proxies=trusted_proxies
+    )
+
+
+def test_client_is_read_from_the_trusted_hop():
+    assert make_middleware()._client(scope_with(b"6.6.6.6, 1.2.3.4")) == "1.2.3.4"
+    assert make_middleware(trusted_proxies=2)._client(scope_with(b"6.6.6.6, 1.2.3.4", b"10.0.0.9")) == "1.2.3.4"
+
+
+def test_client_falls_back_to_socket_address():
+    assert make_middleware(trusted_proxies=2)._client(scope_with(b"1.2.3.4")) == "10.0.0.1"
+    assert make_middleware()._client(scope_with()) == "10.0.0.1"
+    assert make_middleware(header="")._client(scope_with(b"1.2.3.4")) == "10.0.0.1"
+
+
+def run_request(middleware: AdmissionMiddleware, path: str = "/api/match/batch"):
+    scope = {"type": "http", "method": "POST", "path": path, "client": ("10.0.0.1", 1234), "headers": []}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]["status"]
+
+
+def test_batch_charge_takes_a_token_per_image():
+    from services.admission import AdmissionRejected, admission_charge
+
+    async def app(scope, receive, send):
+        try:
+            async with admission_charge(scope, 4):
+                status = 200
+        except AdmissionRejected as e:
+            status = e.status
+        await send({"type": "http.response.start", "status": status, "headers": []})
+
+    middleware = AdmissionMiddleware(app, make_limiter(), TokenBuckets(rate=0.001, burst=5), ("/api/match/batch",))
+    assert run_request(middleware) == 200  # 토큰 4개 사용
+    assert run_request(middleware) == 429  # 미들웨어 1개 후 추가 3개 부족
+    assert middleware.limiter.in_flight == 0
@@ -0,0 +1,80 @@
+"""
+MicroBatcher: 배치 묶기, 실패한 이미지만 격리, runner 실패 시 배치 전체 실패
+"""
+
+import asyncio
+from typing import List, Optional
+
+import numpy as np
+import pytest
+
+from services.batching_service import MicroBatcher
+from services.inference_pool import InferenceQueueFullError
+
+
+class FakeRunner:
+    """
+    inference_pool.run_each 대역: b"bad"는 이미지별 실패, 나머지는 첫 바이트 값으로 임베딩
+    """
+
+    def __init__(self, error: Optional[Exception] = None):
+        self.error = error
+        self.calls: List[int] = []
+        self.forwarded: List[int] = []
+
+    async def __call__(self, images, boxes):
+        self.calls.append(len(images))
+        if self.error is not None:
+            raise self.error
+        errors = [ValueError("손상된 이미지") if data == b"bad" else None for data in images]
+        good = [data for data, error in zip(images, errors) if error is None]
+        self.forwarded.append(len(good))
+        return np.array([[float(data[0])] * 4 for data in good], dtype=np.float32), errors
+
+
+async def submit_all(batcher: MicroBatcher, images):
+    await batcher.start()
+    try:
+        return await asyncio.gather(*[batcher.submit(data) for data in images], return_exceptions=True)
+    finally:
+        await batcher.stop()
+
+
+def test_collects_concurrent_requests_into_one_call():
+    runner = FakeRunner()
+    batcher = MicroBatcher(runner, max_batch_size=8, max_wait_ms=20)
+    outcomes = asyncio.run(submit_all(batcher, [bytes([i]) for i in range(1, 6)]))
+
+    assert runner.calls == [5]
+    assert [outcome[0] for outcome in outcomes] == [1, 2, 3, 4, 5]
+
+
+def test_splits_at_max_batch_size():
+    runner = FakeRunner()
+    batcher = MicroBatcher(runner, max_batch_size=2, max_wait_ms=20)
+    asyncio.run(submit_all(batcher, [bytes([i]) for i in range(1, 6)]))
+
+    assert sorted(runner.calls) == [1, 2, 2]
+
+
+def test_failing_item_fails_only_its_request():
+    runner = FakeRunner()
+    batcher = MicroBatcher(runner, max_batch_size=8, max_wait_ms=20)
+    outcomes = asyncio.run(submit_all(batcher, [b"\x01", b"bad", b"\x03"]))
+
+    # 한 번의 호출로 정상 이미지만 forward, 개별 재실행 없음
+    assert runner.calls == [3]
+    assert runner.forwarded == [2]
+    assert outcomes[0][0] == 1
+    assert isinstance(outcomes[1], ValueError)
+    assert outcomes[2][0] == 3
+
+
+@pytest.mark.parametrize("error", [InferenceQueueFullError("가득 참"), RuntimeError("forward 실패")])
+def test_runner_failure_fails_whole_batch_without_retry(error):
+    runner = FakeRunner(error=error)
+    batcher = MicroBatcher(runner, max_batch_size=8, max_wait_ms=20)
+    outcomes = asyncio.run(submit_all(batcher, [b"\x01", b"\x02", b"\x03"]))
+
+    assert runner.calls == [3]
+    assert all(outcome is error for outcome in outcomes)
@@ -0,0 +1,95 @@
+"""
+EmbeddingCache: 메모리 계층 LRU/바이트 상한/TTL, 디스크 계층 바이트 상한과 재시작 후 LRU 순서
+"""
+
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from services.embedding_cache import EmbeddingCache
+
+
+def vector(value: float, dim: int = 512) -> np.ndarray:
+    return np.full(dim, value, dtype=np.float32)
+
+
+def get(cache: EmbeddingCache, key: str):
+    return asyncio.run(cache.get(key))
+
+
+def disk_size(root) -> int:
+    return sum(os.path.getsize(os.path.join(d, name)) for d, _, names in os.walk(root) for name in names)
+
+
+def test_memory_evicts_least_recently_used():
+    cache = EmbeddingCache(max_entries=2, disk_dir=None)
+    cache.put("a", vector(1))
+    cache.put("b", vector(2))
+    assert get(cache, "a") is not None  # a가 최근 사용
+    cache.put("c", vector(3))
+
+    assert get(cache, "b") is None
+    assert get(cache, "a")[0] == 1
+    assert get(cache, "c")[0] == 3
+    assert cache.evictions == 1
+
+
+def test_memory_respects_byte_cap():
+    cache = EmbeddingCache(max_entries=100, max_bytes=512 * 4 * 2, disk_dir=None)
+    for i in range(5):
+        cache.put(str(i), vector(i))
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] <= 512 * 4 * 2
+
+
+def test_memory_entries_expire():
+    cache = EmbeddingCache(max_entries=10, ttl_seconds=0.05, disk_dir=None)
+    cache.put("a", vector(1))
+    time.sleep(0.1)
+    assert get(cache, "a") is None
+
+
+def test_cached_embedding_is_read_only_copy():
+    cache = EmbeddingCache(max_entries=10, disk_dir=None)
+    original = vector(1)
+    cache.put("a", original)
+    original[:] = 0
+    cached = get(cache, "a")
+    assert cached[0] == 1
+    assert not cached.flags.writeable
+
+
+def test_disk_tier_evicts_over_byte_cap(tmp_path):
+    cache = EmbeddingCache(max_entries=1, disk_dir=str(tmp_path), disk_max_bytes=10 ** 6)
+    cache.put("aa", vector(1))
+    cache.close()
+    entry_size = disk_size(tmp_path)
+
+    cache = EmbeddingCache(max_entries=1, disk_dir=str(tmp_path), disk_max_bytes=entry_size * 2)
+    for key in ("bb", "cc", "dd"):
+        cache.put(key, vector(2))
+    cache.close()
+
+    assert disk_size(tmp_path) <= entry_size * 2
+    assert cache.stats()["disk_evictions"] == 2
+
+
+def test_disk_hit_survives_restart_eviction(tmp_path):
+    cache = EmbeddingCache(max_entries=1, disk_dir=str(tmp_path), disk_max_bytes=10 ** 6)
+    for i, key in enumerate(("aa", "bb", "cc")):
+        cache.put(key, vector(i))
+        time.sleep(0.02)
+    cache.close()
+
+    # 재시작 후 디스크에서 aa 적중 → 가장 최근 사용
+    cache = EmbeddingCache(max_entries=1, disk_dir=str(tmp_path), disk_max_bytes=10 ** 6)
+    assert get(cache, "aa")[0] == 0
+    assert cache.disk_hits == 1
+    cache.close()
+
+    # 다시 재시작하며 상한을 줄이면 가장 오래 안 쓴 bb부터 삭제
+    cache = EmbeddingCache(max_entries=1, disk_dir=str(tmp_path), disk_max_bytes=disk_size(tmp_path) - 1)
+    assert sorted(cache._disk_entries) == ["aa", "cc"]
+    cache.close()
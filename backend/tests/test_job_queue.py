@@ -0,0 +1,149 @@
+"""
+JobQueue: 우선순위 순서, 결과 TTL 만료, 재시도 제한
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.job_queue import JobQueue, JobQueueFullError
+
+
+class QueueFull(Exception):
+    pass
+
+
+async def wait_finished(job, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline, f"작업이 끝나지 않음: {job.status}"
+        await asyncio.sleep(0.01)
+
+
+def test_runs_higher_priority_first_then_arrival_order():
+    async def scenario():
+        queue = JobQueue(workers=1)
+        gate = asyncio.Event()
+        order = []
+
+        async def handler(payload):
+            if payload == "blocker":
+                await gate.wait()
+            order.append(payload)
+            return {"payload": payload}
+
+        await queue.start(handler)
+        blocker = await queue.submit("blocker")
+        await asyncio.sleep(0.01)  # 워커가 blocker를 꺼내 실행 중
+        jobs = [
+            await queue.submit("low-1", priority=0),
+            await queue.submit("high", priority=5),
+            await queue.submit("low-2", priority=0),
+            await queue.submit("mid", priority=1),
+        ]
+        assert [queue.position(job) for job in jobs] == [2, 0, 3, 1]
+
+        gate.set()
+        for job in [blocker, *jobs]:
+            await wait_finished(job)
+        await queue.stop()
+        return order
+
+    assert asyncio.run(scenario()) == ["blocker", "high", "mid", "low-1", "low-2"]
+
+
+def test_rejects_submit_when_queue_is_full():
+    async def scenario():
+        queue = JobQueue(workers=1, max_queue=2)
+        await queue.submit("a")
+        await queue.submit("b")
+        with pytest.raises(JobQueueFullError):
+            await queue.submit("c")
+
+    asyncio.run(scenario())
+
+
+def test_finished_jobs_expire_after_ttl():
+    async def scenario():
+        queue = JobQueue(workers=1, result_ttl=0.05)
+
+        async def handler(payload):
+            return {"ok": True}
+
+        await queue.start(handler)
+        job = await queue.submit("x")
+        await wait_finished(job)
+        assert queue.get(job.id) is job
+        assert job.payload is None
+
+        await asyncio.sleep(0.1)
+        assert queue.get(job.id) is None
+        assert queue.expired == 1
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+
+def test_retryable_error_fails_with_503_after_deadline():
+    async def scenario():
+        queue = JobQueue(workers=1, retry_timeout=0.3)
+        calls = []
+
+        async def handler(payload):
+            calls.append(payload)
+            raise QueueFull()
+
+        await queue.start(handler, retryable=(QueueFull,))
+        job = await queue.submit("x")
+        await wait_finished(job)
+        await queue.stop()
+        return job, calls, queue
+
+    job, calls, queue = asyncio.run(scenario())
+    assert job.status == "failed"
+    assert job.error["status"] == 503
+    assert len(calls) > 1
+    assert queue.retries == len(calls) - 1
+
+
+def test_retryable_error_recovers_before_deadline():
+    async def scenario():
+        queue = JobQueue(workers=1, retry_timeout=5)
+        calls = []
+
+        async def handler(payload):
+            calls.append(payload)
+            if len(calls) < 3:
+                raise QueueFull()
+            return {"ok": True}
+
+        await queue.start(handler, retryable=(QueueFull,))
+        job = await queue.submit("x")
+        await wait_finished(job)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "done"
+    assert job.result == {"ok": True}
+
+
+def test_http_errors_keep_their_status():
+    class NotFound(Exception):
+        status_code = 404
+        detail = "없음"
+
+    async def scenario():
+        queue = JobQueue(workers=1)
+
+        async def handler(payload):
+            raise NotFound()
+
+        await queue.start(handler)
+        job = await queue.submit("x")
+        await wait_finished(job)
+        await queue.stop()
+        return job
+
+    assert asyncio.run(scenario()).error == {"status": 404, "detail": "없음"}
@@ -0,0 +1,73 @@
+"""
+검색 인덱스: IVF / CharacterIndex가 배치의 모든 질의에 k개를 반환 (부족하면 -1 / -inf)
+"""
+
+import numpy as np
+
+from services.vector_index import BruteForceIndex, CharacterIndex, IVFIndex
+
+
+def normalized(rows: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    matrix = np.random.default_rng(seed).standard_normal((rows, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def test_ivf_with_all_clusters_matches_brute_force():
+    matrix = normalized(200)
+    queries = normalized(5, seed=1)
+    ivf = IVFIndex.build(matrix, nlist=8, nprobe=8)
+    brute_idx, brute_sims = BruteForceIndex(matrix).search(queries, 10)
+    ivf_idx, ivf_sims = ivf.search(queries, 10)
+
+    np.testing.assert_array_equal(ivf_idx, brute_idx)
+    np.testing.assert_allclose(ivf_sims, brute_sims, rtol=1e-5)
+
+
+def test_ivf_returns_k_for_every_query_when_probed_clusters_are_small():
+    matrix = normalized(200)
+    queries = normalized(8, seed=1)
+    ivf = IVFIndex.build(matrix, nlist=20, nprobe=1)
+    idx, sims = ivf.search(queries, 30)
+
+    assert idx.shape == (8, 30)
+    assert (idx >= 0).all()
+    assert all(len(set(row)) == 30 for row in idx.tolist())
+    assert (np.diff(sims, axis=1) <= 1e-6).all()
+
+
+def test_ivf_caps_k_at_row_count():
+    matrix = normalized(5)
+    idx, _ = IVFIndex.build(matrix, nlist=2, nprobe=1).search(normalized(2, seed=1), 10)
+    assert idx.shape == (2, 5)
+
+
+def test_character_index_pads_short_rows():
+    # 캐릭터 3명, 행 4 / 1 / 1개
+    matrix = normalized(6)
+    offsets = np.array([0, 4, 5, 6])
+    ivf = IVFIndex.build(matrix, nlist=3, nprobe=1)
+    index = CharacterIndex(ivf, matrix, offsets, overfetch=1)
+    # overfetch=1 → 후보 행 3개가 모두 캐릭터 0에 몰리는 질의가 생김
+    queries = np.stack([matrix[0], matrix[1], matrix[5]])
+    idx, sims = index.search(queries, 3)
+
+    assert idx.shape == (3, 3)
+    assert (idx < 0).any()
+    for row_idx, row_sims in zip(idx, sims):
+        valid = row_idx >= 0
+        assert valid[0]
+        # 유효한 결과가 앞에, 채운 값은 -1 / -inf
+        assert (valid[:valid.sum()]).all()
+        assert np.isneginf(row_sims[~valid]).all()
+        assert len(set(row_idx[valid].tolist())) == valid.sum()
+
+
+def test_character_index_brute_aggregates_per_character():
+    matrix = normalized(6)
+    offsets = np.array([0, 4, 5, 6])
+    index = CharacterIndex(BruteForceIndex(matrix), matrix, offsets, aggregate="max")
+    idx, sims = index.search(matrix[[4]], 3)
+
+    assert idx[0, 0] == 1
+    np.testing.assert_allclose(sims[0, 0], 1.0, rtol=1e-5)
+    assert sorted(idx[0].tolist()) == [0, 1, 2]
@@ -5,6 +5,7 @@ import styled from "@emotion/styled";
 import { keyframes } from "@emotion/react";
 import { Card } from "@/components/ui/card";
 import { Progress } from "@/components/ui/progress";
+import { cropFace, detectFaceBox, loadImage } from "@/lib/faceApi";
 import type { MatchResult } from "@/types/character";
 
 const spin = keyframes`
@@ -57,13 +58,49 @@ interface CharacterMatcherProps {
   onMatchComplete: (result: MatchResult) => void;
 }
 
+/**
+ * 얼굴 영역 전송 방식
+ * - "off": 원본 이미지만 전송 (기본값, 전신 초상화 프로토타입과 같은 조건으로 매칭)
+ * - "box": 원본 이미지 + 얼굴 박스 좌표 전송 (백엔드에서 크롭)
+ * - "crop": 얼굴 영역만 잘라서 업로드 (업로드 크기 최소화)
+ * - "box" / "crop"은 매칭 결과가 달라지므로 정확도 확인 후에 켤 것
+ */
+const FACE_UPLOAD_MODE = process.env.NEXT_PUBLIC_FACE_UPLOAD_MODE || "off";
+
+/**
+ * 업로드할 폼 데이터 생성
+ * - 얼굴을 찾지 못하면 원본 이미지를 그대로 전송
+ */
+async function buildFormData(imageUrl: string): Promise<FormData> {
+  const formData = new FormData();
+
+  if (FACE_UPLOAD_MODE !== "off") {
+    try {
+      const imageElement = await loadImage(imageUrl);
+      const box = await detectFaceBox(imageElement);
+      if (box && FACE_UPLOAD_MODE === "crop") {
+        formData.append("file", await cropFace(imageElement, box), "user-face.jpg");
+        return formData;
+      }
+      if (box && FACE_UPLOAD_MODE === "box") {
+        formData.append(
+          "face_box",
+          [box.x, box.y, box.width, box.height].map(Math.round).join(",")
+        );
+      }
+    } catch (error) {
+      console.warn("얼굴 감지 실패, 원본 이미지로 매칭:", error);
+    }
+  }
+
+  const response = await fetch(imageUrl);
+  formData.append("file", await response.blob(), "user-photo.jpg");
+  return formData;
+}
+
 async function matchCharacterAPI(imageUrl: string): Promise<MatchResult> {
   try {
-    const response = await fetch(imageUrl);
-    const blob = await response.blob();
-
-    const formData = new FormData();
-    formData.append("file", blob, "user-photo.jpg");
+    const formData = await buildFormData(imageUrl);
 
     const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
@@ -4,7 +4,7 @@ import { MatchResult } from "@/types/character";
 import styled from "@emotion/styled";
 import { keyframes } from "@emotion/react";
 import { Card, CardContent } from "./ui/card";
-import { getPortraitUrl } from "@/services/simpsonsApi";
+import { getCharacterPortraitUrl } from "@/services/simpsonsApi";
 import { Button } from "./ui/button";
 import { useState } from "react";
 import Image from "next/image";
@@ -169,7 +169,7 @@ export default function ResultCard({
   const { character, similarity } = matchResult;
   const [imageError, setImageError] = useState(false);
 
-  const portraitUrl = getPortraitUrl(character.portrait_path);
+  const portraitUrl = getCharacterPortraitUrl(character, "card");
 
   return (
     <ResultContainer>
@@ -114,3 +114,90 @@ export async function loadImage(imageUrl: string): Promise<HTMLImageElement> {
     image.src = imageUrl;
   });
 }
+
+/**
+ * 얼굴 박스 (원본 이미지 픽셀 좌표)
+ */
+export interface FaceBox {
+  x: number;
+  y: number;
+  width: number;
+  height: number;
+}
+
+/**
+ * 얼굴 위치만 빠르게 감지
+ * - 용도: 백엔드 매칭 전에 얼굴 영역만 잘라서 전송 (업로드 크기/디코딩 비용 감소)
+ * - 감지기 모델(tinyFaceDetector)만 로딩
+ * @param imageElement - 분석할 이미지 엘리먼트
+ * @returns 얼굴 박스 (못 찾으면 null)
+ */
+export async function detectFaceBox(
+  imageElement: HTMLImageElement
+): Promise<FaceBox | null> {
+  if (!faceapi.nets.tinyFaceDetector.isLoaded) {
+    const MODEL_URL = "https://cdn.jsdelivr.net/npm/@vladmandic/face-api/model";
+    await faceapi.nets.tinyFaceDetector.loadFromUri(MODEL_URL);
+  }
+
+  const options = new faceapi.TinyFaceDetectorOptions({
+    inputSize: 416,
+    scoreThreshold: 0.3,
+  });
+  const detection = await faceapi.detectSingleFace(imageElement, options);
+  if (!detection) {
+    return null;
+  }
+
+  const { x, y, width, height } = detection.box;
+  return { x, y, width, height };
+}
+
+/**
+ * 얼굴 영역만 잘라서 JPEG Blob으로 변환
+ * - 백엔드와 같은 방식으로 여백을 더한 정사각형 영역을 자름
+ * @param imageElement - 원본 이미지 엘리먼트
+ * @param box - 얼굴 박스
+ * @param margin - 박스 한 변 대비 여백 비율
+ * @param maxSize - 결과 이미지 최대 한 변 길이 (모델 입력 224px의 2배)
+ */
+export async function cropFace(
+  imageElement: HTMLImageElement,
+  box: FaceBox,
+  margin = 0.4,
+  maxSize = 448
+): Promise<Blob> {
+  const imageWidth = imageElement.naturalWidth;
+  const imageHeight = imageElement.naturalHeight;
+
+  const side = Math.max(
+    1,
+    Math.min(
+      Math.round(Math.max(box.width, box.height) * (1 + 2 * margin)),
+      imageWidth,
+      imageHeight
+    )
+  );
+  const centerX = box.x + box.width / 2;
+  const centerY = box.y + box.height / 2;
+  const left = Math.min(Math.max(Math.round(centerX - side / 2), 0), imageWidth - side);
+  const top = Math.min(Math.max(Math.round(centerY - side / 2), 0), imageHeight - side);
+
+  const outputSize = Math.min(side, maxSize);
+  const canvas = document.createElement("canvas");
+  canvas.width = outputSize;
+  canvas.height = outputSize;
+  const context = canvas.getContext("2d");
+  if (!context) {
+    throw new Error("캔버스를 사용할 수 없습니다.");
+  }
+  context.drawImage(imageElement, left, top, side, side, 0, 0, outputSize, outputSize);
+
+  return new Promise((resolve, reject) => {
+    canvas.toBlob(
+      (blob) => (blob ? resolve(blob) : reject(new Error("이미지 변환 실패"))),
+      "image/jpeg",
+      0.9
+    );
+  });
+}
@@ -3,7 +3,11 @@
  * - 공개 API에서 심슨 캐릭터 데이터 조회
  */
 
-import type { CharactersResponse, SimpsonCharacter } from "@/types/character";
+import type {
+  CharactersResponse,
+  PortraitSize,
+  SimpsonCharacter,
+} from "@/types/character";
 
 /**
  * API 엔드포인트
@@ -11,6 +15,7 @@ import type { CharactersResponse, SimpsonCharacter } from "@/types/character";
 const API_BASE_URL = "https://thesimpsonsapi.com";
 const CDN_BASE_URL = "https://cdn.thesimpsonsapi.com"; // CDN 추가
 const API_URL = `${API_BASE_URL}/api/characters`;
+const BACKEND_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
 /**
  * 초상화 경로를 전체 URL로 변환
@@ -20,6 +25,19 @@ export function getPortraitUrl(portraitPath: string): string {
   return `${CDN_BASE_URL}/500${portraitPath}`;
 }
 
+/**
+ * 캐릭터 초상화 URL
+ * - 백엔드가 미리 줄여 둔 초상화가 있으면 사용 (immutable 캐시)
+ * - 없으면 CDN 원본으로 대체
+ */
+export function getCharacterPortraitUrl(
+  character: SimpsonCharacter,
+  size: PortraitSize = "card"
+): string {
+  const path = character.portraits?.[size];
+  return path ? `${BACKEND_URL}${path}` : getPortraitUrl(character.portrait_path);
+}
+
 /**
  * 프록시를 통한 이미지 URL 생성
  * - 용도: CORS 우회를 위해 Next.js API Route를 통해 이미지 로드
@@ -2,6 +2,11 @@
  * The Simpsons 캐릭터 관련 타입 정의
  */
 
+/**
+ * 초상화 크기 (thumb: 목록용 160px, card: 결과 카드용 400px)
+ */
+export type PortraitSize = "thumb" | "card";
+
 /**
  * 심슨 캐릭터 타입
  * - The Simpsons API에서 반환되는 캐릭터 데이터
@@ -23,6 +28,12 @@ export interface SimpsonCharacter {
    */
   portrait_path: string;
 
+  /**
+   * 백엔드가 미리 줄여 둔 초상화 URL 경로 (크기별)
+   * 예: { thumb: "/portraits/1/thumb-1a2b3c4d5e6f7a8b.webp", card: "..." }
+   */
+  portraits?: Partial<Record<PortraitSize, string>>;
+
   /**
    * 나이
    */